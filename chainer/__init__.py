@@ -1,4 +1,5 @@
 import collections
+import contextlib
 import pkg_resources
 import sys
 import threading
@@ -46,9 +47,12 @@ thread_local = threading.local()
 
 
 def get_function_hooks():
-    if not hasattr(thread_local, 'function_hooks'):
-        thread_local.function_hooks = collections.OrderedDict()
-    return thread_local.function_hooks
+    try:
+        ret = thread_local.function_hooks
+    except AttributeError:
+        ret = collections.OrderedDict()
+        thread_local.function_hooks = ret
+    return ret
 
 _debug = False
 
@@ -76,6 +80,54 @@ def set_debug(debug):
     global _debug
     _debug = debug
 
+
+def is_inference_mode():
+    """Returns whether the inference mode is enabled in this thread.
+
+    Returns:
+        bool: ``True`` if the inference mode is enabled.
+
+    .. seealso:: :func:`inference_mode`
+    """
+    try:
+        return thread_local.inference_mode
+    except AttributeError:
+        return False
+
+
+@contextlib.contextmanager
+def inference_mode():
+    """Enables the inference mode in this thread within a ``with`` statement.
+
+    In the inference mode, :class:`Function` objects take arrays as well as
+    variables, and return arrays instead of variables. No computational graph
+    is built, i.e., neither output variables nor backward references are
+    created, volatile flags are not aggregated, and the current device is not
+    switched when all inputs are on CPU. Since links pass their inputs to
+    functions, a chain written for variables can be applied to arrays
+    directly in this mode to reduce the overhead of prediction, as long as it
+    only uses functions, operators and attributes common to variables and
+    arrays (e.g. :attr:`Variable.shape` and :attr:`Variable.dtype`).
+
+    Type checking and function hooks still work in this mode.
+
+    .. admonition:: Example
+
+       >>> model = L.Linear(3, 2)
+       >>> x = np.zeros((1, 3), 'f')
+       >>> with chainer.inference_mode():
+       ...     y = F.relu(model(x))
+       >>> type(y)
+       <class 'numpy.ndarray'>
+
+    """
+    old = is_inference_mode()
+    thread_local.inference_mode = True
+    try:
+        yield
+    finally:
+        thread_local.inference_mode = old
+
 basic_math.install_variable_arithmetics()
 array.get_item.install_variable_get_item()
 
@@ -1,9 +1,11 @@
 import collections
 import os
-import six
 import traceback
 import weakref
 
+import numpy
+import six
+
 import chainer
 from chainer import cuda
 from chainer import flag
@@ -11,6 +13,20 @@ from chainer.utils import type_check
 from chainer import variable
 
 
+_type_check_cache = set()
+_type_check_cache_size = 65536
+_plain_types = (bool, float, type(None), numpy.dtype, numpy.generic) + \
+    six.integer_types + six.string_types
+
+
+def _is_plain(value):
+    if isinstance(value, _plain_types):
+        return True
+    if isinstance(value, tuple):
+        return all(_is_plain(v) for v in value)
+    return False
+
+
 class Function(object):
 
     """Function on variables with backpropagation ability.
@@ -79,9 +95,18 @@ class Function(object):
         type_check_enable: When it is ``True``, the function checks types of
             input arguments. Set ``CHAINER_TYPE_CHECK`` environment variable
             ``0`` to disable type check, or set the variable directly in
-            your own program.
+            your own program. The result of a successful check is cached
+            per function class, attribute values and input shapes and
+            dtypes, so that the check is skipped on later calls with the
+            same signature. Functions having attributes other than numbers,
+            strings, dtypes and tuples of them are always checked.
 
     """
+    # The attributes used to maintain the computational graph are stored in
+    # slots. Implementations of functions can still set arbitrary attributes.
+    __slots__ = ('inputs', 'outputs', 'rank', '_local_function_hooks',
+                 '_stack', '__dict__', '__weakref__')
+
     type_check_enable = int(os.environ.get('CHAINER_TYPE_CHECK', '1')) != 0
 
     def __call__(self, *inputs):
@@ -99,38 +124,21 @@ class Function(object):
 
         Args:
             inputs: Tuple of input :class:`Variable` objects. The volatile
-                flags of all input variables must agree.
+                flags of all input variables must agree. In the inference
+                mode (see :func:`chainer.inference_mode`), arrays are also
+                accepted.
 
         Returns:
             One :class:`Variable` object or a tuple of multiple
-            :class:`Variable` objects.
+            :class:`Variable` objects. In the inference mode, arrays are
+            returned instead.
 
         """
+        if chainer.is_inference_mode():
+            return self._forward_without_graph(inputs)
 
         in_data = tuple([x.data for x in inputs])
-        if chainer.is_debug():
-            self._stack = traceback.extract_stack()
-
-        if self.type_check_enable:
-            self._check_data_type_forward(in_data)
-
-        hooks = collections.OrderedDict(chainer.get_function_hooks())
-        hooks.update(self.local_function_hooks)
-        for hook in six.itervalues(hooks):
-            hook.forward_preprocess(self, in_data)
-        # Forward prop
-        with cuda.get_device(*in_data):
-            outputs = self.forward(in_data)
-            assert type(outputs) == tuple
-        for hook in six.itervalues(hooks):
-            hook.forward_postprocess(self, in_data)
-
-        if chainer.is_debug():
-            if any(out.dtype.kind == 'f' and
-                   cuda.get_array_module(out).isnan(out).any()
-                   for out in outputs):
-                msg = 'NaN is detected on forward computation'
-                raise RuntimeError(msg)
+        outputs = self._forward_data(in_data)
 
         out_v = flag.aggregate_flags([x.volatile for x in inputs])
         ret = tuple([variable.Variable(y, volatile=out_v) for y in outputs])
@@ -150,6 +158,60 @@ class Function(object):
         else:
             return ret
 
+    def _forward_without_graph(self, inputs):
+        # Forward computation of the inference mode, which neither creates
+        # variables nor builds the graph
+        in_data = tuple([x.data if isinstance(x, variable.Variable) else x
+                         for x in inputs])
+        outputs = self._forward_data(in_data)
+        if len(outputs) == 1:
+            return outputs[0]
+        else:
+            return outputs
+
+    def _forward_data(self, in_data):
+        # Computes the output arrays with type checking, function hooks and
+        # the NaN check of the debug mode. The device is switched only if
+        # some input is on GPU.
+        if chainer.is_debug():
+            self._stack = traceback.extract_stack()
+
+        if self.type_check_enable:
+            self._check_data_type_forward(in_data)
+
+        hooks = self._get_hooks()
+        for hook in hooks:
+            hook.forward_preprocess(self, in_data)
+        # Forward prop
+        if any([isinstance(x, cuda.ndarray) for x in in_data]):
+            with cuda.get_device(*in_data):
+                outputs = self.forward(in_data)
+        else:
+            outputs = self.forward(in_data)
+        assert type(outputs) == tuple
+        for hook in hooks:
+            hook.forward_postprocess(self, in_data)
+
+        if chainer.is_debug():
+            if any(out.dtype.kind == 'f' and
+                   cuda.get_array_module(out).isnan(out).any()
+                   for out in outputs):
+                msg = 'NaN is detected on forward computation'
+                raise RuntimeError(msg)
+        return outputs
+
+    def _get_hooks(self):
+        # Returns the global and local hooks to be called. They are copied so
+        # that a hook can unregister itself or another hook while they are
+        # called.
+        hooks = chainer.get_function_hooks()
+        if self._n_local_function_hooks != 0:
+            hooks = collections.OrderedDict(hooks)
+            hooks.update(self.local_function_hooks)
+        if not hooks:
+            return ()
+        return tuple(hooks.values())
+
     @property
     def local_function_hooks(self):
         """Ordered Dictionary of registered function hooks.
@@ -162,6 +224,12 @@ class Function(object):
             self._local_function_hooks = collections.OrderedDict()
         return self._local_function_hooks
 
+    @property
+    def _n_local_function_hooks(self):
+        if hasattr(self, '_local_function_hooks'):
+            return len(self._local_function_hooks)
+        return 0
+
     @property
     def label(self):
         """Short text that represents the function.
@@ -178,7 +246,30 @@ class Function(object):
         else:
             return None
 
+    def _get_type_check_key(self, in_data):
+        # Returns a key identifying the result of the type check, or None if
+        # the result cannot be cached. The key consists of the class, the
+        # attributes (which are configurations given on construction at this
+        # point) and the types of the input arrays. Attributes of types other
+        # than plain values are not trusted to be compared by their contents.
+        attrs = []
+        for name, value in six.iteritems(self.__dict__):
+            if not _is_plain(value):
+                return None
+            attrs.append((name, type(value), value))
+        # Names are unique, so values are never compared
+        attrs.sort()
+        try:
+            in_types = tuple([(type(x), x.shape, x.dtype) for x in in_data])
+        except AttributeError:
+            return None
+        return type(self), tuple(attrs), in_types
+
     def _check_data_type_forward(self, in_data):
+        key = self._get_type_check_key(in_data)
+        if key is not None and key in _type_check_cache:
+            return
+
         in_type = type_check.get_types(in_data, 'in_types', False)
         try:
             self.check_type_forward(in_type)
@@ -189,6 +280,11 @@ Invalid operation is performed in: {0} (Forward)
 {1}""".format(self.label, str(e))
             raise type_check.InvalidType(e.expect, e.actual, msg=msg)
 
+        if key is not None:
+            if len(_type_check_cache) >= _type_check_cache_size:
+                _type_check_cache.clear()
+            _type_check_cache.add(key)
+
     def check_type_forward(self, in_types):
         """Checks types of input data before forward propagation.
 
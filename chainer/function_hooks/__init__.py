@@ -1,6 +1,10 @@
 from chainer.function_hooks import debug_print
+from chainer.function_hooks import memory
+from chainer.function_hooks import profiler
 from chainer.function_hooks import timer
 
 
+MemoryHook = memory.MemoryHook
 PrintHook = debug_print.PrintHook
+ProfileHook = profiler.ProfileHook
 TimerHook = timer.TimerHook
@@ -0,0 +1,253 @@
+from __future__ import print_function
+import collections
+import sys
+import weakref
+
+import numpy
+import six
+
+from chainer import cuda
+from chainer import function
+
+
+def _is_array(value):
+    return isinstance(value, (numpy.ndarray, cuda.ndarray))
+
+
+def _owner_id(array):
+    base = array.base
+    return id(array if base is None else base)
+
+
+def _retained_arrays(func):
+    # Yields the pairs of names and arrays held as attributes of func
+    for name, value in func.__dict__.items():
+        if _is_array(value):
+            yield name, value
+        elif isinstance(value, (tuple, list)):
+            for v in value:
+                if _is_array(v):
+                    yield name, v
+
+
+class _Statistics(object):
+
+    def __init__(self):
+        self.count = 0
+        self.output_bytes = 0
+        self.retained = collections.defaultdict(int)
+
+    def add(self, output_bytes, retained):
+        self.count += 1
+        self.output_bytes += output_bytes
+        for name, nbytes in six.iteritems(retained):
+            self.retained[name] += nbytes
+
+
+class MemoryHook(function.FunctionHook):
+    """Function hook for measuring memory held by computational graphs.
+
+    This hook measures, for each function call, the size of output arrays
+    newly allocated by the function and the size of arrays retained by the
+    function as its attributes (e.g. ``col`` of convolution, ``indexes`` of
+    max pooling, ``mask`` of dropout, ``x_hat`` of batch normalization and
+    ``y`` of activation functions), which are kept until the function is
+    released, typically after backward. Arrays sharing memory with the inputs
+    or outputs of the function are not counted as retained. The results are
+    aggregated by the labels of functions and by the paths of links calling
+    them without recording the history of calls, so the hook can be enabled
+    for whole epochs of training. This hook also tracks the total size of the
+    arrays held by the functions and their output variables that are alive,
+    and records its peak, which approximates the peak memory consumption of
+    computational graphs.
+
+    The path of a link is resolved by searching the call stack for the
+    innermost method of a link under the given root link. Functions called
+    outside of the links are aggregated under the path ``None``. Since the
+    outputs of a function are inspected on the next call of this hook, the
+    outputs released before that are not counted.
+
+    .. admonition:: Example
+
+       >>> model = L.Classifier(L.Linear(3, 2))
+       >>> x = chainer.Variable(np.zeros((1, 3), 'f'))
+       >>> t = chainer.Variable(np.zeros((1,), 'i'))
+       >>> hook = chainer.function_hooks.MemoryHook(model)
+       >>> with hook:
+       ...     model(x, t).backward()
+       >>> hook.print_report()  # doctest: +SKIP
+
+    Args:
+        link (~chainer.Link): Root link used to resolve the paths of links.
+            If it is ``None``, functions are aggregated only by their labels.
+
+    """
+
+    name = 'MemoryHook'
+
+    def __init__(self, link=None):
+        self._paths = {}
+        self._codes = set()
+        if link is not None:
+            for path, l in link.namedlinks():
+                self._paths[id(l)] = path
+                for cls in type(l).__mro__:
+                    for value in vars(cls).values():
+                        code = getattr(value, '__code__', None)
+                        if code is not None:
+                            self._codes.add(code)
+        self._stats = {}
+        self._current_bytes = 0
+        self._peak_bytes = 0
+        self._pending = []
+        self._refs = set()
+
+    def __exit__(self, *args):
+        self._flush()
+        super(MemoryHook, self).__exit__(*args)
+
+    def _find_link_path(self):
+        paths = self._paths
+        if not paths:
+            return None
+        codes = self._codes
+        frame = sys._getframe(2)
+        while frame is not None:
+            # Local variables are only looked up in the methods of links,
+            # since it makes a snapshot of them kept by the frame
+            if frame.f_code in codes:
+                path = paths.get(id(frame.f_locals.get('self')))
+                if path is not None:
+                    return path
+            frame = frame.f_back
+        return None
+
+    def _track(self, obj, nbytes):
+        # Counts nbytes as alive until obj is released
+        self._current_bytes += nbytes
+        if self._current_bytes > self._peak_bytes:
+            self._peak_bytes = self._current_bytes
+
+        def release(ref):
+            self._refs.discard(ref)
+            self._current_bytes -= nbytes
+
+        self._refs.add(weakref.ref(obj, release))
+
+    def _flush(self):
+        # Outputs of functions are only available after their calls, so the
+        # measurements are completed on the next call of this hook
+        pending = self._pending
+        self._pending = []
+        for func, in_data, path in pending:
+            owners = set([_owner_id(x) for x in in_data])
+
+            output_bytes = 0
+            outputs = getattr(func, 'outputs', None)
+            if outputs is not None:
+                for y_ref in outputs:
+                    y = y_ref()
+                    if y is None:
+                        continue
+                    owner = _owner_id(y.data)
+                    if owner in owners:
+                        continue
+                    owners.add(owner)
+                    nbytes = y.data.nbytes
+                    output_bytes += nbytes
+                    self._track(y, nbytes)
+
+            retained = {}
+            for name, x in _retained_arrays(func):
+                owner = _owner_id(x)
+                if owner in owners:
+                    continue
+                owners.add(owner)
+                retained[name] = retained.get(name, 0) + x.nbytes
+            retained_bytes = sum(retained.values())
+            if retained_bytes:
+                self._track(func, retained_bytes)
+
+            key = func.label, path
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _Statistics()
+            stats.add(output_bytes, retained)
+
+    def forward_preprocess(self, function, in_data):
+        self._flush()
+
+    def forward_postprocess(self, function, in_data):
+        self._pending.append((function, in_data, self._find_link_path()))
+
+    def backward_preprocess(self, function, in_data, out_grad):
+        self._flush()
+
+    @property
+    def current_bytes(self):
+        """Total size of the arrays held by live functions and outputs."""
+        self._flush()
+        return self._current_bytes
+
+    @property
+    def peak_bytes(self):
+        """Peak of :attr:`current_bytes`."""
+        self._flush()
+        return self._peak_bytes
+
+    def summary(self, key='label'):
+        """Aggregates the measurement results.
+
+        Args:
+            key (str): ``'label'`` to aggregate the results by the labels of
+                functions, or ``'link'`` to aggregate them by the paths of
+                links.
+
+        Returns:
+            collections.OrderedDict: Dictionary mapping each label or path to
+            a dictionary of the number of calls (``'count'``), the total size
+            of outputs (``'output_bytes'``) and the total size of retained
+            arrays (``'retained_bytes'``) in bytes. The entries are sorted in
+            the descending order of the total size.
+
+        """
+        if key not in ('label', 'link'):
+            raise ValueError('key must be either \'label\' or \'link\'')
+        self._flush()
+        index = 0 if key == 'label' else 1
+        stats = {}
+        for key, entry in six.iteritems(self._stats):
+            s = stats.setdefault(key[index], {
+                'count': 0, 'output_bytes': 0, 'retained_bytes': 0})
+            s['count'] += entry.count
+            s['output_bytes'] += entry.output_bytes
+            s['retained_bytes'] += sum(entry.retained.values())
+        return collections.OrderedDict(sorted(
+            stats.items(),
+            key=lambda kv: -(kv[1]['output_bytes'] + kv[1]['retained_bytes'])))
+
+    def retained_bytes(self):
+        """Returns the total size of retained arrays per attribute name."""
+        self._flush()
+        ret = collections.defaultdict(int)
+        for entry in six.itervalues(self._stats):
+            for name, nbytes in six.iteritems(entry.retained):
+                ret[name] += nbytes
+        return dict(ret)
+
+    def print_report(self, key='label', file=sys.stdout):
+        """Prints the summary of the measurement results as a table.
+
+        Args:
+            key (str): ``'label'`` or ``'link'``. See :meth:`summary`.
+            file: Output file-like object.
+
+        """
+        summary = self.summary(key)
+        print('{:<40} {:>8} {:>14} {:>14}'.format(
+            key, 'count', 'output bytes', 'retained bytes'), file=file)
+        for name, s in summary.items():
+            print('{:<40} {:>8} {:>14} {:>14}'.format(
+                str(name), s['count'], s['output_bytes'],
+                s['retained_bytes']), file=file)
+        print('peak bytes: {}'.format(self.peak_bytes), file=file)
@@ -0,0 +1,262 @@
+from __future__ import print_function
+import collections
+import json
+import math
+import sys
+import time
+
+import numpy
+import six
+
+from chainer.function_hooks import timer
+from chainer.functions.connection import convolution_2d
+from chainer.functions.connection import deconvolution_2d
+from chainer.functions.connection import linear
+from chainer.utils import conv
+
+
+# Elapsed times are counted in bins of a logarithmic scale, so that their
+# percentiles are estimated in fixed memory with a relative error of about
+# 6% (i.e. half of a bin)
+_bins_per_decade = 20
+_min_log_time = -7  # 100 ns
+_n_bins = _bins_per_decade * 11  # up to 10000 s
+
+
+def _bin_index(t):
+    if t <= 0:
+        return 0
+    i = int((math.log10(t) - _min_log_time) * _bins_per_decade) + 1
+    return min(max(i, 0), _n_bins + 1)
+
+
+def _bin_value(i):
+    # Returns the geometric center of the bin
+    return 10 ** (_min_log_time + (i - 0.5) / _bins_per_decade)
+
+
+def _linear_flops(function, in_data):
+    x, W = in_data[:2]
+    return 2 * x.size * W.shape[0]
+
+
+def _linear_relu_flops(function, in_data):
+    # ReLU takes one operation per element of the output
+    x, W = in_data[:2]
+    return _linear_flops(function, in_data) + len(x) * W.shape[0]
+
+
+def _convolution_2d_outsize(function, in_data):
+    x, W = in_data[:2]
+    out_c, _, kh, kw = W.shape
+    if conv.get_channel_axis(function.layout, x.ndim) == 1:
+        h, w = x.shape[2:]
+    else:
+        h, w = x.shape[1:3]
+    out_h = conv.get_conv_outsize(h, kh, function.sy, function.ph,
+                                  function.cover_all)
+    out_w = conv.get_conv_outsize(w, kw, function.sx, function.pw,
+                                  function.cover_all)
+    return x.shape[0] * out_c * out_h * out_w
+
+
+def _convolution_2d_flops(function, in_data):
+    W = in_data[1]
+    return 2 * _convolution_2d_outsize(function, in_data) * W[0].size
+
+
+def _convolution_2d_relu_flops(function, in_data):
+    return (_convolution_2d_flops(function, in_data) +
+            _convolution_2d_outsize(function, in_data))
+
+
+def _deconvolution_2d_flops(function, in_data):
+    x, W = in_data[:2]
+    return 2 * x.size * W[0].size
+
+
+class _Statistics(object):
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.
+        self.min = float('inf')
+        self.max = 0.
+        self.flops = 0
+        self.bytes = 0
+        self.hist = numpy.zeros(_n_bins + 2, dtype=numpy.int64)
+
+    def add(self, elapsed_time, flops, nbytes):
+        self.count += 1
+        self.total += elapsed_time
+        self.min = min(self.min, elapsed_time)
+        self.max = max(self.max, elapsed_time)
+        self.flops += flops
+        self.bytes += nbytes
+        self.hist[_bin_index(elapsed_time)] += 1
+
+    def percentile(self, q):
+        rank = q / 100. * self.count
+        i = int(numpy.searchsorted(numpy.cumsum(self.hist), rank))
+        return min(max(_bin_value(i), self.min), self.max)
+
+
+class ProfileHook(timer.TimerHook):
+    """Function hook for profiling functions with bounded memory.
+
+    This hook measures elapsed times of functions in the same way as
+    :class:`TimerHook`, but aggregates them by the labels of functions and
+    the phases (``'forward'`` or ``'backward'``) into statistics of a fixed
+    size instead of recording the history of calls. It can therefore be
+    enabled for whole epochs of training.
+
+    The statistics include the numbers of calls, the total, mean and
+    percentiles of elapsed times, and the estimated numbers of floating point
+    operations and bytes of input arrays. The percentiles are estimated from
+    histograms on a logarithmic scale. The number of operations is estimated
+    from the shapes of input arrays by the function registered to
+    :attr:`flop_estimators` for the class of each function or its nearest
+    base class, or by the total number of elements of the input arrays (i.e.
+    as an elementwise operation) if no estimator is registered. The backward
+    computation of a registered function is assumed to take twice the
+    operations of the forward one.
+
+    Additionally, the last ``max_trace_events`` calls are kept to be dumped
+    into the trace event format of Chrome (viewed by ``chrome://tracing``).
+
+    Args:
+        max_trace_events (int): Maximum number of calls kept for the trace.
+
+    Attributes:
+        flop_estimators (dict): Dictionary mapping classes of functions to
+            functions estimating the numbers of floating point operations of
+            their forward computations. Each estimator takes a function and
+            its input arrays.
+
+    """
+
+    name = 'ProfileHook'
+
+    flop_estimators = {
+        convolution_2d.Convolution2DFunction: _convolution_2d_flops,
+        convolution_2d.Convolution2DReLUFunction: _convolution_2d_relu_flops,
+        deconvolution_2d.Deconvolution2DFunction: _deconvolution_2d_flops,
+        linear.LinearFunction: _linear_flops,
+        linear.LinearReLUFunction: _linear_relu_flops,
+    }
+
+    def __init__(self, max_trace_events=10000):
+        super(ProfileHook, self).__init__()
+        self._stats = {}
+        self._trace = collections.deque(maxlen=max_trace_events)
+
+    def _preprocess(self):
+        self._timestamp = time.time()
+        super(ProfileHook, self)._preprocess()
+
+    def _get_flop_estimator(self, function):
+        estimators = self.flop_estimators
+        for cls in type(function).__mro__:
+            estimator = estimators.get(cls)
+            if estimator is not None:
+                return estimator
+        return None
+
+    def _estimate_flops(self, function, arrays):
+        estimator = self._get_flop_estimator(function)
+        if estimator is None:
+            return sum(x.size for x in arrays)
+        return estimator(function, arrays)
+
+    def _record(self, function, phase, flops, arrays):
+        elapsed_time = self._elapsed_time()
+        nbytes = sum(x.nbytes for x in arrays)
+        key = function.label, phase
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = _Statistics()
+        stats.add(elapsed_time, flops, nbytes)
+        if self._trace.maxlen != 0:
+            self._trace.append((key, self._timestamp, elapsed_time))
+
+    def forward_postprocess(self, function, in_data):
+        self._record(function, 'forward',
+                     self._estimate_flops(function, in_data), in_data)
+
+    def backward_postprocess(self, function, in_data, out_grad):
+        arrays = [x for x in in_data + out_grad if x is not None]
+        if self._get_flop_estimator(function) is not None:
+            flops = 2 * self._estimate_flops(function, in_data)
+        else:
+            flops = self._estimate_flops(function, arrays)
+        self._record(function, 'backward', flops, arrays)
+
+    def total_time(self):
+        """Returns total elapsed time in seconds."""
+        return sum(s.total for s in six.itervalues(self._stats))
+
+    def summary(self):
+        """Returns the statistics of functions.
+
+        Returns:
+            collections.OrderedDict: Dictionary mapping each pair of the label
+            of a function and the phase to a dictionary of the statistics.
+            The statistics consist of ``'count'``, ``'total'``, ``'mean'``,
+            ``'p50'``, ``'p99'`` (elapsed times in seconds), ``'flops'`` and
+            ``'bytes'``. The entries are sorted in the descending order of
+            the total elapsed time.
+
+        """
+        ret = collections.OrderedDict()
+        for key, s in sorted(six.iteritems(self._stats),
+                             key=lambda kv: -kv[1].total):
+            ret[key] = {
+                'count': s.count,
+                'total': s.total,
+                'mean': s.total / s.count,
+                'p50': s.percentile(50),
+                'p99': s.percentile(99),
+                'flops': s.flops,
+                'bytes': s.bytes,
+            }
+        return ret
+
+    def print_report(self, file=sys.stdout):
+        """Prints the statistics as a table sorted by total elapsed time.
+
+        Args:
+            file: Output file-like object.
+
+        """
+        print('{:<32} {:<8} {:>8} {:>10} {:>10} {:>10} {:>10} {:>9} {:>9}'
+              .format('function', 'phase', 'count', 'total(ms)', 'mean(us)',
+                      'p50(us)', 'p99(us)', 'GFLOP/s', 'GB/s'), file=file)
+        for (label, phase), s in six.iteritems(self.summary()):
+            total = s['total']
+            if total > 0:
+                gflops = s['flops'] / total / 1e9
+                gbytes = s['bytes'] / total / 1e9
+            else:
+                gflops = gbytes = 0.
+            print('{:<32} {:<8} {:>8} {:>10.3f} {:>10.1f} {:>10.1f} '
+                  '{:>10.1f} {:>9.2f} {:>9.2f}'.format(
+                      label, phase, s['count'], total * 1e3, s['mean'] * 1e6,
+                      s['p50'] * 1e6, s['p99'] * 1e6, gflops, gbytes),
+                  file=file)
+
+    def dump_trace(self, file):
+        """Dumps the recent calls into the trace event format of Chrome.
+
+        Args:
+            file: Output file-like object or the path of the output file.
+
+        """
+        events = [{'name': label, 'cat': phase, 'ph': 'X', 'pid': 0,
+                   'tid': 0, 'ts': timestamp * 1e6, 'dur': elapsed * 1e6}
+                  for (label, phase), timestamp, elapsed in self._trace]
+        trace = {'traceEvents': events, 'displayTimeUnit': 'ms'}
+        if isinstance(file, six.string_types):
+            with open(file, 'w') as f:
+                json.dump(trace, f)
+        else:
+            json.dump(trace, file)
@@ -36,17 +36,20 @@ class TimerHook(function.FunctionHook):
         self.xp = cuda.get_array_module(*(in_data + out_grad))
         self._preprocess()
 
-    def _postprocess(self, function):
+    def _elapsed_time(self):
+        # Returns the time elapsed since the preprocess in seconds
         if self.xp == numpy:
             self.stop = time.time()
-            elapsed_time = self.stop - self.start
+            return self.stop - self.start
         else:
             self.stop.record()
             self.stop.synchronize()
             # Note that `get_elapsed_time` returns result in milliseconds
-            elapsed_time = cuda.cupy.cuda.get_elapsed_time(
-                self.start, self.stop) * 1000
-        self.call_history.append((function, elapsed_time))
+            return cuda.cupy.cuda.get_elapsed_time(
+                self.start, self.stop) / 1000
+
+    def _postprocess(self, function):
+        self.call_history.append((function, self._elapsed_time()))
 
     def forward_postprocess(self, function, in_data):
         xp = cuda.get_array_module(*in_data)
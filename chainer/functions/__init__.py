@@ -67,6 +67,7 @@ from chainer.functions.pooling import max_pooling_2d
 from chainer.functions.pooling import roi_pooling_2d
 from chainer.functions.pooling import spatial_pyramid_pooling_2d
 from chainer.functions.pooling import unpooling_2d
+from chainer.functions.util import forget
 from chainer.links.activation import prelu as links_prelu
 from chainer.links.connection import bilinear as links_bilinear
 from chainer.links.connection import convolution_2d as links_convolution_2d
@@ -139,9 +140,11 @@ Where = where.Where
 where = where.where
 
 bilinear = bilinear.bilinear
+convolution_2d_relu = convolution_2d.convolution_2d_relu
 convolution_2d = convolution_2d.convolution_2d
 deconvolution_2d = deconvolution_2d.deconvolution_2d
 embed_id = embed_id.embed_id
+linear_relu = linear.linear_relu
 linear = linear.linear
 
 Accuracy = accuracy.Accuracy
@@ -234,6 +237,9 @@ spatial_pyramid_pooling_2d = \
 Unpooling2D = unpooling_2d.Unpooling2D
 unpooling_2d = unpooling_2d.unpooling_2d
 
+Forget = forget.Forget
+forget = forget.forget
+
 # Import for backward compatibility
 PReLU = links_prelu.PReLU
 
@@ -3,7 +3,9 @@ from six import moves
 
 from chainer import cuda
 from chainer import function
+from chainer import utils
 from chainer.utils import conv
+from chainer.utils import conv_algorithm
 from chainer.utils import type_check
 
 if cuda.cudnn_enabled:
@@ -31,11 +33,14 @@ def _pair(x):
 
 class Convolution2DFunction(function.Function):
 
-    def __init__(self, stride=1, pad=0, use_cudnn=True, cover_all=False):
+    def __init__(self, stride=1, pad=0, use_cudnn=True, cover_all=False,
+                 cpu_algorithm=None):
         self.sy, self.sx = _pair(stride)
         self.ph, self.pw = _pair(pad)
         self.use_cudnn = use_cudnn
         self.cover_all = cover_all
+        self.cpu_algorithm = cpu_algorithm
+        self.layout = conv.get_layout()
 
     def check_type_forward(self, in_types):
         n_in = in_types.size()
@@ -48,7 +53,8 @@ class Convolution2DFunction(function.Function):
             w_type.dtype.kind == 'f',
             x_type.ndim == 4,
             w_type.ndim == 4,
-            x_type.shape[1] == w_type.shape[1],
+            x_type.shape[conv.get_channel_axis(self.layout, 4)] ==
+            w_type.shape[1],
         )
 
         if n_in.eval() == 3:
@@ -62,17 +68,22 @@ class Convolution2DFunction(function.Function):
     def forward_cpu(self, inputs):
         x, W = inputs[:2]
         b = inputs[2] if len(inputs) == 3 else None
-        kh, kw = W.shape[2:]
-        self.col = conv.im2col_cpu(
-            x, kh, kw, self.sy, self.sx, self.ph, self.pw,
-            cover_all=self.cover_all)
-        y = numpy.tensordot(
-            self.col, W, ((1, 2, 3), (1, 2, 3))).astype(x.dtype)
+        if self.layout == 'NHWC':
+            y = conv_algorithm.channels_last.forward(
+                x, W, self.sy, self.sx, self.ph, self.pw, self.cover_all)
+            if b is not None:
+                y += b
+            return y,
+
+        y = conv_algorithm.forward(
+            x, W, self.sy, self.sx, self.ph, self.pw,
+            cover_all=self.cover_all, algorithm=self.cpu_algorithm)
         if b is not None:
-            y += b
-        return numpy.rollaxis(y, 3, 1),
+            y += b[:, None, None]
+        return y,
 
     def forward_gpu(self, inputs):
+        conv.check_cpu_layout(self.layout)
         x, W = inputs[:2]
         b = inputs[2] if len(inputs) == 3 else None
 
@@ -126,11 +137,12 @@ class Convolution2DFunction(function.Function):
                     one.data, y_desc.value, y.data.ptr)
         else:
             # Implementation using im2col
-            self.col = conv.im2col_gpu(
+            col = conv.im2col_gpu(
                 x, kh, kw, self.sy, self.sx, self.ph, self.pw,
                 cover_all=self.cover_all)
+            self.col = None if conv.get_recompute() else col
             W_mat = W.reshape(out_c, -1)
-            col_mats = self.col.reshape(n, -1, out_h * out_w)
+            col_mats = col.reshape(n, -1, out_h * out_w)
             y_mats = y.reshape(n, out_c, -1)
             # TODO(beam2d): Use streams or batch gemm
             for i in moves.range(n):
@@ -145,13 +157,25 @@ class Convolution2DFunction(function.Function):
         x, W = inputs[:2]
         b = inputs[2] if len(inputs) == 3 else None
         gy = grad_outputs[0]
-        h, w = x.shape[2:]
+        if self.layout == 'NHWC':
+            h, w = x.shape[1:3]
+            algorithm = conv_algorithm.channels_last
+            gW = algorithm.backward_filter(
+                x, gy, W, self.sy, self.sx, self.ph, self.pw, self.cover_all)
+            gx = algorithm.backward_data(
+                gy, W, self.sy, self.sx, self.ph, self.pw, h, w)
+            if b is None:
+                return gx, gW
+            else:
+                return gx, gW, gy.sum(axis=(0, 1, 2))
 
-        gW = numpy.tensordot(
-            gy, self.col, ((0, 2, 3), (0, 4, 5))).astype(W.dtype)
-        gcol = numpy.tensordot(W, gy, (0, 1)).astype(x.dtype)
-        gcol = numpy.rollaxis(gcol, 3)
-        gx = conv.col2im_cpu(gcol, self.sy, self.sx, self.ph, self.pw, h, w)
+        h, w = x.shape[2:]
+        gW = conv_algorithm.backward_filter(
+            x, gy, W, self.sy, self.sx, self.ph, self.pw,
+            cover_all=self.cover_all, algorithm=self.cpu_algorithm)
+        gx = conv_algorithm.backward_data(
+            gy, W, self.sy, self.sx, self.ph, self.pw, h, w,
+            cover_all=self.cover_all, algorithm=self.cpu_algorithm)
 
         if b is None:
             return gx, gW
@@ -221,8 +245,13 @@ class Convolution2DFunction(function.Function):
                     handle, one.data, gy_desc.value, gy.data.ptr,
                     zero.data, self.bias_desc.value, gb.data.ptr)
         else:
+            col = self.col
+            if col is None:
+                col = conv.im2col_gpu(
+                    x, kh, kw, self.sy, self.sx, self.ph, self.pw,
+                    cover_all=self.cover_all)
             gW_mat = gW.reshape(out_c, c * kh * kw)
-            col_mats = self.col.reshape(n, c * kh * kw, out_h * out_w)
+            col_mats = col.reshape(n, c * kh * kw, out_h * out_w)
             gy_mats = gy.reshape(n, out_c, out_h * out_w)
             # TODO(beam2d): Use streams or batch gemm
             gW_mat[...] = 0
@@ -230,7 +259,7 @@ class Convolution2DFunction(function.Function):
                 gW_mat += cuda.cupy.dot(gy_mats[i], col_mats[i].T)
 
             W_mat = W.reshape(out_c, -1)
-            gcol = cuda.cupy.empty_like(self.col)
+            gcol = cuda.cupy.empty_like(col)
             gcol_mats = gcol.reshape(n, c * kh * kw, out_h * out_w)
 
             for i in moves.range(n):
@@ -248,8 +277,38 @@ class Convolution2DFunction(function.Function):
             return gx, gW, gb
 
 
+class Convolution2DReLUFunction(Convolution2DFunction):
+
+    """Convolution followed by ReLU applied in place of its output."""
+
+    def forward_cpu(self, inputs):
+        y, = super(Convolution2DReLUFunction, self).forward_cpu(inputs)
+        numpy.maximum(y, 0, out=y)
+        self.y = y
+        return y,
+
+    def forward_gpu(self, inputs):
+        y, = super(Convolution2DReLUFunction, self).forward_gpu(inputs)
+        cuda.cupy.maximum(y, 0, out=y)
+        self.y = y
+        return y,
+
+    def backward_cpu(self, inputs, grad_outputs):
+        gy = utils.force_array(grad_outputs[0] * (self.y > 0))
+        return super(Convolution2DReLUFunction, self).backward_cpu(
+            inputs, (gy,))
+
+    def backward_gpu(self, inputs, grad_outputs):
+        gy = cuda.elementwise(
+            'T y, T gy', 'T gx',
+            'gx = y > 0 ? gy : (T)0',
+            'relu_bwd')(self.y, grad_outputs[0])
+        return super(Convolution2DReLUFunction, self).backward_gpu(
+            inputs, (gy,))
+
+
 def convolution_2d(x, W, b=None, stride=1, pad=0, use_cudnn=True,
-                   cover_all=False):
+                   cover_all=False, cpu_algorithm=None):
     """Two-dimensional convolution function.
 
     This is an implementation of two-dimensional convolution in ConvNets.
@@ -279,7 +338,11 @@ def convolution_2d(x, W, b=None, stride=1, pad=0, use_cudnn=True,
             available.
         cover_all (bool): If True, all spatial locations are convoluted into
             some output pixels. It may make the output size larger.
-
+        cpu_algorithm (str): Name of the algorithm used on CPU, which is one
+            of the keys of :data:`chainer.utils.conv_algorithm.algorithms`
+            (e.g. ``'im2col'``, ``'direct_1x1'`` or ``'winograd'``). If it is
+            ``None``, an applicable algorithm is chosen automatically. See
+            :func:`chainer.utils.conv_algorithm.set_autotune`.
 
     Returns:
         ~chainer.Variable: Output variable.
@@ -306,10 +369,40 @@ def convolution_2d(x, W, b=None, stride=1, pad=0, use_cudnn=True,
     If the bias vector is given, then it is added to all spatial locations of
     the output of convolution.
 
+    If the layout is set to ``'NHWC'`` by
+    :func:`chainer.utils.conv.set_layout`, the input and the output have the
+    shapes :math:`(n, h, w, c_I)` and :math:`(n, h_O, w_O, c_O)` instead.
+
     .. seealso:: :class:`Convolution2D`
 
     """
-    func = Convolution2DFunction(stride, pad, use_cudnn, cover_all)
+    func = Convolution2DFunction(stride, pad, use_cudnn, cover_all,
+                                 cpu_algorithm)
+    if b is None:
+        return func(x, W)
+    else:
+        return func(x, W, b)
+
+
+def convolution_2d_relu(x, W, b=None, stride=1, pad=0, use_cudnn=True,
+                        cover_all=False, cpu_algorithm=None):
+    """Two-dimensional convolution followed by ReLU.
+
+    It computes ``relu(convolution_2d(x, W, b, ...))``, but the bias and the
+    rectification are applied in place of the output of convolution, so no
+    temporary array of the output size is allocated. It is also usable in
+    the inference mode (see :func:`chainer.inference_mode`).
+
+    The arguments are the same as :func:`convolution_2d`.
+
+    Returns:
+        ~chainer.Variable: Output variable.
+
+    .. seealso:: :func:`convolution_2d`, :func:`~chainer.functions.relu`
+
+    """
+    func = Convolution2DReLUFunction(stride, pad, use_cudnn, cover_all,
+                                     cpu_algorithm)
     if b is None:
         return func(x, W)
     else:
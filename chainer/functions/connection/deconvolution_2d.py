@@ -5,6 +5,7 @@ from chainer import cuda
 from chainer import function
 from chainer.functions.connection import convolution_2d
 from chainer.utils import conv
+from chainer.utils import conv_algorithm
 from chainer.utils import type_check
 
 if cuda.cudnn_enabled:
@@ -30,10 +31,12 @@ def _pair(x):
 
 class Deconvolution2DFunction(function.Function):
 
-    def __init__(self, stride=1, pad=0, outsize=None, use_cudnn=True):
+    def __init__(self, stride=1, pad=0, outsize=None, use_cudnn=True,
+                 cpu_algorithm=None):
         self.sy, self.sx = _pair(stride)
         self.ph, self.pw = _pair(pad)
         self.use_cudnn = use_cudnn
+        self.cpu_algorithm = cpu_algorithm
         self.outh, self.outw = (None, None) if outsize is None else outsize
 
     def check_type_forward(self, in_types):
@@ -75,18 +78,14 @@ class Deconvolution2DFunction(function.Function):
         b = inputs[2] if len(inputs) == 3 else None
         kh, kw = W.shape[2:]
         _, _, h, w = x.shape
-        gcol = numpy.tensordot(W, x, (0, 1)).astype(x.dtype)
-        # - k, m, n: shape of out_channel
-        # - b: number of inputs
-        # - h, w: height and width of kernels
-        # k, m, n, b, h, w -> b, k, m, n, h, w
-        gcol = numpy.rollaxis(gcol, 3)
         if self.outh is None:
             self.outh = conv.get_deconv_outsize(h, kh, self.sy, self.ph)
         if self.outw is None:
             self.outw = conv.get_deconv_outsize(w, kw, self.sx, self.pw)
-        y = conv.col2im_cpu(
-            gcol, self.sy, self.sx, self.ph, self.pw, self.outh, self.outw)
+        # Deconvolution is the backward computation of convolution
+        y = conv_algorithm.backward_data(
+            x, W, self.sy, self.sx, self.ph, self.pw, self.outh, self.outw,
+            algorithm=self.cpu_algorithm)
         # b, k, h, w
         if b is not None:
             y += b.reshape(1, b.size, 1, 1)
@@ -166,12 +165,12 @@ class Deconvolution2DFunction(function.Function):
         x, W = inputs[:2]
         b = inputs[2] if len(inputs) == 3 else None
         gy = grad_outputs[0]
-        kh, kw = W.shape[2:]
-        col = conv.im2col_cpu(
-            gy, kh, kw, self.sy, self.sx, self.ph, self.pw)
-        gW = numpy.tensordot(x, col, ([0, 2, 3], [0, 4, 5])).astype(W.dtype)
-        gx = numpy.tensordot(col, W, ([1, 2, 3], [1, 2, 3])).astype(x.dtype)
-        gx = numpy.rollaxis(gx, 3, 1)
+        gW = conv_algorithm.backward_filter(
+            gy, x, W, self.sy, self.sx, self.ph, self.pw,
+            algorithm=self.cpu_algorithm)
+        gx = conv_algorithm.forward(
+            gy, W, self.sy, self.sx, self.ph, self.pw,
+            algorithm=self.cpu_algorithm)
 
         if b is None:
             return gx, gW
@@ -269,7 +268,7 @@ class Deconvolution2DFunction(function.Function):
 
 
 def deconvolution_2d(x, W, b=None, stride=1, pad=0,
-                     outsize=None, use_cudnn=True):
+                     outsize=None, use_cudnn=True, cpu_algorithm=None):
     """Two dimensional deconvolution function.
 
     This is an implementation of two-dimensional deconvolution.
@@ -291,7 +290,8 @@ def deconvolution_2d(x, W, b=None, stride=1, pad=0,
             input size, stride and pad.
         use_cudnn (bool): If ``True``, then this function uses cuDNN if
             available.
-
+        cpu_algorithm (str): Name of the convolution algorithm used on CPU.
+            See :func:`~chainer.functions.convolution_2d`.
 
     The filter weight has four dimensions :math:`(c_I, c_O, k_H, k_W)`
     which indicate the number of the number of input channels, output channels,
@@ -310,7 +310,8 @@ def deconvolution_2d(x, W, b=None, stride=1, pad=0,
        w_O &= s_X (w - 1) + k_W - 2p_W.
 
     """
-    func = Deconvolution2DFunction(stride, pad, outsize, use_cudnn)
+    func = Deconvolution2DFunction(stride, pad, outsize, use_cudnn,
+                                   cpu_algorithm)
     if b is None:
         return func(x, W)
     else:
@@ -1,16 +1,17 @@
 import numpy
-import six
 
 import chainer
 from chainer import cuda
 from chainer import function
+from chainer.utils import sparse
 from chainer.utils import type_check
 
 
 class EmbedIDFunction(function.Function):
 
-    def __init__(self, ignore_label=None):
+    def __init__(self, ignore_label=None, sparse_grad=False):
         self.ignore_label = ignore_label
+        self.sparse_grad = sparse_grad
 
     def check_type_forward(self, in_types):
         type_check.expect(in_types.size() == 2)
@@ -45,17 +46,21 @@ class EmbedIDFunction(function.Function):
         xp = cuda.get_array_module(*inputs)
         x, W = inputs
         gy = grad_outputs[0]
-        gW = xp.zeros_like(W)
 
         if xp is numpy:
-            # It is equivalent to `numpy.add.at(gW, x, gy)` but ufunc.at is
-            # too slow.
-            for ix, igy in six.moves.zip(x.ravel(),
-                                         gy.reshape(x.size, -1)):
-                if ix == self.ignore_label:
-                    continue
-                gW[ix] += igy
+            # Sums up the rows of gy by sorting their IDs instead of
+            # `numpy.add.at`, which is too slow.
+            x = x.ravel()
+            gy = gy.reshape(x.size, -1)
+            if self.ignore_label is not None:
+                mask = x != self.ignore_label
+                x = x[mask]
+                gy = gy[mask]
+            gW = sparse.scatter_add(x, gy, W.shape)
+            if not self.sparse_grad:
+                gW = gW.to_dense()
         else:
+            gW = xp.zeros_like(W)
             if self.ignore_label is None:
                 cuda.elementwise(
                     'T gy, int32 x, int32 n_out', 'raw T gW',
@@ -77,7 +82,7 @@ class EmbedIDFunction(function.Function):
         return None, gW
 
 
-def embed_id(x, W, ignore_label=None):
+def embed_id(x, W, ignore_label=None, sparse_grad=False):
     """Efficient linear function for one-hot input.
 
     This function implements so called *word embedding*. It takes two
@@ -94,6 +99,11 @@ def embed_id(x, W, ignore_label=None):
             word embeddings).
         ignore_label (int or None): If ``ignore_label`` is an int value,
             ``i``-th column of return value is filled with ``0``.
+        sparse_grad (bool): If ``True``, the gradient of ``W`` on CPU is a
+            :class:`~chainer.utils.sparse.RowSparseArray` holding only the
+            rows of the given IDs. It is added to the dense gradient array of
+            ``W`` if it already exists, so the cost of backward does not
+            depend on the vocabulary size.
 
     Returns:
         ~chainer.Variable: Output variable.
@@ -101,4 +111,5 @@ def embed_id(x, W, ignore_label=None):
     .. seealso:: :class:`EmbedID`
 
     """
-    return EmbedIDFunction(ignore_label=ignore_label)(x, W)
+    return EmbedIDFunction(ignore_label=ignore_label,
+                           sparse_grad=sparse_grad)(x, W)
@@ -1,4 +1,6 @@
+from chainer import cuda
 from chainer import function
+from chainer import utils
 from chainer.utils import type_check
 
 
@@ -53,6 +55,22 @@ class LinearFunction(function.Function):
             return gx, gW
 
 
+class LinearReLUFunction(LinearFunction):
+
+    """Linear function followed by ReLU applied in place of its output."""
+
+    def forward(self, inputs):
+        y, = super(LinearReLUFunction, self).forward(inputs)
+        xp = cuda.get_array_module(y)
+        xp.maximum(y, 0, out=y)
+        self.y = y
+        return y,
+
+    def backward(self, inputs, grad_outputs):
+        gy = utils.force_array(grad_outputs[0] * (self.y > 0))
+        return super(LinearReLUFunction, self).backward(inputs, (gy,))
+
+
 def linear(x, W, b=None):
     """Linear function, or affine transformation.
 
@@ -77,3 +95,28 @@ def linear(x, W, b=None):
         return LinearFunction()(x, W)
     else:
         return LinearFunction()(x, W, b)
+
+
+def linear_relu(x, W, b=None):
+    """Linear function followed by ReLU.
+
+    It computes ``relu(linear(x, W, b))``, but the bias and the rectification
+    are applied in place of the output of the matrix product, so no temporary
+    array of the output size is allocated. It is also usable in the
+    inference mode (see :func:`chainer.inference_mode`).
+
+    Args:
+        x (~chainer.Variable): Input variable.
+        W (~chainer.Variable): Weight variable of shape ``(M, N)``.
+        b (~chainer.Variable): Bias variable (optional) of shape ``(M,)``.
+
+    Returns:
+        ~chainer.Variable: Output variable.
+
+    .. seealso:: :func:`linear`, :func:`~chainer.functions.relu`
+
+    """
+    if b is None:
+        return LinearReLUFunction()(x, W)
+    else:
+        return LinearReLUFunction()(x, W, b)
@@ -1,16 +1,17 @@
 import numpy
-import six
 
 from chainer import cuda
 from chainer import function
+from chainer.utils import sparse
 from chainer.utils import type_check
 
 
 class NegativeSamplingFunction(function.Function):
 
-    def __init__(self, sampler, sample_size):
+    def __init__(self, sampler, sample_size, sparse_grad=False):
         self.sampler = sampler
         self.sample_size = sample_size
+        self.sparse_grad = sparse_grad
 
     def _make_samples(self, t):
         if hasattr(self, 'samples'):
@@ -40,12 +41,11 @@ class NegativeSamplingFunction(function.Function):
         x, t, W = inputs
         self._make_samples(t)
 
-        loss = numpy.float32(0.0)
-        for ix, k in six.moves.zip(x, self.samples):
-            w = W[k]
-            f = w.dot(ix)
-            f[0] *= -1  # positive sample
-            loss += numpy.sum(numpy.logaddexp(f, 0))
+        # Scores of all the samples by a batched matrix-vector product
+        self.wx = numpy.einsum('ijk,ik->ij', W.take(self.samples, axis=0), x)
+        f = self.wx.copy()
+        f[:, 0] *= -1  # positive samples
+        loss = numpy.logaddexp(f, 0).sum(dtype=numpy.float32)
         return numpy.array(loss, numpy.float32),
 
     def forward_gpu(self, inputs):
@@ -92,20 +92,20 @@ class NegativeSamplingFunction(function.Function):
         x, t, W = inputs
         gloss, = grads
 
-        gx = numpy.zeros_like(x)
-        gW = numpy.zeros_like(W)
-        for i, (ix, k) in enumerate(six.moves.zip(x, self.samples)):
-            w = W[k]
-            f = w.dot(ix)
-
-            # g == -y * gloss / (1 + exp(yf))
-            f[0] *= -1
-            g = gloss / (1 + numpy.exp(-f))
-            g[0] *= -1
-
-            gx[i] = g.dot(w)
-            for ik, ig in six.moves.zip(k, g):
-                gW[ik] += ig * ix
+        # g == -y * gloss / (1 + exp(y * wx))
+        g = self.wx.copy()
+        g[:, 0] *= -1
+        numpy.negative(g, out=g)
+        numpy.exp(g, out=g)
+        g += 1
+        numpy.divide(gloss, g, out=g)
+        g[:, 0] *= -1
+
+        gx = numpy.einsum('ij,ijk->ik', g, W.take(self.samples, axis=0))
+        gW = sparse.scatter_add(
+            self.samples, g[:, :, None] * x[:, None, :], W.shape)
+        if not self.sparse_grad:
+            gW = gW.to_dense()
         return gx, None, gW
 
     def backward_gpu(self, inputs, grads):
@@ -155,7 +155,7 @@ class NegativeSamplingFunction(function.Function):
         return gx, None, gW
 
 
-def negative_sampling(x, t, W, sampler, sample_size):
+def negative_sampling(x, t, W, sampler, sample_size, sparse_grad=False):
     """Negative sampling loss function.
 
     In natural language processing, especially language modeling, the number of
@@ -198,6 +198,10 @@ def negative_sampling(x, t, W, sampler, sample_size):
             A :class:`~chainer.utils.WalkerAlias` object built with the power
             distribution of word frequency is recommended.
         sample_size (int): Number of samples.
+        sparse_grad (bool): If ``True``, the gradient of ``W`` on CPU is a
+            :class:`~chainer.utils.sparse.RowSparseArray` holding only the
+            rows of the positive and the sampled words (see
+            :func:`~chainer.functions.embed_id`).
 
     See: `Distributed Representations of Words and Phrases and their\
          Compositionality <http://arxiv.org/abs/1310.4546>`_
@@ -205,4 +209,5 @@ def negative_sampling(x, t, W, sampler, sample_size):
     .. seealso:: :class:`~chainer.links.NegativeSampling`.
 
     """
-    return NegativeSamplingFunction(sampler, sample_size)(x, t, W)
+    return NegativeSamplingFunction(
+        sampler, sample_size, sparse_grad=sparse_grad)(x, t, W)
@@ -2,6 +2,7 @@ import numpy
 
 from chainer import cuda
 from chainer import function
+from chainer.utils import conv
 from chainer.utils import type_check
 
 
@@ -9,6 +10,17 @@ class BatchNormalizationFunction(function.Function):
 
     def __init__(self, eps=1e-5):
         self.eps = eps
+        self.layout = conv.get_layout()
+
+    def _axes(self, x, gamma):
+        # Returns the expander of parameters and the axes of statistics
+        if conv.get_channel_axis(self.layout, x.ndim) == 3 and \
+                gamma.ndim == 1:
+            return (None, None, None), (0, 1, 2)
+        head_ndim = gamma.ndim + 1
+        expander = (None, Ellipsis) + (None,) * (x.ndim - head_ndim)
+        axis = (0,) + tuple(range(head_ndim, x.ndim))
+        return expander, axis
 
     def check_type_forward(self, in_types):
         n_in = in_types.size().eval()
@@ -40,8 +52,7 @@ class BatchNormalizationFunction(function.Function):
         xp = cuda.get_array_module(*inputs)
         x, gamma, beta = inputs[:3]
 
-        head_ndim = gamma.ndim + 1
-        expander = (None, Ellipsis) + (None,) * (x.ndim - head_ndim)
+        expander, axis = self._axes(x, gamma)
         gamma = gamma[expander]
         beta = beta[expander]
 
@@ -49,7 +60,6 @@ class BatchNormalizationFunction(function.Function):
             mean = inputs[3]
             var = inputs[4]
         else:
-            axis = (0,) + tuple(range(head_ndim, x.ndim))
             mean = x.mean(axis=axis)
             var = x.var(axis=axis)
             var += self.eps
@@ -77,11 +87,9 @@ class BatchNormalizationFunction(function.Function):
         x, gamma = inputs[:2]
         gy = grad_outputs[0]
 
-        head_ndim = gamma.ndim + 1
-        expander = (None, Ellipsis) + (None,) * (x.ndim - head_ndim)
+        expander, axis = self._axes(x, gamma)
         m = gamma.dtype.type(x.size // gamma.size)
 
-        axis = (0,) + tuple(range(head_ndim, x.ndim))
         gbeta = gy.sum(axis=axis)
         ggamma = (gy * self.x_hat).sum(axis=axis)
 
@@ -116,6 +124,9 @@ def batch_normalization(x, gamma, beta, eps=1e-5):
     as the first two dimensions of its shape. The input can have more than two
     dimensions, where the remained dimensions are considered as spatial
     dimensions, which are considered as a part of the batch size.
+    If the layout is set to ``'NHWC'`` by
+    :func:`chainer.utils.conv.set_layout`, the channels of four-dimensional
+    inputs are the last dimension instead.
 
     Args:
         x (Variable): The input variable.
@@ -3,13 +3,30 @@ import six
 
 from chainer import cuda
 from chainer import function
+from chainer.utils import conv
 from chainer.utils import type_check
 
 
-def _cu_conv_sum(y, x, n):
-    # Convolutional sum
+def _cpu_conv_sum(x, n, axis):
+    # Sums up x over windows of n channels along the axis by adding the
+    # shifted slices, so that an infinite or huge channel does not leak out of
+    # its windows as a running sum would let it do
+    half_n = n // 2
+    c = x.shape[axis]
+    head = (slice(None),) * axis
+    # Accumulation in half precision loses too many digits
+    y = x.astype(numpy.promote_types(x.dtype, 'f'))
+    for i in six.moves.range(1, min(half_n, c - 1) + 1):
+        y[head + (slice(i, None),)] += x[head + (slice(None, -i),)]
+        y[head + (slice(None, -i),)] += x[head + (slice(i, None),)]
+    return y.astype(x.dtype, copy=False)
+
+
+def _cu_conv_sum(y, x, n, axis):
+    # Convolutional sum along the axis
     # TODO(beam2d): Use scan computation
-    rdim = x.size // (x.shape[0] * x.shape[1])
+    N = x.shape[axis]
+    rdim = x.size // (numpy.prod(x.shape[:axis], dtype=int) * N)
     cuda.elementwise(
         'raw T x, int32 rdim, int32 N, int32 n_', 'raw T y',
         '''
@@ -28,8 +45,7 @@ def _cu_conv_sum(y, x, n):
               y[offset + (j - half_n) * rdim] = sum_part;
             }
           }
-        ''', 'lrn_conv_sum')(x, rdim, x.shape[1], n, y,
-                             size=x.shape[0] * rdim)
+        ''', 'lrn_conv_sum')(x, rdim, N, n, y, size=x.size // N)
 
 
 class LocalResponseNormalization(function.Function):
@@ -41,6 +57,7 @@ class LocalResponseNormalization(function.Function):
         self.k = k
         self.alpha = alpha
         self.beta = beta
+        self.layout = conv.get_layout()
 
     def check_type_forward(self, in_types):
         type_check.expect(in_types.size() == 1)
@@ -52,32 +69,35 @@ class LocalResponseNormalization(function.Function):
         )
 
     def forward_cpu(self, x):
-        half_n = self.n // 2
-        x2 = numpy.square(x[0])
-        sum_part = x2.copy()
-        for i in six.moves.range(1, half_n + 1):
-            sum_part[:, i:] += x2[:, :-i]
-            sum_part[:, :-i] += x2[:, i:]
-        self.unit_scale = self.k + self.alpha * sum_part
-        self.scale = self.unit_scale ** -self.beta
-        self.y = x[0] * self.scale
-        return self.y,
+        axis = conv.get_channel_axis(self.layout, x[0].ndim)
+        # Only the scale before exponentiation is kept for backward
+        self.scale = _cpu_conv_sum(numpy.square(x[0]), self.n, axis)
+        self.scale *= self.alpha
+        self.scale += self.k
+        y = self.scale ** -self.beta
+        y *= x[0]
+        return y,
 
     def backward_cpu(self, x, gy):
-        half_n = self.n // 2
-        summand = self.y * gy[0] / self.unit_scale
-        sum_part = summand.copy()
-        for i in six.moves.range(1, half_n + 1):
-            sum_part[:, i:] += summand[:, :-i]
-            sum_part[:, :-i] += summand[:, i:]
-
-        gx = gy[0] * self.scale - 2 * self.alpha * self.beta * x[0] * sum_part
+        axis = conv.get_channel_axis(self.layout, x[0].ndim)
+        scale_pow = self.scale ** -self.beta
+        summand = x[0] * scale_pow
+        summand *= gy[0]
+        summand /= self.scale
+        sum_part = _cpu_conv_sum(summand, self.n, axis)
+
+        sum_part *= x[0]
+        sum_part *= 2 * self.alpha * self.beta
+        gx = scale_pow
+        gx *= gy[0]
+        gx -= sum_part
         return gx,
 
     def forward_gpu(self, x):
         self.y = cuda.cupy.square(x[0])  # temporary
         self.scale = cuda.cupy.empty_like(self.y)
-        _cu_conv_sum(self.scale, self.y, self.n)
+        _cu_conv_sum(self.scale, self.y, self.n,
+                     conv.get_channel_axis(self.layout, self.y.ndim))
         cuda.elementwise(
             'T x, T k, T alpha, T beta',
             'T y, T scale',
@@ -93,7 +113,8 @@ class LocalResponseNormalization(function.Function):
             'summand = y * gy / scale',
             'lrn_bwd_summand')(self.scale, self.y, gy[0])
         gx = cuda.cupy.empty_like(x[0])
-        _cu_conv_sum(gx, summand, self.n)
+        _cu_conv_sum(gx, summand, self.n,
+                     conv.get_channel_axis(self.layout, gx.ndim))
         cuda.elementwise(
             ' T x, T gy, T scale, T beta, T coeff', 'T gx',
             'gx = pow(scale, -beta) * gy - coeff * x * gx',
@@ -114,6 +135,10 @@ def local_response_normalization(x, n=5, k=2, alpha=1e-4, beta=.75):
               \\alpha \\sum_{j=\\max{1, i - n/2}}^{\\min{N, i + n/2}} \\
               x_j^2 \\right)^\\beta}.
 
+    If the layout is set to ``'NHWC'`` by
+    :func:`chainer.utils.conv.set_layout`, the channels of four-dimensional
+    inputs are the last dimension instead.
+
     Args:
         x (Variable): Input variable.
         n (int): Normalization window width.
@@ -15,12 +15,19 @@ class AveragePooling2D(pooling_2d.Pooling2D):
     # TODO(beam2d): Support cover_all mode.
 
     def forward_cpu(self, x):
-        col = conv.im2col_cpu(x[0], self.kh, self.kw, self.sy, self.sx,
-                              self.ph, self.pw)
+        if self.layout == 'NHWC':
+            col = conv.im2col_nhwc_cpu(x[0], self.kh, self.kw, self.sy,
+                                       self.sx, self.ph, self.pw)
+            y = col.mean(axis=(3, 4))
+            return y,
+
+        col = conv._im2col_cpu_view(x[0], self.kh, self.kw, self.sy,
+                                    self.sx, self.ph, self.pw)
         y = col.mean(axis=(2, 3))
         return y,
 
     def forward_gpu(self, x):
+        conv.check_cpu_layout(self.layout)
         if (cuda.cudnn_enabled and self.use_cudnn and
                 pooling_2d._check_cudnn_acceptable_type(x[0].dtype)):
             return super(AveragePooling2D, self).forward_gpu(x)
@@ -57,10 +64,25 @@ class AveragePooling2D(pooling_2d.Pooling2D):
         return y,
 
     def backward_cpu(self, x, gy):
+        if self.layout == 'NHWC':
+            def scatter(k, gx_k):
+                gx_k += gy[0]
+
+            gx = self._col2im_cpu(x[0].shape, gy[0], scatter)
+            gx /= self.kh * self.kw
+            return gx,
+
+        n, c, out_h, out_w = gy[0].shape
         h, w = x[0].shape[2:]
-        gcol = numpy.tile(gy[0][:, :, numpy.newaxis, numpy.newaxis],
-                          (1, 1, self.kh, self.kw, 1, 1))
-        gx = conv.col2im_cpu(gcol, self.sy, self.sx, self.ph, self.pw, h, w)
+        gx = numpy.empty_like(x[0])
+        # The gradients of the patches are expanded chunk by chunk within the
+        # workspace
+        sample_size = c * self.kh * self.kw * out_h * out_w * gx.itemsize
+        for s in conv.batch_slices(n, sample_size):
+            gcol = numpy.tile(gy[0][s, :, numpy.newaxis, numpy.newaxis],
+                              (1, 1, self.kh, self.kw, 1, 1))
+            gx[s] = conv.col2im_cpu(
+                gcol, self.sy, self.sx, self.ph, self.pw, h, w)
         gx /= self.kh * self.kw
         return gx,
 
@@ -1,4 +1,5 @@
 import numpy
+import six
 
 from chainer import cuda
 from chainer.functions.pooling import pooling_2d
@@ -9,24 +10,44 @@ if cuda.cudnn_enabled:
     libcudnn = cudnn.cudnn
 
 
+def _index_dtype(size):
+    # The smallest integer type holding offsets in a window of given size
+    if size <= numpy.iinfo(numpy.int8).max + 1:
+        return numpy.int8
+    elif size <= numpy.iinfo(numpy.int16).max + 1:
+        return numpy.int16
+    return numpy.intp
+
+
 class MaxPooling2D(pooling_2d.Pooling2D):
 
     """Max pooling over a set of 2d planes."""
 
+    def _pool_cpu(self, x):
+        col = self._im2col_cpu(x, pval=-float('inf'))
+        kh, kw = col.shape[:2]
+
+        # The maximum and its offset in the window are found in one pass over
+        # the window offsets. Each step reads a strided view of the input, so
+        # the column tensor is never expanded. Strict comparison keeps the
+        # first maximum as argmax does.
+        y = col[0, 0].copy()
+        indexes = numpy.zeros(y.shape, dtype=_index_dtype(kh * kw))
+        mask = numpy.empty(y.shape, dtype=numpy.bool_)
+        for k in six.moves.range(1, kh * kw):
+            v = col[k // kw, k % kw]
+            numpy.greater(v, y, out=mask)
+            numpy.copyto(y, v, where=mask)
+            numpy.copyto(indexes, k, where=mask)
+        return y, indexes
+
     def forward_cpu(self, x):
-        col = conv.im2col_cpu(
-            x[0], self.kh, self.kw, self.sy, self.sx, self.ph, self.pw,
-            pval=-float('inf'), cover_all=self.cover_all)
-        n, c, kh, kw, out_h, out_w = col.shape
-        col = col.reshape(n, c, kh * kw, out_h, out_w)
-
-        # We select maximum twice, since the implementation using numpy.choose
-        # hits its bug when kh * kw >= 32.
-        self.indexes = col.argmax(axis=2)
-        y = col.max(axis=2)
+        y, indexes = self._pool_cpu(x[0])
+        self.indexes = None if conv.get_recompute() else indexes
         return y,
 
     def forward_gpu(self, x):
+        conv.check_cpu_layout(self.layout)
         if (cuda.cudnn_enabled and self.use_cudnn and
                 pooling_2d._check_cudnn_acceptable_type(x[0].dtype)):
             return super(MaxPooling2D, self).forward_gpu(x)
@@ -78,18 +99,20 @@ class MaxPooling2D(pooling_2d.Pooling2D):
         return y,
 
     def backward_cpu(self, x, gy):
-        n, c, out_h, out_w = gy[0].shape
-        h, w = x[0].shape[2:]
-        gcol = numpy.zeros(
-            (n, c, self.kh, self.kw, out_h, out_w), dtype=x[0].dtype)
+        gy = gy[0]
+        indexes = self.indexes
+        if indexes is None:
+            indexes = self._pool_cpu(x[0])[1]
 
-        # TODO(beam2d): Make it fast
-        gcol_r = numpy.rollaxis(gcol.reshape(n, c, -1, out_h, out_w), 2)
-        for i in numpy.ndindex(n, c, out_h, out_w):
-            gcol_r[self.indexes[i]][i] = gy[0][i]
+        # Gradients are scattered offset by offset directly into the padded
+        # image, as col2im does, without allocating the column tensor.
+        mask = numpy.empty(gy.shape, dtype=numpy.bool_)
 
-        gx = conv.col2im_cpu(gcol, self.sy, self.sx, self.ph, self.pw, h, w)
-        return gx,
+        def scatter(k, gx_k):
+            numpy.equal(indexes, k, out=mask)
+            numpy.add(gx_k, gy, out=gx_k, where=mask)
+
+        return self._col2im_cpu(x[0].shape, gy, scatter),
 
     def backward_gpu(self, x, gy):
         if (cuda.cudnn_enabled and self.use_cudnn and
@@ -1,6 +1,7 @@
 import collections
 
 import numpy
+import six
 
 from chainer import cuda
 from chainer import function
@@ -39,6 +40,44 @@ class Pooling2D(function.Function):
 
         self.cover_all = cover_all
         self.use_cudnn = use_cudnn
+        self.layout = conv.get_layout()
+
+    def _spatial_axes(self):
+        return (1, 2) if self.layout == 'NHWC' else (2, 3)
+
+    def _im2col_cpu(self, x, pval=0):
+        # Returns the patches as a view of shape (kh, kw, n, ...) whose last
+        # three axes are in the layout of x
+        if self.layout == 'NHWC':
+            col = conv.im2col_nhwc_cpu(
+                x, self.kh, self.kw, self.sy, self.sx, self.ph, self.pw,
+                pval=pval, cover_all=self.cover_all)
+            return col.transpose(3, 4, 0, 1, 2, 5)
+        col = conv._im2col_cpu_view(
+            x, self.kh, self.kw, self.sy, self.sx, self.ph, self.pw,
+            pval=pval, cover_all=self.cover_all)
+        return col.transpose(2, 3, 0, 1, 4, 5)
+
+    def _col2im_cpu(self, x_shape, gy, scatter):
+        # Sums up gradients of the patches into the gradient of the input.
+        # scatter(k, gx_k) adds the gradients of the k-th offsets in the
+        # patches to gx_k, a view of the padded gradient of the input.
+        ay, ax = self._spatial_axes()
+        h, w = x_shape[ay], x_shape[ax]
+        out_h, out_w = gy.shape[ay], gy.shape[ax]
+        shape = list(x_shape)
+        shape[ay] = h + 2 * self.ph + self.sy - 1
+        shape[ax] = w + 2 * self.pw + self.sx - 1
+        gx = numpy.zeros(shape, dtype=gy.dtype)
+        index = [slice(None)] * 4
+        for k in six.moves.range(self.kh * self.kw):
+            ky, kx = divmod(k, self.kw)
+            index[ay] = slice(ky, ky + self.sy * out_h, self.sy)
+            index[ax] = slice(kx, kx + self.sx * out_w, self.sx)
+            scatter(k, gx[tuple(index)])
+        index[ay] = slice(self.ph, h + self.ph)
+        index[ax] = slice(self.pw, w + self.pw)
+        return gx[tuple(index)]
 
     def check_type_forward(self, in_types):
         type_check.expect(
@@ -46,6 +46,21 @@ def _roi_pooling_slice(size, stride, max_size, roi_offset):
     return slice(start, end), end - start
 
 
+def _max_and_argmax(x, index_slice):
+    # Maximum of x[:, i] over i in the slice and the first index of it
+    # taken with elementwise comparisons, which are much faster than
+    # reducing many short axes.
+    start = index_slice.start
+    max_data = x[:, start].copy()
+    argmax_data = numpy.full(max_data.shape, start, dtype=numpy.int32)
+    mask = numpy.empty(max_data.shape, dtype=numpy.bool_)
+    for i in six.moves.range(start + 1, index_slice.stop):
+        numpy.greater(x[:, i], max_data, out=mask)
+        numpy.maximum(max_data, x[:, i], out=max_data)
+        numpy.copyto(argmax_data, i, where=mask)
+    return max_data, argmax_data
+
+
 class ROIPooling2D(function.Function):
 
     """RoI pooling over a set of 2d planes."""
@@ -68,10 +83,14 @@ class ROIPooling2D(function.Function):
 
     def forward_cpu(self, inputs):
         bottom_data, bottom_rois = inputs
-        n_rois, channels, height, width = bottom_data.shape
-        top_data = numpy.empty((n_rois, channels, self.outh, self.outw),
+        channels, height, width = bottom_data.shape[1:]
+        n_rois = bottom_rois.shape[0]
+        # Empty pooling regions are zero and propagate no gradient as on GPU
+        top_data = numpy.zeros((n_rois, channels, self.outh, self.outw),
                                dtype=numpy.float32)
-        self.argmax_data = numpy.empty_like(top_data).astype(numpy.int32)
+        self.argmax_data = numpy.full(top_data.shape, -1, dtype=numpy.int32)
+        c_index = numpy.arange(channels)
+        w_index = numpy.arange(self.outw)[:, None]
 
         for i_roi in six.moves.range(n_rois):
             idx, xmin, ymin, xmax, ymax = bottom_rois[i_roi]
@@ -84,28 +103,45 @@ class ROIPooling2D(function.Function):
             strideh = 1. * roi_height / self.outh
             stridew = 1. * roi_width / self.outw
 
-            for outh in six.moves.range(self.outh):
-                sliceh, lenh = _roi_pooling_slice(
-                    outh, strideh, height, ymin)
-                if sliceh.stop <= sliceh.start:
-                    continue
-                for outw in six.moves.range(self.outw):
-                    slicew, lenw = _roi_pooling_slice(
-                        outw, stridew, width, xmin)
-                    if slicew.stop <= slicew.start:
-                        continue
-                    roi_data = bottom_data[int(idx), :, sliceh, slicew]\
-                        .reshape(channels, -1)
-                    top_data[i_roi, :, outh, outw] =\
-                        numpy.max(roi_data, axis=1)
-
-                    # get the max idx respect to feature_maps coordinates
-                    max_idx_slice = numpy.unravel_index(
-                        numpy.argmax(roi_data, axis=1), (lenh, lenw))
-                    max_idx_slice_h = max_idx_slice[0] + sliceh.start
-                    max_idx_slice_w = max_idx_slice[1] + slicew.start
-                    max_idx_slice = max_idx_slice_h * width + max_idx_slice_w
-                    self.argmax_data[i_roi, :, outh, outw] = max_idx_slice
+            slicesh = [_roi_pooling_slice(outh, strideh, height, ymin)[0]
+                       for outh in six.moves.range(self.outh)]
+            slicesw = [_roi_pooling_slice(outw, stridew, width, xmin)[0]
+                       for outw in six.moves.range(self.outw)]
+            # Non-empty bins are contiguous since the slices are monotonic
+            valid_h = [i for i, s in enumerate(slicesh) if s.start < s.stop]
+            valid_w = [i for i, s in enumerate(slicesw) if s.start < s.stop]
+            if not valid_h or not valid_w:
+                continue
+            outw_slice = slice(valid_w[0], valid_w[-1] + 1)
+            h0 = slicesh[valid_h[0]].start
+            h1 = slicesh[valid_h[-1]].stop
+            w0 = slicesw[valid_w[0]].start
+            w1 = slicesw[valid_w[-1]].stop
+
+            # The maximum is separable: it is first taken over the columns of
+            # each bin for all rows at once, then over the rows of each bin
+            # for all columns at once. Channels are moved to the last axis so
+            # that each comparison reads contiguous memory.
+            roi_data = numpy.ascontiguousarray(
+                bottom_data[int(idx), :, h0:h1, w0:w1].transpose(1, 2, 0))
+            n_w = len(valid_w)
+            col_shape = (n_w, h1 - h0, channels)
+            col_max = numpy.empty(col_shape, dtype=numpy.float32)
+            col_arg = numpy.empty(col_shape, dtype=numpy.int32)
+            for j, outw in enumerate(valid_w):
+                slicew = slicesw[outw]
+                col_max[j], col_arg[j] = _max_and_argmax(
+                    roi_data, slice(slicew.start - w0, slicew.stop - w0))
+
+            for outh in valid_h:
+                sliceh = slicesh[outh]
+                row_max, row_arg = _max_and_argmax(
+                    col_max, slice(sliceh.start - h0, sliceh.stop - h0))
+                top_data[i_roi, :, outh, outw_slice] = row_max.T
+                # get the max idx respect to feature_maps coordinates
+                max_idx = (row_arg + h0) * width + w0 + \
+                    col_arg[w_index[:n_w], row_arg, c_index]
+                self.argmax_data[i_roi, :, outh, outw_slice] = max_idx.T
         return top_data,
 
     def forward_gpu(self, inputs):
@@ -184,43 +220,20 @@ class ROIPooling2D(function.Function):
 
     def backward_cpu(self, inputs, gy):
         bottom_data, bottom_rois = inputs
-        n_rois, channels, height, width = bottom_data.shape
-        bottom_delta = numpy.zeros_like(bottom_data, dtype=numpy.float32)
-
-        for i_roi in six.moves.range(n_rois):
-            idx, xmin, ymin, xmax, ymax = bottom_rois[i_roi]
-            idx = int(idx)
-            xmin = int(round(xmin * self.spatial_scale))
-            xmax = int(round(xmax * self.spatial_scale))
-            ymin = int(round(ymin * self.spatial_scale))
-            ymax = int(round(ymax * self.spatial_scale))
-            roi_width = max(xmax - xmin + 1, 1)
-            roi_height = max(ymax - ymin + 1, 1)
+        channels, height, width = bottom_data.shape[1:]
 
-            strideh = float(roi_height) / float(self.outh)
-            stridew = float(roi_width) / float(self.outw)
-
-            # iterate all the w, h (from feature map) that fall into this ROIs
-            for w in six.moves.range(xmin, xmax + 1):
-                for h in six.moves.range(ymin, ymax + 1):
-                    phstart = int(numpy.floor(float(h - ymin) / strideh))
-                    phend = int(numpy.ceil(float(h - ymin + 1) / strideh))
-                    pwstart = int(numpy.floor(float(w - xmin) / stridew))
-                    pwend = int(numpy.ceil(float(w - xmin + 1) / stridew))
-
-                    phstart = min(max(phstart, 0), self.outh)
-                    phend = min(max(phend, 0), self.outh)
-                    pwstart = min(max(pwstart, 0), self.outw)
-                    pwend = min(max(pwend, 0), self.outw)
-
-                    for ph in six.moves.range(phstart, phend):
-                        for pw in six.moves.range(pwstart, pwend):
-                            max_idx_tmp = self.argmax_data[i_roi, :, ph, pw]
-                            for c in six.moves.range(channels):
-                                if max_idx_tmp[c] == (h * width + w):
-                                    bottom_delta[idx, c, h, w] += \
-                                        gy[0][i_roi, c, ph, pw]
-        return bottom_delta, None
+        # Each pooled unit sends its gradient to the element it selected, so
+        # the gradient is a scatter-add of gy at the flattened argmax
+        # positions of the feature maps.
+        roi_index = bottom_rois[:, 0].astype(numpy.intp)
+        offset = (roi_index[:, None] * channels +
+                  numpy.arange(channels)) * (height * width)
+        pooled = self.argmax_data >= 0
+        index = (offset[:, :, None, None] + self.argmax_data)[pooled]
+        bottom_delta = numpy.bincount(
+            index, weights=gy[0][pooled], minlength=bottom_data.size)
+        return bottom_delta.astype(numpy.float32).reshape(
+            bottom_data.shape), None
 
     def backward_gpu(self, inputs, gy):
         bottom_data, bottom_rois = inputs
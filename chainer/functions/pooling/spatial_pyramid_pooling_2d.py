@@ -5,6 +5,7 @@ from chainer import cuda
 from chainer.functions.array import concat
 from chainer.functions.pooling import max_pooling_2d
 from chainer.functions.pooling import pooling_2d
+from chainer.utils import conv
 
 
 class SpatialPyramidPooling2D(pooling_2d.Pooling2D):
@@ -12,7 +13,11 @@ class SpatialPyramidPooling2D(pooling_2d.Pooling2D):
     """Spatial pyramid pooling over a set of 2d planes."""
 
     def __init__(self, x_shape, pyramid_height, pooling_class, use_cudnn=True):
-        bottom_c, bottom_h, bottom_w = x_shape
+        self.layout = conv.get_layout()
+        if self.layout == 'NHWC':
+            bottom_h, bottom_w, bottom_c = x_shape
+        else:
+            bottom_c, bottom_h, bottom_w = x_shape
         self.pyramid_height = pyramid_height
 
         # create pooling functions for different pyramid levels
@@ -45,20 +50,29 @@ class SpatialPyramidPooling2D(pooling_2d.Pooling2D):
                 self.split_inds.append(out_dim)
 
     def forward(self, x):
+        # In the NHWC layout, the features are ordered as in the NCHW layout
+        # and placed along the last axis
+        nhwc = self.layout == 'NHWC'
         self.ys = []
         for pooler in self.poolers:
             y = pooler.forward(x)[0]
+            if nhwc:
+                y = y.transpose(0, 3, 1, 2)
             n, c, h, w = pooler.out_shape = y.shape
-            self.ys.append(y.reshape((n, c * h * w, 1, 1)))
+            shape = (n, 1, 1, c * h * w) if nhwc else (n, c * h * w, 1, 1)
+            self.ys.append(y.reshape(shape))
 
-        return concat.Concat(axis=1).forward(self.ys)
+        return concat.Concat(axis=3 if nhwc else 1).forward(self.ys)
 
     def backward(self, x, gy):
+        nhwc = self.layout == 'NHWC'
         xp = cuda.get_array_module(*x)
         gx = xp.zeros_like(x[0])
-        gys = xp.split(gy[0], self.split_inds, axis=1)
+        gys = xp.split(gy[0], self.split_inds, axis=3 if nhwc else 1)
         for pooler, gy in zip(self.poolers, gys):
             gy = gy.reshape(pooler.out_shape)
+            if nhwc:
+                gy = gy.transpose(0, 2, 3, 1)
             gx += pooler.backward(x, (gy,))[0]
 
         return gx,
@@ -96,7 +110,9 @@ def spatial_pyramid_pooling_2d(x, pyramid_height, pooling_class,
 
     Args:
         x (~chainer.Variable): Input variable. The shape of ``x`` should be
-            ``(batchsize, # of channels, height, width)``.
+            ``(batchsize, # of channels, height, width)``, or
+            ``(batchsize, height, width, # of channels)`` in the ``'NHWC'``
+            layout (see :func:`chainer.utils.conv.set_layout`).
         pyramid_height (int): the number of pyramid levels
         pooling_class (MaxPooling2D or AveragePooling2D):
             Only MaxPooling2D class can be available for now.
@@ -107,7 +123,9 @@ def spatial_pyramid_pooling_2d(x, pyramid_height, pooling_class,
         ~chainer.Variable: Output variable. The shape of the output variable
             will be :math:`(batchsize, c \\sum_{h=0}^{H-1} 2^{2h}, 1, 1)`,
             where :math:`c` is the number of channels of input variable ``x``
-            and :math:`H` is the number of pyramid levels.
+            and :math:`H` is the number of pyramid levels. In the ``'NHWC'``
+            layout, the shape is :math:`(batchsize, 1, 1, c \\sum_{h=0}^{H-1}
+            2^{2h})` with the features in the same order.
 
     .. note::
 
@@ -117,5 +135,5 @@ def spatial_pyramid_pooling_2d(x, pyramid_height, pooling_class,
 
     """
 
-    return SpatialPyramidPooling2D(x.data.shape[1:], pyramid_height,
+    return SpatialPyramidPooling2D(x.shape[1:], pyramid_height,
                                    pooling_class, use_cudnn=use_cudnn)(x)
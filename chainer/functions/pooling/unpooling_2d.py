@@ -1,3 +1,5 @@
+from numpy.lib import stride_tricks
+
 from chainer import cuda
 from chainer.functions.pooling import pooling_2d
 from chainer.utils import conv
@@ -23,23 +25,37 @@ class Unpooling2D(pooling_2d.Pooling2D):
             x_type.ndim == 4,
         )
 
+        ay, ax = self._spatial_axes()
         if self.outh is not None:
             expected_h = conv.get_conv_outsize(
                 self.outh, self.kh, self.sy, self.ph, cover_all=self.cover_all)
-            type_check.expect(x_type.shape[2] == expected_h)
+            type_check.expect(x_type.shape[ay] == expected_h)
         if self.outw is not None:
             expected_w = conv.get_conv_outsize(
                 self.outw, self.kw, self.sx, self.pw, cover_all=self.cover_all)
-            type_check.expect(x_type.shape[3] == expected_w)
+            type_check.expect(x_type.shape[ax] == expected_w)
 
     def forward(self, x):
-        h, w = x[0].shape[2:]
+        ay, ax = self._spatial_axes()
+        h, w = x[0].shape[ay], x[0].shape[ax]
         if self.outh is None:
             self.outh = conv.get_deconv_outsize(
                 h, self.kh, self.sy, self.ph, cover_all=self.cover_all)
         if self.outw is None:
             self.outw = conv.get_deconv_outsize(
                 w, self.kw, self.sx, self.pw, cover_all=self.cover_all)
+        if self.layout == 'NHWC':
+            if isinstance(x[0], cuda.ndarray):
+                conv.check_cpu_layout(self.layout)
+            # Each pixel is repeated over the window by zero strides
+            n, _, _, c = x[0].shape
+            sn, sh, sw, sc = x[0].strides
+            col = stride_tricks.as_strided(
+                x[0], (n, h, w, self.kh, self.kw, c), (sn, sh, sw, 0, 0, sc))
+            y = conv.col2im_nhwc_cpu(col, self.sy, self.sx, self.ph, self.pw,
+                                     self.outh, self.outw)
+            return y,
+
         xp = cuda.get_array_module(*x)
         col = xp.tile(x[0][:, :, xp.newaxis, xp.newaxis],
                       (1, 1, self.kh, self.kw, 1, 1))
@@ -52,12 +68,18 @@ class Unpooling2D(pooling_2d.Pooling2D):
         return y,
 
     def backward(self, x, gy):
+        if self.layout == 'NHWC':
+            gcol = conv.im2col_nhwc_cpu(
+                gy[0], self.kh, self.kw, self.sy, self.sx, self.ph, self.pw,
+                cover_all=self.cover_all)
+            return gcol.sum(axis=(3, 4)),
+
         if isinstance(gy[0], cuda.ndarray):
             gcol = conv.im2col_gpu(
                 gy[0], self.kh, self.kw, self.sy, self.sx, self.ph, self.pw,
                 cover_all=self.cover_all)
         else:
-            gcol = conv.im2col_cpu(
+            gcol = conv._im2col_cpu_view(
                 gy[0], self.kh, self.kw, self.sy, self.sx, self.ph, self.pw,
                 cover_all=self.cover_all)
         gx = gcol.sum(axis=(2, 3))
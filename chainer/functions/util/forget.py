@@ -0,0 +1,185 @@
+import contextlib
+
+import numpy
+
+import chainer
+from chainer import cuda
+from chainer import flag
+from chainer import function
+from chainer import link
+from chainer import variable
+
+
+def _call_func(func, xs):
+    outs = func(*xs)
+    if not isinstance(outs, tuple):
+        outs = outs,
+    for y in outs:
+        if not isinstance(y, variable.Variable):
+            raise TypeError(
+                'func of forget must return Variable or tuple of Variables, '
+                'but returned {}'.format(type(y)))
+    return outs
+
+
+def _persistent_values(func):
+    # Collects the persistent values of the links used by func, which may be
+    # updated on recomputation (e.g. population statistics of batch
+    # normalization)
+    root = getattr(func, '__self__', func)
+    if not isinstance(root, link.Link):
+        return []
+    values = []
+    for child in root.links():
+        for name in child._persistent:
+            value = getattr(child, name)
+            if isinstance(value, (numpy.ndarray, cuda.ndarray)):
+                value = value.copy()
+            values.append((child, name, value))
+    return values
+
+
+@contextlib.contextmanager
+def _cupy_random_state(seed):
+    # Temporarily replaces the random number generator of CuPy for the
+    # current device by one initialized with the seed. The state of a CuPy
+    # generator cannot be saved, so the recomputation reproduces random
+    # numbers by seeding a generator in the same way.
+    generator = cuda.cupy.random.generator
+    device_id = cuda.Device().id
+    saved = generator.get_random_state()
+    generator._random_states[device_id] = generator.RandomState(seed)
+    try:
+        yield
+    finally:
+        generator._random_states[device_id] = saved
+
+
+class _Seed(function.Function):
+
+    # Joins the outputs of func into a dummy scalar, whose backward emits the
+    # given gradients to them.
+
+    def __init__(self, grads):
+        self.grads = grads
+
+    def check_type_forward(self, in_types):
+        pass
+
+    def forward(self, inputs):
+        xp = cuda.get_array_module(*inputs)
+        return xp.zeros((), dtype=numpy.float32),
+
+    def backward(self, inputs, grad_outputs):
+        return self.grads
+
+
+class Forget(function.Function):
+
+    """Function recomputing a computational graph on backward.
+
+    Args:
+        func (callable): Function, link or method to be wrapped. It takes
+            variables and returns a variable or a tuple of variables.
+
+    """
+    def __init__(self, func):
+        if not callable(func):
+            raise TypeError('func must be callable')
+        self.func = func
+
+    def check_type_forward(self, in_types):
+        pass
+
+    def _call(self, inputs):
+        xs = [variable.Variable(x) for x in inputs]
+        if self.cupy_seed is None:
+            return xs, _call_func(self.func, xs)
+        with _cupy_random_state(self.cupy_seed):
+            return xs, _call_func(self.func, xs)
+
+    def forward(self, inputs):
+        self.random_state = numpy.random.get_state()
+        self.cupy_seed = None
+        if cuda.get_array_module(*inputs) is not numpy:
+            # The seed is drawn from the global generator, so the random
+            # numbers still depend on the seed set by the user
+            self.cupy_seed = int(cuda.cupy.random.get_random_state().interval(
+                2 ** 31 - 1, None))
+        _, outs = self._call(inputs)
+        # The graph built inside func is released here
+        return tuple([y.data for y in outs])
+
+    def backward(self, inputs, grad_outputs):
+        persistent_values = _persistent_values(self.func)
+        random_state = numpy.random.get_state()
+        numpy.random.set_state(self.random_state)
+        try:
+            xs, outs = self._call(inputs)
+        finally:
+            numpy.random.set_state(random_state)
+            for child, name, value in persistent_values:
+                setattr(child, name, value)
+
+        _Seed(grad_outputs)(*outs).backward()
+        return tuple([x.grad for x in xs])
+
+
+def forget(func, *xs):
+    """Calls a function without storing its internal computational graph.
+
+    This function calls ``func`` with the given variables, but discards the
+    intermediate variables and the states of functions (e.g. ``col`` of
+    convolution and ``indexes`` of max pooling) once the outputs are
+    computed. On backward, ``func`` is called again to rebuild its graph, and
+    the gradients are backpropagated through it. This technique, known as
+    gradient checkpointing, reduces the memory consumption of training at the
+    cost of computing the forward pass of ``func`` twice. It is typically
+    applied to segments of a deep :class:`~chainer.Chain`, e.g. blocks of a
+    convolutional network, so that only the activations at the boundaries of
+    the segments are kept until backward.
+
+    The gradients of parameters used in ``func`` are accumulated on backward
+    as usual. The persistent values of ``func`` are restored after the
+    recomputation if ``func`` is a :class:`~chainer.Link` or its method, and
+    the state of the global random number generator of NumPy is restored to
+    the one on the first call, so that e.g. :func:`~chainer.functions.dropout`
+    and :class:`~chainer.links.BatchNormalization` compute the same outputs.
+    On GPU, ``func`` draws random numbers of CuPy from a generator seeded by
+    a number drawn from the global generator of the current device, and the
+    recomputation uses a generator seeded in the same way.
+
+    If the input variables are volatile or the inference mode is enabled,
+    ``func`` is simply called.
+
+    Args:
+        func (callable): Function, link or method to be called. It takes
+            ``xs`` and returns a variable or a tuple of variables. It must
+            compute the outputs only from ``xs`` and the variables without
+            creators (e.g. parameters).
+        xs (~chainer.Variable): Input variables of ``func``.
+
+    Returns:
+        A variable or a tuple of variables, which are the outputs of
+        ``func``.
+
+    .. admonition:: Example
+
+       >>> class Block(chainer.Chain):
+       ...     def __init__(self):
+       ...         super(Block, self).__init__(
+       ...             conv1=L.Convolution2D(3, 3, 3, pad=1),
+       ...             conv2=L.Convolution2D(3, 3, 3, pad=1))
+       ...
+       ...     def __call__(self, x):
+       ...         return self.conv2(F.relu(self.conv1(x)))
+       ...
+       >>> block = Block()
+       >>> x = chainer.Variable(np.zeros((1, 3, 8, 8), 'f'))
+       >>> y = F.forget(block, x)
+
+    """
+    if (chainer.is_inference_mode() or
+            flag.aggregate_flags([x.volatile for x in xs]) is flag.ON):
+        return func(*xs)
+    return Forget(func)(*xs)
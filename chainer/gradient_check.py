@@ -3,6 +3,7 @@ import numpy
 from chainer import cuda
 from chainer.functions.math import identity
 from chainer import utils
+from chainer.utils import sparse
 from chainer import variable
 
 
@@ -73,6 +74,10 @@ def assert_allclose(x, y, atol=1e-5, rtol=1e-4, verbose=True):
         verbose (bool): If ``True``, it outputs verbose messages on error.
 
     """
+    if isinstance(x, sparse.RowSparseArray):
+        x = x.to_dense()
+    if isinstance(y, sparse.RowSparseArray):
+        y = y.to_dense()
     x = cuda.to_cpu(utils.force_array(x))
     y = cuda.to_cpu(utils.force_array(y))
     try:
@@ -0,0 +1,244 @@
+import ctypes
+import multiprocessing
+import traceback
+
+import numpy
+import six
+
+from chainer import optimizer as optimizer_module
+
+
+# Interval in seconds to check if worker processes are alive
+_poll_interval = 1.0
+
+
+def _get_context():
+    if not hasattr(multiprocessing, 'get_context'):  # Python 2
+        return multiprocessing
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        raise RuntimeError('Hogwild training requires the fork start method')
+    return multiprocessing.get_context('fork')
+
+
+def _is_shared(array):
+    # Arrays in shared memory are views of RawArray objects
+    while isinstance(array, numpy.ndarray):
+        array = array.base
+    return isinstance(array, ctypes.Array)
+
+
+def _shared_empty(shape, dtype=numpy.float32):
+    dtype = numpy.dtype(dtype)
+    size = int(numpy.prod(shape, dtype=numpy.int64))
+    raw = _get_context().RawArray(ctypes.c_byte, max(size * dtype.itemsize, 1))
+    return numpy.frombuffer(raw, dtype=dtype, count=size).reshape(shape)
+
+
+def _to_shared(array):
+    if _is_shared(array):
+        return array
+    shared = _shared_empty(array.shape, array.dtype)
+    shared[...] = array
+    return shared
+
+
+def share_memory(link, optimizer=None):
+    """Moves parameters and optimizer states to shared memory.
+
+    It replaces the data array of each parameter of the link and the arrays in
+    the state dictionaries of the optimizer by arrays of the same values
+    allocated in shared memory, which are then shared by processes forked
+    afterwards. Gradient arrays are not shared, so each process computes its
+    own gradients. If the optimizer packs arrays into flat buffers (see
+    :meth:`GradientMethod.setup <chainer.GradientMethod.setup>`), the buffers
+    are allocated in shared memory instead. Arrays already in shared memory
+    are kept as is.
+
+    Args:
+        link (~chainer.Link): Link whose parameters are moved. Its parameters
+            must be on CPU.
+        optimizer (~chainer.Optimizer): Optimizer set up with the link. If it
+            is given, its states are also moved.
+
+    """
+    for param in link.params():
+        if not isinstance(param.data, numpy.ndarray):
+            raise ValueError('parameters in shared memory must be on CPU')
+
+    if optimizer is None:
+        for param in link.params():
+            param.data = _to_shared(param.data)
+        return
+
+    if isinstance(optimizer, optimizer_module.GradientMethod):
+        # States lazily updated by row-sparse gradients are caught up, since
+        # the records of lazy updates are not shared
+        optimizer._catch_up_all()
+    if getattr(optimizer, 'flat', False):
+        optimizer._flat_allocator = _shared_empty
+        groups = optimizer._flat_groups
+        if groups is None or not all(_is_shared(p.data) for p, _ in groups):
+            optimizer._flat_groups = None
+        optimizer.prepare()
+        return
+
+    for param in link.params():
+        param.data = _to_shared(param.data)
+    optimizer.prepare()
+    for state in six.itervalues(optimizer._states):
+        for key, value in six.iteritems(state):
+            if isinstance(value, numpy.ndarray):
+                state[key] = _to_shared(value)
+
+
+def _worker(optimizer, lossfun, batches, rank, locks, queue):
+    try:
+        # Forked processes inherit the same random state
+        numpy.random.seed()
+        if locks is not None:
+            update_one = optimizer.update_one
+
+            def locked_update_one(param, state):
+                with locks[id(param)]:
+                    update_one(param, state)
+
+            optimizer.update_one = locked_update_one
+
+        target = optimizer.target
+        sum_loss = 0.
+        for batch in batches:
+            loss = lossfun(batch)
+            target.zerograds()
+            loss.backward()
+            loss.unchain_backward()
+            optimizer.update()
+            sum_loss += float(loss.data)
+        if isinstance(optimizer, optimizer_module.GradientMethod):
+            optimizer._catch_up_all()
+        queue.put((rank, sum_loss, None))
+    except BaseException:
+        queue.put((rank, None, traceback.format_exc()))
+
+
+def train(optimizer, lossfun, batches, n_processes=None, lock=False):
+    """Trains the target link of an optimizer by data parallelism on CPU.
+
+    This function implements Hogwild!-style data-parallel training. It moves
+    the parameters of the target link and the optimizer states to shared
+    memory by :func:`share_memory`, and forks processes each of which
+    iterates over its own part of ``batches``. For each batch, a process
+    computes the loss by ``lossfun``, runs backpropagation into its own
+    gradient arrays and calls :meth:`~chainer.Optimizer.update` of its copy of
+    the optimizer, which updates the shared parameters and states in place.
+    Updates are applied without locks unless ``lock`` is ``True``, in which
+    case the update of each parameter (or each flat buffer) is serialized by
+    a lock.
+
+    ``batches`` is split into contiguous parts, so each process sees the
+    batches of its part in order; stateful models like recurrent networks
+    keep their states within each process. Non-shared states of the link and
+    the optimizer (e.g. the update count) are not propagated back to the
+    caller, except that :attr:`~chainer.Optimizer.t` of the optimizer is
+    increased by the total number of updates. The random state of NumPy is
+    reseeded in each process.
+
+    .. note::
+       Each process should use a single thread for BLAS, e.g. by setting the
+       environment variable ``OMP_NUM_THREADS=1``, so that processes do not
+       oversubscribe the cores.
+
+    Args:
+        optimizer (~chainer.Optimizer): Optimizer set up with the target link.
+            Its parameters must be on CPU.
+        lossfun (callable): Function taking a batch and returning a loss
+            variable.
+        batches (sequence): Batches given to ``lossfun``. It must support
+            ``len`` and slicing.
+        n_processes (int): Number of processes. If it is ``None``, the number
+            of CPUs is used.
+        lock (bool): If ``True``, updates of each parameter are serialized.
+
+    Returns:
+        float: Sum of the loss values over all batches.
+
+    .. admonition:: Example
+
+       >>> from chainer import hogwild
+       >>> model = L.Classifier(L.Linear(3, 2))
+       >>> optimizer = optimizers.SGD()
+       >>> optimizer.setup(model)
+       >>> x = np.random.uniform(-1, 1, (100, 3)).astype('f')
+       >>> t = (x.sum(axis=1) > 0).astype('i')
+       >>> def lossfun(i):
+       ...     return model(chainer.Variable(x[i:i + 10]),
+       ...                  chainer.Variable(t[i:i + 10]))
+       >>> loss = hogwild.train(optimizer, lossfun, range(0, 100, 10), 2)
+
+    """
+    if n_processes is None:
+        n_processes = multiprocessing.cpu_count()
+    ctx = _get_context()
+    share_memory(optimizer.target, optimizer)
+
+    locks = None
+    if lock:
+        if getattr(optimizer, 'flat', False):
+            params = [p for p, _ in optimizer._flat_groups]
+        else:
+            params = optimizer.target.params()
+        locks = dict((id(p), ctx.Lock()) for p in params)
+
+    queue = ctx.Queue()
+    n = len(batches)
+    processes = []
+    for rank in six.moves.range(n_processes):
+        part = batches[n * rank // n_processes:n * (rank + 1) // n_processes]
+        process = ctx.Process(
+            target=_worker,
+            args=(optimizer, lossfun, part, rank, locks, queue))
+        process.start()
+        processes.append(process)
+
+    results = _collect_results(queue, processes)
+    for process in processes:
+        process.join()
+    for rank in sorted(results):
+        error = results[rank][1]
+        if error is not None:
+            raise RuntimeError(
+                'error in process %d of hogwild training:\n%s' % (rank, error))
+    optimizer.t += n
+    return sum(sum_loss for sum_loss, _ in six.itervalues(results))
+
+
+def _collect_results(queue, processes):
+    # Waits for the results of all processes. A process that exits without
+    # reporting (e.g. killed by a signal) is recorded as an error instead of
+    # blocking forever.
+    results = {}
+    while len(results) < len(processes):
+        try:
+            rank, sum_loss, error = queue.get(timeout=_poll_interval)
+            results[rank] = sum_loss, error
+            continue
+        except six.moves.queue.Empty:
+            pass
+
+        # Results put before a process exits are flushed to the queue by
+        # then, so they are drained before marking dead processes
+        dead = [rank for rank, process in enumerate(processes)
+                if rank not in results and not process.is_alive()]
+        if not dead:
+            continue
+        while True:
+            try:
+                rank, sum_loss, error = queue.get(timeout=_poll_interval)
+            except six.moves.queue.Empty:
+                break
+            results[rank] = sum_loss, error
+        for rank in dead:
+            if rank not in results:
+                results[rank] = None, (
+                    'process exited with code %s without reporting a result'
+                    % processes[rank].exitcode)
+    return results
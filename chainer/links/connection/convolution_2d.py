@@ -33,6 +33,8 @@ class Convolution2D(link.Link):
             function uses to initialize ``bias``.
             May also be a callable that takes ``numpy.ndarray`` or
             ``cupy.ndarray`` and edits its value.
+        cpu_algorithm (str): Name of the convolution algorithm used on CPU.
+            See :func:`chainer.functions.convolution_2d`.
 
     .. seealso::
        See :func:`chainer.functions.convolution_2d` for the definition of
@@ -46,11 +48,12 @@ class Convolution2D(link.Link):
 
     def __init__(self, in_channels, out_channels, ksize, stride=1, pad=0,
                  wscale=1, bias=0, nobias=False, use_cudnn=True,
-                 initialW=None, initial_bias=None):
+                 initialW=None, initial_bias=None, cpu_algorithm=None):
         kh, kw = _pair(ksize)
         self.stride = _pair(stride)
         self.pad = _pair(pad)
         self.use_cudnn = use_cudnn
+        self.cpu_algorithm = cpu_algorithm
 
         W_shape = (out_channels, in_channels, kh, kw)
         super(Convolution2D, self).__init__(W=W_shape)
@@ -79,7 +82,8 @@ class Convolution2D(link.Link):
 
         """
         return convolution_2d.convolution_2d(
-            x, self.W, self.b, self.stride, self.pad, self.use_cudnn)
+            x, self.W, self.b, self.stride, self.pad, self.use_cudnn,
+            cpu_algorithm=self.cpu_algorithm)
 
 
 def _pair(x):
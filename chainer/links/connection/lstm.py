@@ -76,7 +76,7 @@ class StatelessLSTM(LSTMBase):
         if c is None:
             xp = self.xp
             c = variable.Variable(
-                xp.zeros((len(x.data), self.state_size), dtype=x.data.dtype),
+                xp.zeros((x.shape[0], self.state_size), dtype=x.dtype),
                 volatile='auto')
         return lstm.lstm(c, lstm_in)
 
@@ -184,7 +184,7 @@ class LSTM(LSTMBase):
         if self.c is None:
             xp = self.xp
             self.c = variable.Variable(
-                xp.zeros((len(x.data), self.state_size), dtype=x.data.dtype),
+                xp.zeros((x.shape[0], self.state_size), dtype=x.dtype),
                 volatile='auto')
         self.c, self.h = lstm.lstm(self.c, lstm_in)
         return self.h
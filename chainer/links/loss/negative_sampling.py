@@ -3,6 +3,7 @@ import numpy
 from chainer import cuda
 from chainer.functions.loss import negative_sampling
 from chainer import link
+from chainer.utils import sparse
 from chainer.utils import walker_alias
 
 
@@ -19,6 +20,9 @@ class NegativeSampling(link.Link):
         counts (int list): Number of each identifiers.
         sample_size (int): Number of negative samples.
         power (float): Power factor :math:`\\alpha`.
+        sparse_grad (bool): If ``True``, the gradient of ``W`` on CPU is
+            computed as a :class:`~chainer.utils.sparse.RowSparseArray`,
+            which :meth:`~chainer.Link.zerograds` keeps row-sparse.
 
     .. seealso:: :func:`~chainer.functions.negative_sampling` for more detail.
 
@@ -26,12 +30,18 @@ class NegativeSampling(link.Link):
         W (~chainer.Variable): Weight parameter matrix.
 
     """
-    def __init__(self, in_size, counts, sample_size, power=0.75):
+    sparse_grad = False
+
+    def __init__(self, in_size, counts, sample_size, power=0.75,
+                 sparse_grad=False):
         vocab_size = len(counts)
         super(NegativeSampling, self).__init__(W=(vocab_size, in_size))
         self.W.data.fill(0)
 
         self.sample_size = sample_size
+        self.sparse_grad = sparse_grad
+        if sparse_grad:
+            self.W.grad = sparse.zeros(self.W.data.shape, self.W.data.dtype)
         power = numpy.float32(power)
         p = numpy.array(counts, power.dtype)
         numpy.power(p, power, p)
@@ -58,4 +68,5 @@ class NegativeSampling(link.Link):
 
         """
         return negative_sampling.negative_sampling(
-            x, t, self.W, self.sampler.sample, self.sample_size)
+            x, t, self.W, self.sampler.sample, self.sample_size,
+            sparse_grad=self.sparse_grad)
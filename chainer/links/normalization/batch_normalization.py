@@ -100,12 +100,12 @@ class BatchNormalization(link.Link):
             gamma = self.gamma
         else:
             gamma = variable.Variable(self.xp.ones(
-                self.avg_mean.shape, dtype=x.data.dtype), volatile='auto')
+                self.avg_mean.shape, dtype=x.dtype), volatile='auto')
         if hasattr(self, 'beta'):
             beta = self.beta
         else:
             beta = variable.Variable(self.xp.zeros(
-                self.avg_mean.shape, dtype=x.data.dtype), volatile='auto')
+                self.avg_mean.shape, dtype=x.dtype), volatile='auto')
 
         if use_batch_mean:
             func = batch_normalization.BatchNormalizationFunction(self.eps)
@@ -117,8 +117,8 @@ class BatchNormalization(link.Link):
             else:
                 decay = self.decay
 
-            with cuda.get_device(x.data):
-                m = x.data.size // gamma.data.size
+            with cuda.get_device(gamma.data):
+                m = x.size // gamma.data.size
                 adjust = m / max(m - 1., 1.)  # unbiased estimation
                 self.avg_mean *= decay
                 func.mean *= 1 - decay  # reuse buffer as a temporary
@@ -5,11 +5,16 @@ import six
 
 from chainer import cuda
 import chainer.link as link_module
+from chainer.utils import sparse
+from chainer import variable
 
 
 def _sum_sqnorm(arr):
     sq_sum = collections.defaultdict(float)
     for x in arr:
+        if isinstance(x, sparse.RowSparseArray):
+            # Rows of a row-sparse array are distinct
+            x = x.rows
         with cuda.get_device(x) as dev:
             x = x.ravel()
             s = x.dot(x)
@@ -227,9 +232,31 @@ class Optimizer(object):
         del self._hooks[name]
 
     def call_hooks(self):
-        """Invokes hook functions in registration order."""
+        """Invokes hook functions in registration order.
+
+        Consecutive :class:`~chainer.optimizer.WeightDecay`,
+        :class:`~chainer.optimizer.Lasso` and
+        :class:`~chainer.optimizer.GradientClipping` hooks are fused into one
+        sweep over the parameters and gradients, which gives the same result
+        as calling them one by one. Instances of their subclasses are also
+        fused unless the subclasses override ``__call__``.
+
+        """
+        fused = []
         for hook in six.itervalues(self._hooks):
+            if _is_fusable(hook):
+                fused.append(hook)
+                continue
+            if fused:
+                _call_fused_hooks(self, fused)
+                fused = []
             hook(self)
+        if fused:
+            _call_fused_hooks(self, fused)
+
+    def _hook_arrays(self):
+        # Returns the pairs of parameter and gradient arrays swept by hooks
+        return [(param.data, param.grad) for param in self.target.params()]
 
     def serialize(self, serializer):
         """Serializes or deserializes the optimizer.
@@ -327,6 +354,14 @@ class Optimizer(object):
         """
         for param, g_src in zip(self.target.params(), grads):
             g_dst = param.grad
+            if (isinstance(g_dst, sparse.RowSparseArray) or
+                    isinstance(g_src, sparse.RowSparseArray)):
+                # Row-sparse gradients are on CPU and not modified in place
+                if isinstance(g_dst, numpy.ndarray):
+                    g_src.add_to(g_dst)
+                else:
+                    param.grad = g_dst + cuda.to_cpu(g_src)
+                continue
             if isinstance(g_dst, numpy.ndarray):
                 g_dst += cuda.to_cpu(g_src)
                 continue
@@ -354,7 +389,123 @@ class GradientMethod(Optimizer):
     - :meth:`update_one` or both :meth:`update_one_cpu` and
       :meth:`update_one_gpu`
 
+    Attributes:
+        flat (bool): If ``True``, parameters, gradients and optimizer states
+            are packed into flat buffers. See :meth:`setup`.
+
     """
+    flat = False
+    _flat_groups = None
+    _flat_views = None
+    # Function allocating flat buffers of parameters and states on CPU, which
+    # is used to place them in shared memory
+    _flat_allocator = None
+    _scratch = None
+
+    def setup(self, link, flat=False):
+        """Sets a target link and initializes the optimizer states.
+
+        If ``flat`` is ``True``, the data and gradient arrays of all
+        parameters and the arrays in their state dictionaries are packed into
+        contiguous one-dimensional buffers, one set of buffers for each pair
+        of device and dtype, and the arrays of each parameter are replaced by
+        views of the buffers. Each update then calls :meth:`update_one` only
+        once per buffer with a variable holding the whole buffers, so the
+        cost of an update does not grow with the number of parameters. It
+        requires an update rule that treats each element independently,
+        which all built-in gradient methods do. Row-sparse gradients are
+        densified on each update.
+
+        If a data array is replaced (e.g. by :meth:`~chainer.Link.to_gpu`) or
+        a parameter is added after the set up, the buffers are rebuilt on the
+        next update. A replaced gradient array is copied back to the buffer.
+
+        Args:
+            link (~chainer.Link): Target link object.
+            flat (bool): If ``True``, arrays are packed into flat buffers.
+
+        """
+        self.flat = flat
+        self._flat_groups = None
+        super(GradientMethod, self).setup(link)
+
+    def prepare(self):
+        if not self.flat:
+            super(GradientMethod, self).prepare()
+        elif self._flat_groups is None or not self._bind_flat_buffers():
+            super(GradientMethod, self).prepare()
+            self._catch_up_all()
+            self._build_flat_buffers()
+
+    def _build_flat_buffers(self):
+        groups = collections.OrderedDict()
+        for name, param in self.target.namedparams():
+            data = param.data
+            key = int(cuda.get_device(data)), data.dtype
+            groups.setdefault(key, []).append((name, param))
+
+        views = {}
+        self._flat_groups = []
+        for members in six.itervalues(groups):
+            with cuda.get_device(members[0][1].data):
+                self._flat_groups.append(
+                    self._build_flat_group(members, views))
+        # Views are kept in the order of the parameters to check bindings
+        self._flat_views = [views[id(param)]
+                            for param in self.target.params()]
+
+    def _build_flat_group(self, members, views):
+        data = members[0][1].data
+        xp = cuda.get_array_module(data)
+        size = sum(param.data.size for _, param in members)
+        allocator = self._flat_allocator
+        if allocator is None or xp is not numpy:
+            allocator = xp.empty
+        flat_param = variable.Variable(allocator(size, dtype=data.dtype))
+        flat_param.grad = xp.empty_like(flat_param.data)
+        flat_state = {}
+        self.init_state(flat_param, flat_state)
+        for key, value in six.iteritems(flat_state):
+            if getattr(value, 'shape', None) != (size,):
+                raise ValueError(
+                    'state %s cannot be packed into a flat buffer' % key)
+            if allocator is not xp.empty:
+                flat_state[key] = allocator(size, dtype=value.dtype)
+                flat_state[key][...] = value
+
+        offset = 0
+        for name, param in members:
+            shape = param.data.shape
+            s = slice(offset, offset + param.data.size)
+            offset = s.stop
+
+            data_view = flat_param.data[s].reshape(shape)
+            data_view[...] = param.data
+            param.data = data_view
+            grad_view = flat_param.grad[s].reshape(shape)
+            _copy_grad(grad_view, param.grad)
+            param.grad = grad_view
+            views[id(param)] = param, data_view, grad_view
+
+            state = self._states[name]
+            for key, value in six.iteritems(flat_state):
+                state_view = value[s].reshape(shape)
+                state_view[...] = state[key]
+                state[key] = state_view
+        return flat_param, flat_state
+
+    def _bind_flat_buffers(self):
+        # Copies replaced gradients back to the buffers. Returns False if the
+        # buffers have to be rebuilt.
+        params = iter(self.target.params())
+        for param, data_view, grad_view in self._flat_views:
+            if next(params, None) is not param or param.data is not data_view:
+                return False
+            if param._grad is not grad_view:
+                _copy_grad(grad_view, param._grad)
+                param._grad = grad_view
+        return next(params, None) is None
+
     def update(self, lossfun=None, *args, **kwds):
         """Updates parameters based on a loss function or computed gradients.
 
@@ -376,10 +527,21 @@ class GradientMethod(Optimizer):
             loss = lossfun(*args, **kwds)
             loss.backward()
             del loss
+        if self._hooks:
+            # Hook functions only take dense gradients
+            for param in self.target.params():
+                if isinstance(param.grad, sparse.RowSparseArray):
+                    param.grad = param.grad.to_dense()
         self.call_hooks()
         self.prepare()
 
         self.t += 1
+        if self.flat:
+            for flat_param, flat_state in self._flat_groups:
+                with cuda.get_device(flat_param.data):
+                    self.update_one(flat_param, flat_state)
+            return
+
         states = self._states
         for name, param in self.target.namedparams():
             with cuda.get_device(param.data):
@@ -396,11 +558,146 @@ class GradientMethod(Optimizer):
             state (dict): State dictionary.
 
         """
+        if isinstance(param.grad, sparse.RowSparseArray):
+            self.update_one_sparse(param, state)
+            return
+        if 'last_t' in state:
+            self.catch_up(param, state)
         if isinstance(param.data, numpy.ndarray):
             self.update_one_cpu(param, state)
         else:
             self.update_one_gpu(param, state)
 
+    def update_one_sparse(self, param, state):
+        """Updates a parameter by a row-sparse gradient on CPU.
+
+        The gradient is a :class:`~chainer.utils.sparse.RowSparseArray`. The
+        default implementation converts it to a dense array and calls
+        :meth:`update_one_cpu`. Implementations can override it to update only
+        the rows involved in the gradient. If the update of a row by a zero
+        gradient is not trivial (e.g. the state decays), such implementations
+        call :meth:`catch_up` with the involved rows first and implement
+        :meth:`catch_up_rows`.
+
+        Args:
+            param (~chainer.Variable): Parameter variable.
+            state (dict): State dictionary.
+
+        """
+        param.grad = param.grad.to_dense()
+        self.update_one_cpu(param, state)
+
+    def catch_up(self, param, state, indices=None):
+        """Applies the updates lazily skipped by sparse updates to rows.
+
+        Lazy implementations of :meth:`update_one_sparse` call it before
+        updating the involved rows. It records the step at which each row is
+        updated to the ``'last_t'`` entry of the state, and calls
+        :meth:`catch_up_rows` with the rows that have skipped steps since
+        their last updates, i.e. the steps in which they have got zero
+        gradients. If ``indices`` is ``None``, all rows are caught up and the
+        record is removed from the state. It is done before dense updates and
+        serialization, so the lazy update does not change the results of
+        them.
+
+        Args:
+            param (~chainer.Variable): Parameter variable.
+            state (dict): State dictionary.
+            indices (numpy.ndarray): Indices of the rows to be updated in the
+                current step.
+
+        """
+        if indices is None:
+            if 'last_t' in state:
+                # Steps before the current one are skipped
+                self._catch_up_all_rows(param, state, self.t - 1)
+            return
+
+        last_t = state.get('last_t')
+        if last_t is None:
+            # All rows are up to date before the first sparse update
+            last_t = numpy.full(len(param.data), self.t - 1, dtype=numpy.int64)
+            state['last_t'] = last_t
+        steps = (self.t - 1) - last_t[indices]
+        last_t[indices] = self.t
+        skipped = steps != 0
+        if not skipped.all():
+            indices = indices[skipped]
+            steps = steps[skipped]
+        if len(steps) != 0:
+            steps = steps.reshape((-1,) + (1,) * (param.data.ndim - 1))
+            self.catch_up_rows(param, state, indices, steps)
+
+    def _catch_up_all_rows(self, param, state, t):
+        # Catches up all rows to the t-th step and removes the record
+        last_t = state.pop('last_t')
+        steps = (t - last_t).reshape((-1,) + (1,) * (param.data.ndim - 1))
+        self.catch_up_rows(param, state, slice(None), steps)
+
+    def catch_up_rows(self, param, state, indices, steps):
+        """Updates rows of a parameter by zero gradients for skipped steps.
+
+        Implementations that call :meth:`catch_up` must override it to apply
+        ``steps`` updates by zero gradients to the given rows of the parameter
+        and the state at once.
+
+        Args:
+            param (~chainer.Variable): Parameter variable.
+            state (dict): State dictionary.
+            indices (numpy.ndarray or slice): Indices of the rows.
+            steps (numpy.ndarray): Numbers of skipped steps of the rows, which
+                are broadcastable to the rows.
+
+        """
+        raise NotImplementedError
+
+    def _hook_arrays(self):
+        if not self.flat:
+            return super(GradientMethod, self)._hook_arrays()
+        # Fused hooks sweep the flat buffers instead of each parameter
+        self.prepare()
+        return [(p.data, p.grad) for p, _ in self._flat_groups]
+
+    def serialize(self, serializer):
+        self._catch_up_all()
+        super(GradientMethod, self).serialize(serializer)
+
+    def _catch_up_all(self):
+        states = self._states
+        for name, param in self.target.namedparams():
+            state = states.get(name)
+            if state is not None and 'last_t' in state:
+                with cuda.get_device(param.data):
+                    self._catch_up_all_rows(param, state, self.t)
+
+    def get_scratch(self, array, n=1):
+        """Returns temporary arrays for an update on CPU.
+
+        The arrays are views of buffers owned by the optimizer, which are
+        shared by all parameters and only reallocated when a larger parameter
+        comes. CPU update rules use them as the ``out`` arguments of ufuncs so
+        that an update allocates no memory in the steady state. Their contents
+        are undefined when they are returned.
+
+        Args:
+            array (numpy.ndarray): Array whose shape and dtype are used.
+            n (int): Number of arrays.
+
+        Returns:
+            list of numpy.ndarray: ``n`` distinct arrays of the same shape and
+            dtype as ``array``.
+
+        """
+        if self._scratch is None:
+            self._scratch = {}
+        size = array.size
+        buf = self._scratch.get(array.dtype)
+        if buf is None or len(buf) < n * size:
+            buf = numpy.empty(n * size, dtype=array.dtype)
+            self._scratch[array.dtype] = buf
+        return [buf[i * size:(i + 1) * size].reshape(array.shape)
+                for i in six.moves.range(n)]
+
     def update_one_cpu(self, param, state):
         """Updates a parameter on CPU.
 
@@ -422,6 +719,16 @@ class GradientMethod(Optimizer):
         raise NotImplementedError
 
 
+def _copy_grad(dst, grad):
+    if grad is None:
+        dst.fill(0)
+    elif isinstance(grad, sparse.RowSparseArray):
+        dst.fill(0)
+        grad.add_to(dst)
+    else:
+        dst[...] = grad
+
+
 class WeightDecay(object):
 
     """Optimizer hook function for weight decay regularization.
@@ -442,18 +749,7 @@ class WeightDecay(object):
         self.rate = rate
 
     def __call__(self, opt):
-        if cuda.available:
-            kernel = cuda.elementwise(
-                'T p, T decay', 'T g', 'g += decay * p', 'weight_decay')
-
-        rate = self.rate
-        for param in opt.target.params():
-            p, g = param.data, param.grad
-            with cuda.get_device(p) as dev:
-                if int(dev) == -1:
-                    g += rate * p
-                else:
-                    kernel(p, rate, g)
+        _call_fused_hooks(opt, (self,))
 
 
 class Lasso(object):
@@ -475,20 +771,7 @@ class Lasso(object):
         self.rate = rate
 
     def __call__(self, opt):
-        if cuda.available:
-            kernel = cuda.elementwise(
-                'T s, T decay', 'T g', 'g += decay * s', 'lasso')
-
-        rate = self.rate
-        for param in opt.target.params():
-            p, g = param.data, param.grad
-            xp = cuda.get_array_module(p)
-            sign = xp.sign(p)
-            with cuda.get_device(p) as dev:
-                if int(dev) == -1:
-                    g += rate * sign
-                else:
-                    kernel(sign, rate, g)
+        _call_fused_hooks(opt, (self,))
 
 
 class GradientClipping(object):
@@ -511,10 +794,114 @@ class GradientClipping(object):
         self.threshold = threshold
 
     def __call__(self, opt):
-        norm = numpy.sqrt(_sum_sqnorm([p.grad for p in opt.target.params()]))
-        rate = self.threshold / norm
-        if rate < 1:
-            for param in opt.target.params():
-                grad = param.grad
-                with cuda.get_device(grad):
-                    grad *= rate
+        _call_fused_hooks(opt, (self,))
+
+
+_fusable_hook_types = WeightDecay, Lasso, GradientClipping
+
+
+def _is_fusable(hook):
+    # Subclasses overriding __call__ define their own behavior
+    call = getattr(type(hook), '__call__', None)
+    for hook_type in _fusable_hook_types:
+        if (isinstance(hook, hook_type) and
+                six.get_unbound_function(call) is
+                six.get_unbound_function(hook_type.__call__)):
+            return True
+    return False
+
+
+# Number of elements processed at once by fused hooks on CPU
+_hook_chunk_size = 32768
+
+
+def _call_fused_hooks(opt, hooks):
+    # Applies a sequence of WeightDecay, Lasso and GradientClipping hooks. The
+    # update of gradients by the hooks is accumulated to the coefficients of
+    # ``g <- a * g + b * p + c * sign(p)``, which is applied in place only
+    # when the norm of the gradients is needed and at the end. The norm is
+    # computed in the same sweep over the arrays as the application.
+    arrays = opt._hook_arrays()
+    a, b, c = 1., 0., 0.
+    for hook in hooks:
+        if isinstance(hook, WeightDecay):
+            b += hook.rate
+        elif isinstance(hook, Lasso):
+            c += hook.rate
+        else:  # GradientClipping
+            if b == 0 and c == 0:
+                sqnorm = a * a * _apply_hooks(opt, arrays, 1., 0., 0., True)
+            else:
+                sqnorm = _apply_hooks(opt, arrays, a, b, c, True)
+                a, b, c = 1., 0., 0.
+            norm = numpy.sqrt(sqnorm)
+            if norm > hook.threshold:
+                a *= hook.threshold / norm
+    if a != 1 or b != 0 or c != 0:
+        _apply_hooks(opt, arrays, a, b, c, False)
+
+
+def _apply_hooks(opt, arrays, a, b, c, sqnorm):
+    # Updates each gradient to ``a * g + b * p + c * sign(p)`` and returns the
+    # squared norm of the results if ``sqnorm`` is True
+    identity = a == 1 and b == 0 and c == 0
+    sums = collections.defaultdict(float)
+    for p, g in arrays:
+        with cuda.get_device(p) as dev:
+            if int(dev) == -1:
+                sums[-1] += _apply_hooks_cpu(opt, p, g, a, b, c, sqnorm)
+                continue
+            if not identity:
+                cuda.elementwise(
+                    'T p, T a, T b, T c', 'T g',
+                    'g = a * g + b * p + c * ((p > 0) - (p < 0))',
+                    'fused_hooks')(p, a, b, c, g)
+            if sqnorm:
+                g = g.ravel()
+                sums[int(dev)] += g.dot(g)
+    # Each device is synchronized only once
+    return sum([float(x) for x in six.itervalues(sums)])
+
+
+def _apply_hooks_cpu(opt, p, g, a, b, c, sqnorm):
+    # Large arrays are processed in chunks that fit in the cache, so that
+    # each element of the gradient is read and written only once
+    step = _hook_chunk_size
+    chunked = (g.size > step and g.flags.c_contiguous and
+               p.flags.c_contiguous)
+    if chunked:
+        g = g.reshape(-1)
+        p = p.reshape(-1)
+
+    tmp = None
+    if b != 0 or c != 0:
+        if isinstance(opt, GradientMethod):
+            tmp, = opt.get_scratch(g[:step] if chunked else g)
+        else:
+            tmp = numpy.empty_like(g[:step] if chunked else g)
+
+    if not chunked:
+        return _apply_hooks_chunk(p, g, a, b, c, tmp, sqnorm)
+    ret = 0.
+    for i in six.moves.range(0, len(g), step):
+        gi = g[i:i + step]
+        ret += _apply_hooks_chunk(
+            p[i:i + step], gi, a, b, c,
+            None if tmp is None else tmp[:len(gi)], sqnorm)
+    return ret
+
+
+def _apply_hooks_chunk(p, g, a, b, c, tmp, sqnorm):
+    if a != 1:
+        g *= a
+    if b != 0:
+        numpy.multiply(p, b, out=tmp)
+        g += tmp
+    if c != 0:
+        numpy.sign(p, out=tmp)
+        tmp *= c
+        g += tmp
+    if sqnorm:
+        g = g.ravel()
+        return g.dot(g)
+    return 0.
@@ -27,11 +27,21 @@ class AdaDelta(optimizer.GradientMethod):
         grad = param.grad
         msg, msdx = state['msg'], state['msdx']
 
+        dx, tmp = self.get_scratch(grad, 2)
+
         msg *= self.rho
-        msg += (1 - self.rho) * grad * grad
-        dx = numpy.sqrt((msdx + self.eps) / (msg + self.eps)) * grad
+        numpy.multiply(grad, grad, out=tmp)
+        tmp *= 1 - self.rho
+        msg += tmp
+        numpy.add(msdx, self.eps, out=dx)
+        numpy.add(msg, self.eps, out=tmp)
+        dx /= tmp
+        numpy.sqrt(dx, out=dx)
+        dx *= grad
         msdx *= self.rho
-        msdx += (1 - self.rho) * dx * dx
+        numpy.multiply(dx, dx, out=tmp)
+        tmp *= 1 - self.rho
+        msdx += tmp
         param.data -= dx
 
     def update_one_gpu(self, param, state):
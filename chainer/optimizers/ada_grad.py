@@ -8,6 +8,9 @@ class AdaGrad(optimizer.GradientMethod):
 
     """AdaGrad implementation.
 
+    On a row-sparse gradient, only the involved rows of the parameter and the
+    state are updated, which gives the same result as the dense update.
+
     See: http://jmlr.org/papers/v12/duchi11a.html
 
     """
@@ -23,9 +26,25 @@ class AdaGrad(optimizer.GradientMethod):
     def update_one_cpu(self, param, state):
         h = state['h']
         grad = param.grad
+        tmp, = self.get_scratch(grad)
+
+        numpy.multiply(grad, grad, out=tmp)
+        h += tmp
+        numpy.sqrt(h, out=tmp)
+        tmp += self.eps
+        numpy.divide(grad, tmp, out=tmp)
+        tmp *= self.lr
+        param.data -= tmp
+
+    def update_one_sparse(self, param, state):
+        grad = param.grad
+        indices, rows = grad.indices, grad.rows
+        h = state['h']
 
-        h += grad * grad
-        param.data -= self.lr * grad / (numpy.sqrt(h) + self.eps)
+        h_rows = h[indices]
+        h_rows += rows * rows
+        h[indices] = h_rows
+        param.data[indices] -= self.lr * rows / (numpy.sqrt(h_rows) + self.eps)
 
     def update_one_gpu(self, param, state):
         cuda.elementwise(
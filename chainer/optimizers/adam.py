@@ -10,6 +10,13 @@ class Adam(optimizer.GradientMethod):
 
     """Adam optimization algorithm.
 
+    On a row-sparse gradient, only the involved rows of the parameter and the
+    state are updated. The moments of the other rows are decayed when they
+    are involved next time, while the parameter rows are not moved by the
+    decayed moments in the skipped steps. This is the lazy variant of Adam
+    often used for embeddings; the result differs from the dense update for
+    rows that have not been involved in some steps.
+
     See: http://arxiv.org/abs/1412.6980v8
 
     """
@@ -28,10 +35,40 @@ class Adam(optimizer.GradientMethod):
     def update_one_cpu(self, param, state):
         m, v = state['m'], state['v']
         grad = param.grad
+        tmp, = self.get_scratch(grad)
+
+        numpy.subtract(grad, m, out=tmp)
+        tmp *= 1 - self.beta1
+        m += tmp
+        numpy.multiply(grad, grad, out=tmp)
+        tmp -= v
+        tmp *= 1 - self.beta2
+        v += tmp
+        numpy.sqrt(v, out=tmp)
+        tmp += self.eps
+        numpy.divide(m, tmp, out=tmp)
+        tmp *= self.lr
+        param.data -= tmp
 
-        m += (1 - self.beta1) * (grad - m)
-        v += (1 - self.beta2) * (grad * grad - v)
-        param.data -= self.lr * m / (numpy.sqrt(v) + self.eps)
+    def update_one_sparse(self, param, state):
+        grad = param.grad
+        indices, rows = grad.indices, grad.rows
+        self.catch_up(param, state, indices)
+        m, v = state['m'], state['v']
+
+        m_rows = m[indices]
+        v_rows = v[indices]
+        m_rows += (1 - self.beta1) * (rows - m_rows)
+        v_rows += (1 - self.beta2) * (rows * rows - v_rows)
+        m[indices] = m_rows
+        v[indices] = v_rows
+        param.data[indices] -= self.lr * m_rows / (
+            numpy.sqrt(v_rows) + self.eps)
+
+    def catch_up_rows(self, param, state, indices, steps):
+        m, v = state['m'], state['v']
+        m[indices] *= self.beta1 ** steps
+        v[indices] *= self.beta2 ** steps
 
     def update_one_gpu(self, param, state):
         cuda.elementwise(
@@ -1,10 +1,22 @@
+import numpy
+
 from chainer import cuda
 from chainer import optimizer
 
 
 class MomentumSGD(optimizer.GradientMethod):
 
-    """Classical momentum SGD."""
+    """Classical momentum SGD.
+
+    On a row-sparse gradient, only the involved rows of the parameter and the
+    state are updated. The other rows catch up with the skipped steps when
+    they are involved next time, which gives the same result as the dense
+    update for the same gradients as long as the hyperparameters are fixed.
+    Note that a row is caught up after the gradient is computed, so in
+    training the gradient of a row with skipped steps is evaluated at a
+    stale value of the row; the result then differs from the dense update.
+
+    """
 
     def __init__(self, lr=0.01, momentum=0.9):
         self.lr = lr
@@ -17,10 +29,39 @@ class MomentumSGD(optimizer.GradientMethod):
 
     def update_one_cpu(self, param, state):
         v = state['v']
+        grad = param.grad
+        tmp, = self.get_scratch(grad)
+
         v *= self.momentum
-        v -= self.lr * param.grad
+        numpy.multiply(grad, self.lr, out=tmp)
+        v -= tmp
         param.data += v
 
+    def update_one_sparse(self, param, state):
+        grad = param.grad
+        indices = grad.indices
+        self.catch_up(param, state, indices)
+
+        v = state['v']
+        v_rows = v[indices]
+        v_rows *= self.momentum
+        v_rows -= self.lr * grad.rows
+        v[indices] = v_rows
+        param.data[indices] += v_rows
+
+    def catch_up_rows(self, param, state, indices, steps):
+        # Zero gradients decay the velocity geometrically
+        v = state['v']
+        momentum = self.momentum
+        decay = momentum ** steps
+        if momentum == 1:
+            coeff = steps
+        else:
+            coeff = momentum * (1 - decay) / (1 - momentum)
+        v_rows = v[indices]
+        param.data[indices] += v_rows * coeff
+        v[indices] = v_rows * decay
+
     def update_one_gpu(self, param, state):
         cuda.elementwise(
             'T grad, T lr, T momentum',
@@ -1,3 +1,5 @@
+import numpy
+
 from chainer import cuda
 from chainer import optimizer
 
@@ -23,10 +25,16 @@ class NesterovAG(optimizer.GradientMethod):
 
     def update_one_cpu(self, param, state):
         v = state['v']
+        grad = param.grad
+        tmp, = self.get_scratch(grad)
+
         v *= self.momentum
-        v -= self.lr * param.grad
-        param.data += self.momentum * self.momentum * v
-        param.data -= (1 + self.momentum) * self.lr * param.grad
+        numpy.multiply(grad, self.lr, out=tmp)
+        v -= tmp
+        numpy.multiply(v, self.momentum * self.momentum, out=tmp)
+        param.data += tmp
+        numpy.multiply(grad, (1 + self.momentum) * self.lr, out=tmp)
+        param.data -= tmp
 
     def update_one_gpu(self, param, state):
         cuda.elementwise(
@@ -22,9 +22,17 @@ class RMSprop(optimizer.GradientMethod):
         ms = state['ms']
         grad = param.grad
 
+        tmp, = self.get_scratch(grad)
+
         ms *= self.alpha
-        ms += (1 - self.alpha) * grad * grad
-        param.data -= self.lr * grad / (numpy.sqrt(ms) + self.eps)
+        numpy.multiply(grad, grad, out=tmp)
+        tmp *= 1 - self.alpha
+        ms += tmp
+        numpy.sqrt(ms, out=tmp)
+        tmp += self.eps
+        numpy.divide(grad, tmp, out=tmp)
+        tmp *= self.lr
+        param.data -= tmp
 
     def update_one_gpu(self, param, state):
         cuda.elementwise(
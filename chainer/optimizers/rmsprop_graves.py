@@ -29,12 +29,23 @@ class RMSpropGraves(optimizer.GradientMethod):
         n, g, delta = state['n'], state['g'], state['delta']
         grad = param.grad
 
+        tmp, = self.get_scratch(grad)
+
         n *= self.alpha
-        n += (1 - self.alpha) * grad * grad
+        numpy.multiply(grad, grad, out=tmp)
+        tmp *= 1 - self.alpha
+        n += tmp
         g *= self.alpha
-        g += (1 - self.alpha) * grad
+        numpy.multiply(grad, 1 - self.alpha, out=tmp)
+        g += tmp
         delta *= self.momentum
-        delta -= self.lr * grad / numpy.sqrt(n - g * g + self.eps)
+        numpy.multiply(g, g, out=tmp)
+        numpy.subtract(n, tmp, out=tmp)
+        tmp += self.eps
+        numpy.sqrt(tmp, out=tmp)
+        numpy.divide(grad, tmp, out=tmp)
+        tmp *= self.lr
+        delta -= tmp
         param.data += delta
 
     def update_one_gpu(self, param, state):
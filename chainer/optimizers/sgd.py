@@ -1,3 +1,5 @@
+import numpy
+
 from chainer import cuda
 from chainer import optimizer
 
@@ -10,7 +12,13 @@ class SGD(optimizer.GradientMethod):
         self.lr = lr
 
     def update_one_cpu(self, param, state):
-        param.data -= self.lr * param.grad
+        tmp, = self.get_scratch(param.grad)
+        numpy.multiply(param.grad, self.lr, out=tmp)
+        param.data -= tmp
+
+    def update_one_sparse(self, param, state):
+        grad = param.grad
+        param.data[grad.indices] -= self.lr * grad.rows
 
     def update_one_gpu(self, param, state):
         cuda.elementwise('T grad, T lr', 'T param',
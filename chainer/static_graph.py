@@ -0,0 +1,535 @@
+import copy
+import functools
+import weakref
+
+import numpy
+import six
+
+import chainer
+from chainer import cuda
+from chainer import flag
+from chainer import function
+from chainer.functions.activation import relu
+from chainer.functions.connection import convolution_2d
+from chainer.functions.connection import linear
+from chainer import variable
+
+
+_fusion = False
+
+# Types of link attributes included in the signature of a call
+_state_types = (bool, float, type(None)) + six.integer_types + \
+    six.string_types
+
+# Attributes of links holding the names of parameters, persistent values and
+# child links
+_link_attrs = ('_params', '_persistent', '_children')
+
+# Maps links to the names of their attributes included in the signature
+_state_names = weakref.WeakKeyDictionary()
+
+# Maximum number of schedules recorded per link and method
+_schedule_cache_size = 64
+
+
+def get_fusion():
+    """Returns ``True`` if recorded graphs are fused."""
+    return _fusion
+
+
+def set_fusion(flag):
+    """Enables or disables fusion of functions in recorded graphs.
+
+    If it is ``True``, :func:`static_graph` replaces a convolution or a
+    linear function followed by :class:`~chainer.functions.ReLU` in recorded
+    schedules with a single function applying ReLU in place of the output
+    (see :func:`~chainer.functions.convolution_2d_relu` and
+    :func:`~chainer.functions.linear_relu`), unless the output before the
+    rectification is used elsewhere. It affects graphs recorded after the
+    call. Since :func:`static_graph` also replays recorded graphs in the
+    inference mode (see :func:`chainer.inference_mode`), fused functions are
+    used in prediction as well.
+
+    Args:
+        flag (bool): ``True`` to fuse functions.
+
+    """
+    global _fusion
+    _fusion = flag
+
+
+def _fuse_convolution_2d_relu(func):
+    fused = convolution_2d.Convolution2DReLUFunction(
+        (func.sy, func.sx), (func.ph, func.pw), func.use_cudnn,
+        func.cover_all, func.cpu_algorithm)
+    fused.layout = func.layout
+    return fused
+
+
+def _fuse_linear_relu(func):
+    return linear.LinearReLUFunction()
+
+
+# Maps types of functions to factories of the functions fused with ReLU
+_relu_fusions = {
+    convolution_2d.Convolution2DFunction: _fuse_convolution_2d_relu,
+    linear.LinearFunction: _fuse_linear_relu,
+}
+
+
+def _fuse(steps, output_slots):
+    # Fuses each function in _relu_fusions with the following ReLU if the
+    # output of the former is only used by the latter
+    uses = {}
+    for _, in_slots, _ in steps:
+        for i in in_slots:
+            uses[i] = uses.get(i, 0) + 1
+    for i in output_slots:
+        uses[i] = uses.get(i, 0) + 1
+
+    producers = {}
+    fused_steps = []
+    for template, in_slots, out_slots in steps:
+        if type(template) is relu.ReLU:
+            i = in_slots[0]
+            if uses[i] == 1 and i in producers:
+                k = producers.pop(i)
+                first, first_in_slots, _ = fused_steps[k]
+                fused_steps[k] = (_relu_fusions[type(first)](first),
+                                  first_in_slots, out_slots)
+                continue
+        if type(template) in _relu_fusions and out_slots[0] is not None:
+            producers[out_slots[0]] = len(fused_steps)
+        fused_steps.append((template, in_slots, out_slots))
+    return fused_steps
+
+
+class _Recorder(function.FunctionHook):
+
+    name = 'StaticGraphRecorder'
+
+    def __init__(self):
+        self.templates = []
+        self.functions = []
+
+    def forward_preprocess(self, func, in_data):
+        # Copy the function before it stores any state of forward computation
+        self.templates.append(copy.copy(func))
+
+    def forward_postprocess(self, func, in_data):
+        self.functions.append(func)
+
+
+class _Schedule(object):
+
+    """Recorded sequence of function applications on array slots.
+
+    Slots ``0, ..., n_inputs - 1`` correspond to the inputs of the replayed
+    function, i.e. the variable arguments followed by the leaf variables
+    captured by reference. The remaining slots hold outputs of the recorded
+    functions.
+
+    """
+    def __init__(self, n_args, leaves, steps, n_slots, output_slots,
+                 return_tuple):
+        self.n_args = n_args
+        self.leaves = leaves
+        self.steps = steps
+        self.n_slots = n_slots
+        self.output_slots = output_slots
+        self.return_tuple = return_tuple
+
+
+def _get_state_names(link):
+    # Returns the attribute dicts of the links with their sizes, and pairs of
+    # the dicts and the names of their attributes except parameters,
+    # persistent values, child links and _link_attrs. The dicts are held
+    # instead of the links, which must not be referenced by the values of
+    # _state_names.
+    sizes = []
+    names = []
+    for child in link.links():
+        d = child.__dict__
+        excluded = set(_link_attrs)
+        excluded.update(child._params)
+        excluded.update(child._persistent)
+        excluded.update(getattr(child, '_children', ()))
+        sizes.append((d, len(d)))
+        names.extend([(d, name) for name in sorted(d)
+                      if name not in excluded])
+    return sizes, names
+
+
+def _link_state(link):
+    # Values of the scalar attributes of the links, which may switch the
+    # control flow of the method (e.g. a ``train`` flag). Other attributes
+    # are represented by their types. The names of the attributes are cached
+    # until an attribute of some link is added or removed.
+    cached = _state_names.get(link)
+    if cached is None or any([len(d) != n for d, n in cached[0]]):
+        cached = _state_names[link] = _get_state_names(link)
+    values = [d.get(name, _state_names) for d, name in cached[1]]
+    return tuple([value if isinstance(value, _state_types) else type(value)
+                  for value in values])
+
+
+def _snapshot(link):
+    snapshot = []
+    for child in link.links():
+        arrays = []
+        for name in child._persistent:
+            value = getattr(child, name)
+            if isinstance(value, (numpy.ndarray, cuda.ndarray)):
+                arrays.append((value, value.copy()))
+        snapshot.append((child, dict(child.__dict__), arrays))
+    return snapshot
+
+
+def _is_mutated(snapshot):
+    # Checks if an attribute of the links is added, removed or rebound (e.g.
+    # states of recurrent links and the counter of batch normalization) or a
+    # persistent array is updated in place (e.g. population statistics of
+    # batch normalization), which replay cannot reproduce
+    for child, attrs, arrays in snapshot:
+        d = child.__dict__
+        if len(d) != len(attrs):
+            return True
+        for name, value in six.iteritems(attrs):
+            if d.get(name, attrs) is not value:
+                return True
+        for value, copied in arrays:
+            changed = value != copied
+            if value.dtype.kind in 'fc':
+                # NaNs are kept as is
+                changed &= (value == value) | (copied == copied)
+            if bool(changed.any()):
+                return True
+    return False
+
+
+def _restore(snapshot):
+    for child, attrs, arrays in snapshot:
+        child.__dict__.clear()
+        child.__dict__.update(attrs)
+        for value, copied in arrays:
+            value[...] = copied
+
+
+def _is_array(x):
+    return isinstance(x, (numpy.ndarray, cuda.ndarray))
+
+
+def _has_array_state(link):
+    # Checks if a link holds an array other than persistent values, e.g. a
+    # state of a recurrent link computed in the inference mode
+    for child in link.links():
+        persistent = child._persistent
+        for name, value in six.iteritems(child.__dict__):
+            if name not in persistent and _is_array(value):
+                return True
+    return False
+
+
+def _capture(method, link, args, kwargs):
+    # Runs the method in define-by-run mode and records its schedule. Returns
+    # the outputs of the method and the schedule, the latter of which is None
+    # if the graph cannot be replayed.
+    inference = chainer.is_inference_mode()
+    var_args = []
+    capture_args = []
+    for arg in args:
+        if inference and _is_array(arg):
+            arg = variable.Variable(arg)
+        if isinstance(arg, variable.Variable):
+            if arg.volatile is flag.ON:
+                # Graph is needed to trace the data flow
+                arg = variable.Variable(arg.data, name=arg.name)
+            var_args.append(arg)
+        capture_args.append(arg)
+
+    recorder = _Recorder()
+    if inference:
+        if _has_array_state(link):
+            # Functions applied to the state would not accept it outside the
+            # inference mode
+            return method(link, *args, **kwargs), None
+        # The graph is built even in the inference mode to trace the data
+        # flow. The method may still use operations of arrays which variables
+        # do not support, in which case it is run again in the inference mode
+        # below.
+        snapshot = _snapshot(link)
+        chainer.thread_local.inference_mode = False
+        try:
+            with recorder:
+                outputs = method(link, *capture_args, **kwargs)
+            outputs, schedule = _record(
+                recorder, snapshot, outputs, args, var_args)
+        except (AttributeError, TypeError):
+            schedule = None
+        finally:
+            chainer.thread_local.inference_mode = True
+        if schedule is None:
+            # Side effects of the capture are made on variables, which are
+            # rolled back to run the method in the inference mode
+            _restore(snapshot)
+            return method(link, *args, **kwargs), None
+        out_data = tuple([y.data for y in outputs]) if schedule.return_tuple \
+            else outputs.data
+        return out_data, schedule
+
+    snapshot = _snapshot(link)
+    with recorder:
+        outputs = method(link, *capture_args, **kwargs)
+    return _record(recorder, snapshot, outputs, args, var_args)
+
+
+def _record(recorder, snapshot, outputs, args, var_args):
+    if _is_mutated(snapshot):
+        return outputs, None
+
+    return_tuple = isinstance(outputs, tuple)
+    out_vars = outputs if return_tuple else (outputs,)
+    if not all(isinstance(y, variable.Variable) for y in out_vars):
+        return outputs, None
+
+    recorded = set(recorder.functions)
+    if any(func._n_local_function_hooks != 0 or func.inputs is None
+           for func in recorder.functions):
+        return outputs, None
+
+    slots = {}
+    for i, x in enumerate(var_args):
+        slots.setdefault(id(x), i)
+    n_args = len(var_args)
+
+    # Leaf variables (parameters and constants) are captured by reference
+    leaves = []
+    for func in recorder.functions:
+        for x in func.inputs:
+            if id(x) in slots:
+                continue
+            creator = x.creator
+            if creator is None:
+                slots[id(x)] = n_args + len(leaves)
+                leaves.append(x)
+            elif creator not in recorded:
+                # Variable coming from a graph built out of the method
+                return outputs, None
+
+    steps = []
+    n_slots = n_args + len(leaves)
+    for template, func in six.moves.zip(
+            recorder.templates, recorder.functions):
+        in_slots = tuple([slots[id(x)] for x in func.inputs])
+        out_slots = []
+        for y_ref in func.outputs:
+            y = y_ref()
+            if y is None:
+                out_slots.append(None)
+            else:
+                slots[id(y)] = n_slots
+                out_slots.append(n_slots)
+            n_slots += 1
+        steps.append((template, in_slots, tuple(out_slots)))
+
+    output_slots = []
+    for y in out_vars:
+        if y.creator not in recorded:
+            return outputs, None
+        output_slots.append(slots[id(y)])
+
+    if _fusion:
+        steps = _fuse(steps, output_slots)
+
+    if any(x.volatile is flag.ON for x in args
+           if isinstance(x, variable.Variable)):
+        outputs = tuple([variable.Variable(y.data, volatile=flag.ON)
+                         for y in out_vars])
+        if not return_tuple:
+            outputs = outputs[0]
+    schedule = _Schedule(n_args, leaves, steps, n_slots, tuple(output_slots),
+                         return_tuple)
+    return outputs, schedule
+
+
+class StaticGraphFunction(function.Function):
+
+    """Function replaying a recorded schedule of function applications.
+
+    Each application copies the recorded functions and runs their forward
+    methods directly on arrays, without creating intermediate variables,
+    checking types or running function hooks. Backward methods are called in
+    the reverse order of the schedule.
+
+    Args:
+        schedule: Schedule recorded by :func:`static_graph`.
+
+    """
+    def __init__(self, schedule):
+        self.schedule = schedule
+
+    @property
+    def label(self):
+        return 'StaticGraph'
+
+    def forward(self, inputs):
+        schedule = self.schedule
+        data = list(inputs) + [None] * (schedule.n_slots - len(inputs))
+        steps = []
+        for template, in_slots, out_slots in schedule.steps:
+            func = copy.copy(template)
+            in_data = tuple([data[i] for i in in_slots])
+            out_data = func.forward(in_data)
+            for i, y in six.moves.zip(out_slots, out_data):
+                if i is not None:
+                    data[i] = y
+            steps.append((func, in_data))
+        if not chainer.is_inference_mode():
+            # Input arrays of each step are kept for backward
+            self._steps = steps
+        return tuple([data[i] for i in schedule.output_slots])
+
+    def backward(self, inputs, grad_outputs):
+        schedule = self.schedule
+        grads = [None] * schedule.n_slots
+        owned = set()
+
+        def accumulate(i, gx):
+            g = grads[i]
+            if g is None:
+                grads[i] = gx
+            elif i in owned:
+                g += gx
+            else:
+                grads[i] = g + gx
+                owned.add(i)
+
+        for i, gy in six.moves.zip(schedule.output_slots, grad_outputs):
+            if gy is not None:
+                accumulate(i, gy)
+
+        for (func, in_data), (_, in_slots, out_slots) in six.moves.zip(
+                reversed(self._steps), reversed(schedule.steps)):
+            out_grad = tuple([None if i is None else grads[i]
+                              for i in out_slots])
+            if all(gy is None for gy in out_grad):
+                continue
+            for i in out_slots:
+                if i is not None:
+                    grads[i] = None
+            gxs = func.backward(in_data, out_grad)
+            for i, gx in six.moves.zip(in_slots, gxs):
+                if gx is not None:
+                    accumulate(i, gx)
+            del gxs, out_grad  # to reduce memory usage
+
+        self._steps = None
+        return tuple(grads[:len(inputs)])
+
+
+def static_graph(method):
+    """Decorator to capture and replay the computational graph of a method.
+
+    This decorator is applied to a method of :class:`~chainer.Link` (typically
+    ``__call__``) whose computational graph is fixed for given shapes of the
+    input variables. On the first call, the method is run in the usual
+    define-by-run manner while the applied functions are recorded. On later
+    calls with the same signature, the recorded schedule is replayed by a
+    single :class:`StaticGraphFunction`, which skips type checking and the
+    construction of intermediate variables and functions on forward, and the
+    traversal of the graph on backward.
+
+    The signature of a call consists of the types, shapes and dtypes of the
+    variable arguments, the values of other arguments, and the values of
+    scalar attributes (booleans, numbers, strings and ``None``) and the types
+    of other attributes of the link and its descendants except parameters,
+    persistent values and child links. So non-variable arguments
+    and attributes like a ``train`` flag may switch the control flow. If the
+    signature changes, a new schedule is recorded for it. Functions in the
+    schedule can be fused by :func:`set_fusion`. In the inference mode (see
+    :func:`chainer.inference_mode`), arrays are accepted as variable
+    arguments, and the schedule is recorded with the mode temporarily
+    disabled and replayed without keeping arrays for backward. If the
+    schedule cannot be recorded, the attributes of the links changed by the
+    recording are restored and the method is run in the inference mode. Up
+    to 64 schedules are kept per link and method, and all of them are
+    discarded when the limit is reached. The method falls back to
+    define-by-run if some argument is not hashable, a function hook is
+    registered, the debug mode is on, or the recorded graph cannot be
+    replayed. The latter is the case if it uses a variable created by a
+    graph outside the method, or the method adds, removes or rebinds an
+    attribute of the link or its descendants (e.g. the states of
+    :class:`~chainer.links.LSTM`) or updates their persistent arrays (e.g.
+    the population statistics of :class:`~chainer.links.BatchNormalization`
+    in training).
+
+    .. warning::
+
+       The method must compute its outputs only by applying functions to the
+       variable arguments, the parameters of the link, and variables without
+       creators. The latter two are captured by reference when the graph is
+       recorded, i.e., variables created inside the method (e.g. initial
+       states filled by zeros) are not recreated on replay. Python control
+       flow that depends on the values of arrays is not detected either.
+
+    .. admonition:: Example
+
+       >>> from chainer import static_graph
+       >>> class MLP(chainer.Chain):
+       ...     def __init__(self):
+       ...         super(MLP, self).__init__(l1=L.Linear(3, 4),
+       ...                                   l2=L.Linear(4, 2))
+       ...
+       ...     @static_graph.static_graph
+       ...     def __call__(self, x, train=True):
+       ...         h = F.dropout(F.relu(self.l1(x)), train=train)
+       ...         return self.l2(h)
+
+    """
+    schedules = weakref.WeakKeyDictionary()
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if chainer.is_debug() or chainer.get_function_hooks():
+            return method(self, *args, **kwargs)
+
+        inference = chainer.is_inference_mode()
+        key = []
+        inputs = []
+        for arg in args:
+            if isinstance(arg, variable.Variable):
+                data = arg.data
+            elif inference and _is_array(arg):
+                data = arg
+            else:
+                key.append(arg)
+                continue
+            key.append((type(data), data.shape, data.dtype,
+                        int(cuda.get_device(data))))
+            inputs.append(arg)
+        key.append(tuple(sorted(six.iteritems(kwargs))))
+        key.append(_link_state(self))
+        key.append(_fusion)
+        key = tuple(key)
+
+        cache = schedules.setdefault(self, {})
+        try:
+            schedule = cache.get(key, False)
+        except TypeError:  # unhashable arguments
+            return method(self, *args, **kwargs)
+
+        if schedule is False:
+            outputs, schedule = _capture(method, self, args, kwargs)
+            if len(cache) >= _schedule_cache_size:
+                cache.clear()
+            cache[key] = schedule
+            return outputs
+        if schedule is None:
+            return method(self, *args, **kwargs)
+
+        outputs = StaticGraphFunction(schedule)(*(inputs + schedule.leaves))
+        if schedule.return_tuple and not isinstance(outputs, tuple):
+            outputs = outputs,
+        return outputs
+
+    return wrapper
@@ -1,9 +1,181 @@
+import contextlib
+import threading
+
 import numpy
+from numpy.lib import stride_tricks
 import six
 
 from chainer import cuda
 
 
+_max_workspace_size = 64 * 1024 * 1024
+_recompute = False
+_layouts = ('NCHW', 'NHWC')
+_thread_local = threading.local()
+
+
+def get_max_workspace_size():
+    """Gets the workspace size for CPU convolution and pooling.
+
+    Returns:
+        int: The workspace size in bytes.
+
+    """
+    return _max_workspace_size
+
+
+def set_max_workspace_size(size):
+    """Sets the workspace size for CPU convolution and pooling.
+
+    Convolution and pooling functions on CPU split a mini-batch into chunks
+    so that the temporary arrays expanded by im2col (and its inverse) for
+    each chunk fit in this size. At least one sample is processed at once.
+
+    Args:
+        size (int): The workspace size in bytes.
+
+    """
+    global _max_workspace_size
+    _max_workspace_size = size
+
+
+def get_recompute():
+    """Returns ``True`` if im2col results are recomputed in backward."""
+    return _recompute
+
+
+def set_recompute(flag):
+    """Sets whether to recompute im2col results in backward computations.
+
+    If it is ``True``, functions which keep the results of im2col (e.g. the
+    columns of convolution on GPU and the indexes of max pooling) for their
+    backward computations recompute them from the inputs instead, which
+    trades extra computation for memory held by computational graphs.
+
+    Args:
+        flag (bool): ``True`` to recompute im2col results in backward.
+
+    """
+    global _recompute
+    _recompute = flag
+
+
+def get_layout():
+    """Returns the memory layout of images in this thread.
+
+    Returns:
+        str: ``'NCHW'`` or ``'NHWC'``.
+
+    .. seealso:: :func:`set_layout`
+
+    """
+    try:
+        return _thread_local.layout
+    except AttributeError:
+        return 'NCHW'
+
+
+def set_layout(layout):
+    """Sets the memory layout of images taken by convolution and pooling.
+
+    The layout is set for the current thread, and other threads keep their
+    own layouts. :func:`using_layout` sets it within a ``with`` statement.
+
+    The default layout ``'NCHW'`` places channels before the spatial axes.
+    If it is ``'NHWC'`` (channels last), the following functions created
+    afterwards take and return four-dimensional arrays of shape
+    ``(n, h, w, c)`` instead of ``(n, c, h, w)``:
+    :func:`~chainer.functions.convolution_2d`,
+    :func:`~chainer.functions.convolution_2d_relu`,
+    :func:`~chainer.functions.max_pooling_2d`,
+    :func:`~chainer.functions.average_pooling_2d`,
+    :func:`~chainer.functions.unpooling_2d`,
+    :func:`~chainer.functions.spatial_pyramid_pooling_2d`,
+    :func:`~chainer.functions.batch_normalization`,
+    :func:`~chainer.functions.fixed_batch_normalization` and
+    :func:`~chainer.functions.local_response_normalization`. Elementwise
+    functions like :func:`~chainer.functions.relu` work in any layout.
+    Consecutive layers on CPU then exchange images without transposing them,
+    and images only have to be transposed at the boundaries of such
+    sequences, e.g. by :func:`~chainer.functions.transpose` with the axes
+    ``(0, 2, 3, 1)`` before the first layer and ``(0, 3, 1, 2)`` before
+    flattening the features. The layout of parameters is not changed.
+
+    Each function keeps the layout set at its creation. Convolution and
+    pooling in the ``'NHWC'`` layout are only implemented on CPU, and
+    ``cpu_algorithm`` of convolution is ignored in this layout.
+
+    Args:
+        layout (str): ``'NCHW'`` or ``'NHWC'``.
+
+    """
+    if layout not in _layouts:
+        raise ValueError('unknown layout: {}'.format(layout))
+    _thread_local.layout = layout
+
+
+@contextlib.contextmanager
+def using_layout(layout):
+    """Sets the memory layout of images within a ``with`` statement.
+
+    The layout set by :func:`set_layout` in this thread is restored at the
+    end of the statement.
+
+    .. admonition:: Example
+
+       >>> from chainer.utils import conv
+       >>> with conv.using_layout('NHWC'):
+       ...     f = F.MaxPooling2D(2)
+       >>> f.layout
+       'NHWC'
+
+    Args:
+        layout (str): ``'NCHW'`` or ``'NHWC'``.
+
+    """
+    old = get_layout()
+    set_layout(layout)
+    try:
+        yield
+    finally:
+        _thread_local.layout = old
+
+
+def get_channel_axis(layout, ndim):
+    """Returns the channel axis of arrays in the given layout.
+
+    Only four-dimensional arrays have channels at the last axis in the
+    ``'NHWC'`` layout. Otherwise, the channel axis is ``1``.
+
+    """
+    if layout == 'NHWC' and ndim == 4:
+        return 3
+    return 1
+
+
+def check_cpu_layout(layout):
+    """Raises an error if the layout is only supported on CPU."""
+    if layout != 'NCHW':
+        raise NotImplementedError(
+            'the {} layout is only supported on CPU'.format(layout))
+
+
+def batch_slices(n, sample_size):
+    """Splits a mini-batch into chunks fitting in the CPU workspace.
+
+    Args:
+        n (int): Batch size.
+        sample_size (int): Size of the workspace needed for each sample in
+            bytes.
+
+    Returns:
+        list of slices: Slices of the mini-batch.
+
+    """
+    chunk = max(1, _max_workspace_size // max(sample_size, 1))
+    return [slice(i, min(i + chunk, n)) for i in six.moves.range(0, n, chunk)]
+
+
 def get_conv_outsize(size, k, s, p, cover_all=False):
     if cover_all:
         return (size + p * 2 - k + s - 1) // s + 1
@@ -19,21 +191,62 @@ def get_deconv_outsize(size, k, s, p, cover_all=False):
 
 
 def im2col_cpu(img, kh, kw, sy, sx, ph, pw, pval=0, cover_all=False):
+    """Returns the patches of an image in the ``'NCHW'`` layout.
+
+    The patches are a new array of shape ``(n, c, kh, kw, out_h, out_w)``.
+
+    """
+    return _im2col_cpu_view(
+        img, kh, kw, sy, sx, ph, pw, pval=pval, cover_all=cover_all).copy()
+
+
+def _im2col_cpu_view(img, kh, kw, sy, sx, ph, pw, pval=0, cover_all=False):
+    # Returns the patches as a read-only view of the (padded) image, which
+    # aliases img if no padding is needed
     n, c, h, w = img.shape
     out_h = get_conv_outsize(h, kh, sy, ph, cover_all)
     out_w = get_conv_outsize(w, kw, sx, pw, cover_all)
 
-    img = numpy.pad(img,
-                    ((0, 0), (0, 0), (ph, ph + sy - 1), (pw, pw + sx - 1)),
-                    mode='constant', constant_values=(pval,))
-    col = numpy.ndarray((n, c, kh, kw, out_h, out_w), dtype=img.dtype)
+    # Paddings at the bottom and right edges needed by the last windows
+    pad_h = max(sy * (out_h - 1) + kh - h - ph, 0)
+    pad_w = max(sx * (out_w - 1) + kw - w - pw, 0)
+    if ph != 0 or pw != 0 or pad_h != 0 or pad_w != 0:
+        img = numpy.pad(img, ((0, 0), (0, 0), (ph, pad_h), (pw, pad_w)),
+                        mode='constant', constant_values=(pval,))
 
-    for i in six.moves.range(kh):
-        i_lim = i + sy * out_h
-        for j in six.moves.range(kw):
-            j_lim = j + sx * out_w
-            col[:, :, i, j, :, :] = img[:, :, i:i_lim:sy, j:j_lim:sx]
+    # The patches are represented as a view of the (padded) image without
+    # copying it. The view is read-only since its elements overlap.
+    sn, sc, sh, sw = img.strides
+    col = stride_tricks.as_strided(
+        img, (n, c, kh, kw, out_h, out_w),
+        (sn, sc, sh, sw, sh * sy, sw * sx))
+    col.flags.writeable = False
+    return col
+
+
+def im2col_nhwc_cpu(img, kh, kw, sy, sx, ph, pw, pval=0, cover_all=False):
+    """Returns the patches of an image in the ``'NHWC'`` layout.
+
+    It is the channels-last variant of :func:`im2col_cpu`. The patches are
+    a read-only view of shape ``(n, out_h, out_w, kh, kw, c)`` of the
+    (padded) image.
+
+    """
+    n, h, w, c = img.shape
+    out_h = get_conv_outsize(h, kh, sy, ph, cover_all)
+    out_w = get_conv_outsize(w, kw, sx, pw, cover_all)
+
+    pad_h = max(sy * (out_h - 1) + kh - h - ph, 0)
+    pad_w = max(sx * (out_w - 1) + kw - w - pw, 0)
+    if ph != 0 or pw != 0 or pad_h != 0 or pad_w != 0:
+        img = numpy.pad(img, ((0, 0), (ph, pad_h), (pw, pad_w), (0, 0)),
+                        mode='constant', constant_values=(pval,))
 
+    sn, sh, sw, sc = img.strides
+    col = stride_tricks.as_strided(
+        img, (n, out_h, out_w, kh, kw, c),
+        (sn, sh * sy, sw * sx, sh, sw, sc))
+    col.flags.writeable = False
     return col
 
 
@@ -81,6 +294,26 @@ def col2im_cpu(col, sy, sx, ph, pw, h, w):
     return img[:, :, ph:h + ph, pw:w + pw]
 
 
+def col2im_nhwc_cpu(col, sy, sx, ph, pw, h, w):
+    """Sums up the patches into an image in the ``'NHWC'`` layout.
+
+    It is the inverse of :func:`im2col_nhwc_cpu` and takes an array of shape
+    ``(n, out_h, out_w, kh, kw, c)``.
+
+    """
+    n, out_h, out_w, kh, kw, c = col.shape
+
+    img = numpy.zeros((n, h + 2 * ph + sy - 1, w + 2 * pw + sx - 1, c),
+                      dtype=col.dtype)
+    for i in six.moves.range(kh):
+        i_lim = i + sy * out_h
+        for j in six.moves.range(kw):
+            j_lim = j + sx * out_w
+            img[:, i:i_lim:sy, j:j_lim:sx] += col[:, :, :, i, j]
+
+    return img[:, ph:h + ph, pw:w + pw]
+
+
 def col2im_gpu(col, sy, sx, ph, pw, h, w):
     n, c, kh, kw, out_h, out_w = col.shape
 
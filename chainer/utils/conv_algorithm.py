@@ -0,0 +1,464 @@
+"""CPU implementations of two-dimensional convolution.
+
+Each algorithm implements the three operations of convolution: the forward
+computation, the gradient w.r.t. the input (``backward_data``) and the
+gradient w.r.t. the filter (``backward_filter``). The latter two also serve as
+the forward and backward computations of deconvolution.
+
+"""
+import collections
+import time
+
+import numpy
+from numpy.lib import stride_tricks
+from six import moves
+
+from chainer.utils import conv
+
+
+class ConvolutionAlgorithm(object):
+
+    """Base class of CPU convolution algorithms.
+
+    All operations compute convolution without bias. ``x`` is an input array
+    of shape :math:`(n, c_I, h, w)`, ``W`` is a filter array of shape
+    :math:`(c_O, c_I, k_H, k_W)` and ``gy`` is an array of the shape of the
+    output of convolution.
+
+    """
+
+    def is_applicable(self, x_shape, W_shape, sy, sx, ph, pw, cover_all):
+        """Returns ``True`` if the algorithm supports the given convolution."""
+        return True
+
+    def forward(self, x, W, sy, sx, ph, pw, cover_all):
+        """Computes convolution of ``x`` and ``W``."""
+        raise NotImplementedError
+
+    def backward_data(self, gy, W, sy, sx, ph, pw, h, w):
+        """Computes the gradient w.r.t. the input of size ``(h, w)``."""
+        raise NotImplementedError
+
+    def backward_filter(self, x, gy, W, sy, sx, ph, pw, cover_all):
+        """Computes the gradient w.r.t. the filter ``W``.
+
+        Only the shape and the dtype of ``W`` are used.
+
+        """
+        raise NotImplementedError
+
+
+class Im2colConvolution(ConvolutionAlgorithm):
+
+    """Convolution by im2col and a matrix product for each sample."""
+
+    def forward(self, x, W, sy, sx, ph, pw, cover_all):
+        out_c, _, kh, kw = W.shape
+        # col is a view of x, which is materialized sample by sample below
+        col = conv._im2col_cpu_view(
+            x, kh, kw, sy, sx, ph, pw, cover_all=cover_all)
+        n, _, _, _, out_h, out_w = col.shape
+
+        # Each sample is computed by a GEMM which directly writes the output
+        # in the (n, c, h, w) layout
+        y = numpy.empty((n, out_c, out_h, out_w), dtype=x.dtype)
+        W_mat = W.reshape(out_c, -1)
+        y_mats = y.reshape(n, out_c, -1)
+        for i in moves.range(n):
+            y_mats[i] = W_mat.dot(col[i].reshape(-1, out_h * out_w))
+        return y
+
+    def backward_data(self, gy, W, sy, sx, ph, pw, h, w):
+        n, out_c, out_h, out_w = gy.shape
+        _, c, kh, kw = W.shape
+        W_mat = W.reshape(out_c, -1)
+        gy_mats = gy.reshape(n, out_c, -1)
+        gcol_mats = None
+        gx = None
+        # The columns are expanded chunk by chunk within the workspace
+        sample_size = W[0].size * out_h * out_w * gy.itemsize
+        for s in conv.batch_slices(n, sample_size):
+            m = s.stop - s.start
+            if gcol_mats is None or len(gcol_mats) != m:
+                gcol = numpy.empty((m, c, kh, kw, out_h, out_w),
+                                   dtype=gy.dtype)
+                gcol_mats = gcol.reshape(m, -1, out_h * out_w)
+            for i in moves.range(m):
+                gcol_mats[i] = W_mat.T.dot(gy_mats[s.start + i])
+            gx_chunk = conv.col2im_cpu(gcol, sy, sx, ph, pw, h, w)
+            if m == n:
+                return gx_chunk
+            if gx is None:
+                gx = numpy.empty((n, c, h, w), dtype=gy.dtype)
+            gx[s] = gx_chunk
+        return gx
+
+    def backward_filter(self, x, gy, W, sy, sx, ph, pw, cover_all):
+        n, out_c, out_h, out_w = gy.shape
+        kh, kw = W.shape[2:]
+        col = conv._im2col_cpu_view(
+            x, kh, kw, sy, sx, ph, pw, cover_all=cover_all)
+        gy_mats = gy.reshape(n, out_c, -1)
+        gW_mat = numpy.zeros((out_c, W[0].size), dtype=W.dtype)
+        for i in moves.range(n):
+            gW_mat += gy_mats[i].dot(col[i].reshape(-1, out_h * out_w).T)
+        return gW_mat.reshape(W.shape)
+
+
+class Direct1x1Convolution(ConvolutionAlgorithm):
+
+    """Convolution with 1x1 filters by matrix products without im2col."""
+
+    def is_applicable(self, x_shape, W_shape, sy, sx, ph, pw, cover_all):
+        h, w = x_shape[2:]
+        return (W_shape[2] == 1 and W_shape[3] == 1 and ph == 0 and
+                pw == 0 and
+                conv.get_conv_outsize(h, 1, sy, 0, cover_all) ==
+                -(-h // sy) and
+                conv.get_conv_outsize(w, 1, sx, 0, cover_all) ==
+                -(-w // sx))
+
+    def forward(self, x, W, sy, sx, ph, pw, cover_all):
+        x = x[:, :, ::sy, ::sx]
+        n, c, out_h, out_w = x.shape
+        out_c = W.shape[0]
+        y = numpy.empty((n, out_c, out_h, out_w), dtype=x.dtype)
+        W_mat = W.reshape(out_c, c)
+        y_mats = y.reshape(n, out_c, -1)
+        for i in moves.range(n):
+            y_mats[i] = W_mat.dot(x[i].reshape(c, -1))
+        return y
+
+    def backward_data(self, gy, W, sy, sx, ph, pw, h, w):
+        n, out_c, out_h, out_w = gy.shape
+        c = W.shape[1]
+        if sy == 1 and sx == 1:
+            gx = numpy.empty((n, c, h, w), dtype=gy.dtype)
+        else:
+            gx = numpy.zeros((n, c, h, w), dtype=gy.dtype)
+        gx_strided = gx[:, :, ::sy, ::sx]
+        W_mat = W.reshape(out_c, c)
+        gy_mats = gy.reshape(n, out_c, -1)
+        for i in moves.range(n):
+            gx_strided[i] = W_mat.T.dot(gy_mats[i]).reshape(c, out_h, out_w)
+        return gx
+
+    def backward_filter(self, x, gy, W, sy, sx, ph, pw, cover_all):
+        x = x[:, :, ::sy, ::sx]
+        n, c = x.shape[:2]
+        out_c = gy.shape[1]
+        gy_mats = gy.reshape(n, out_c, -1)
+        gW_mat = numpy.zeros((out_c, c), dtype=W.dtype)
+        for i in moves.range(n):
+            gW_mat += gy_mats[i].dot(x[i].reshape(c, -1).T)
+        return gW_mat.reshape(W.shape)
+
+
+class WinogradConvolution(Im2colConvolution):
+
+    """Convolution with 3x3 filters by the Winograd algorithm F(2x2, 3x3).
+
+    Each 2x2 tile of the output is computed from the corresponding 4x4 tile
+    of the input by 16 elementwise products in the transformed domain, which
+    are batched into 16 matrix products over the channels. It takes 2.25
+    times fewer multiplications than the direct computation, at the cost of
+    slightly larger rounding errors. The gradient w.r.t. the input is
+    computed as the convolution of the output gradient with the flipped
+    filters, while the gradient w.r.t. the filter uses im2col.
+
+    See `Fast Algorithms for Convolutional Neural Networks
+    <https://arxiv.org/abs/1509.09308>`_.
+
+    """
+
+    def is_applicable(self, x_shape, W_shape, sy, sx, ph, pw, cover_all):
+        return (W_shape[2] == 3 and W_shape[3] == 3 and sy == 1 and
+                sx == 1 and ph <= 2 and pw <= 2)
+
+    def forward(self, x, W, sy, sx, ph, pw, cover_all):
+        n, c, h, w = x.shape
+        out_c = W.shape[0]
+        out_h = h + 2 * ph - 2
+        out_w = w + 2 * pw - 2
+        th = (out_h + 1) // 2
+        tw = (out_w + 1) // 2
+
+        # U = G g G^T
+        G = numpy.array([[1, 0, 0], [.5, .5, .5], [.5, -.5, .5], [0, 0, 1]],
+                        dtype=W.dtype)
+        U = numpy.tensordot(numpy.tensordot(G, W, (1, 2)), G, (3, 1))
+        U = numpy.ascontiguousarray(U.transpose(0, 3, 1, 2))
+
+        # The transformed tiles are computed chunk by chunk within the
+        # workspace
+        sample_size = 16 * (c + out_c) * th * tw * x.itemsize
+        slices = conv.batch_slices(n, sample_size)
+        if len(slices) == 1:
+            return self._forward_chunk(x, U, ph, pw, out_h, out_w)
+        y = numpy.empty((n, out_c, out_h, out_w), dtype=x.dtype)
+        for s in slices:
+            y[s] = self._forward_chunk(x[s], U, ph, pw, out_h, out_w)
+        return y
+
+    def _forward_chunk(self, x, U, ph, pw, out_h, out_w):
+        n, c, h, w = x.shape
+        out_c = U.shape[2]
+        th = (out_h + 1) // 2
+        tw = (out_w + 1) // 2
+
+        # Input tiles of shape (c, n, th, tw, 4, 4) overlapping by 2 pixels
+        x = x.transpose(1, 0, 2, 3)
+        pad_h = 2 * th + 2 - h - ph
+        pad_w = 2 * tw + 2 - w - pw
+        if ph != 0 or pw != 0 or pad_h != 0 or pad_w != 0:
+            x = numpy.pad(x, ((0, 0), (0, 0), (ph, pad_h), (pw, pad_w)),
+                          mode='constant')
+        else:
+            x = numpy.ascontiguousarray(x)
+        s0, s1, s2, s3 = x.strides
+        d = stride_tricks.as_strided(
+            x, (c, n, th, tw, 4, 4), (s0, s1, s2 * 2, s3 * 2, s2, s3))
+
+        # V = B^T d B
+        rows = (d[..., 0, :] - d[..., 2, :], d[..., 1, :] + d[..., 2, :],
+                d[..., 2, :] - d[..., 1, :], d[..., 1, :] - d[..., 3, :])
+        V = numpy.empty((4, 4, c, n * th * tw), dtype=x.dtype)
+        V_tiles = V.reshape(4, 4, c, n, th, tw)
+        for i, r in enumerate(rows):
+            V_tiles[i, 0] = r[..., 0] - r[..., 2]
+            V_tiles[i, 1] = r[..., 1] + r[..., 2]
+            V_tiles[i, 2] = r[..., 2] - r[..., 1]
+            V_tiles[i, 3] = r[..., 1] - r[..., 3]
+
+        M = numpy.empty((4, 4, out_c, n, th, tw), dtype=x.dtype)
+        M_mats = M.reshape(4, 4, out_c, -1)
+        for i in moves.range(4):
+            for j in moves.range(4):
+                M_mats[i, j] = U[i, j].dot(V[i, j])
+
+        # Y = A^T M A
+        rows = (M[0] + M[1] + M[2], M[1] - M[2] - M[3])
+        y = numpy.empty((n, out_c, th, 2, tw, 2), dtype=x.dtype)
+        for i, r in enumerate(rows):
+            y[:, :, :, i, :, 0] = (r[0] + r[1] + r[2]).transpose(1, 0, 2, 3)
+            y[:, :, :, i, :, 1] = (r[1] - r[2] - r[3]).transpose(1, 0, 2, 3)
+        y = y.reshape(n, out_c, th * 2, tw * 2)
+        if th * 2 != out_h or tw * 2 != out_w:
+            y = numpy.ascontiguousarray(y[:, :, :out_h, :out_w])
+        return y
+
+    def backward_data(self, gy, W, sy, sx, ph, pw, h, w):
+        W = W[:, :, ::-1, ::-1].transpose(1, 0, 2, 3)
+        return self.forward(gy, W, 1, 1, 2 - ph, 2 - pw, False)
+
+
+class ChannelsLastConvolution(ConvolutionAlgorithm):
+
+    """Convolution of images in the ``'NHWC'`` layout by im2col.
+
+    Unlike the other algorithms, ``x`` has the shape :math:`(n, h, w, c_I)`
+    and ``gy`` has the shape :math:`(n, h_O, w_O, c_O)`, while ``W`` has the
+    usual shape. Since channels are the innermost axis of the patches, the
+    output is computed by matrix products over chunks of samples which
+    directly write the channels-last output. This algorithm is not in
+    :data:`algorithms`; it is used for the ``'NHWC'`` layout (see
+    :func:`chainer.utils.conv.set_layout`).
+
+    """
+
+    def _W_mat(self, W):
+        # Filters as a matrix of shape (kh * kw * c, out_c)
+        return W.transpose(2, 3, 1, 0).reshape(-1, W.shape[0])
+
+    def forward(self, x, W, sy, sx, ph, pw, cover_all):
+        out_c, _, kh, kw = W.shape
+        col = conv.im2col_nhwc_cpu(
+            x, kh, kw, sy, sx, ph, pw, cover_all=cover_all)
+        n, out_h, out_w = col.shape[:3]
+
+        y = numpy.empty((n, out_h, out_w, out_c), dtype=x.dtype)
+        W_mat = self._W_mat(W)
+        for s in conv.batch_slices(n, col[0].size * x.itemsize):
+            y[s] = col[s].reshape(-1, W_mat.shape[0]).dot(W_mat).reshape(
+                y[s].shape)
+        return y
+
+    def backward_data(self, gy, W, sy, sx, ph, pw, h, w):
+        n, out_h, out_w, out_c = gy.shape
+        _, c, kh, kw = W.shape
+        W_mat = self._W_mat(W)
+        gx = None
+        sample_size = W[0].size * out_h * out_w * gy.itemsize
+        for s in conv.batch_slices(n, sample_size):
+            m = s.stop - s.start
+            gcol = gy[s].reshape(-1, out_c).dot(W_mat.T).astype(
+                gy.dtype, copy=False).reshape(m, out_h, out_w, kh, kw, c)
+            gx_chunk = conv.col2im_nhwc_cpu(gcol, sy, sx, ph, pw, h, w)
+            if m == n:
+                return gx_chunk
+            if gx is None:
+                gx = numpy.empty((n, h, w, c), dtype=gy.dtype)
+            gx[s] = gx_chunk
+        return gx
+
+    def backward_filter(self, x, gy, W, sy, sx, ph, pw, cover_all):
+        out_c, c, kh, kw = W.shape
+        col = conv.im2col_nhwc_cpu(
+            x, kh, kw, sy, sx, ph, pw, cover_all=cover_all)
+        gW_mat = numpy.zeros((kh * kw * c, out_c), dtype=W.dtype)
+        for s in conv.batch_slices(len(x), col[0].size * x.itemsize):
+            gW_mat += col[s].reshape(-1, gW_mat.shape[0]).T.dot(
+                gy[s].reshape(-1, out_c))
+        return numpy.ascontiguousarray(
+            gW_mat.reshape(kh, kw, c, out_c).transpose(3, 2, 0, 1))
+
+
+channels_last = ChannelsLastConvolution()
+"""Instance of :class:`ChannelsLastConvolution`."""
+
+algorithms = collections.OrderedDict()
+"""Registry of CPU convolution algorithms.
+
+It maps the names of algorithms to instances of
+:class:`ConvolutionAlgorithm`. The first applicable algorithm in this order
+is used unless the autotuner is enabled.
+
+"""
+algorithms['direct_1x1'] = Direct1x1Convolution()
+algorithms['im2col'] = Im2colConvolution()
+algorithms['winograd'] = WinogradConvolution()
+
+_autotune = False
+_cache = {}
+_cache_size = 4096
+
+
+def get_autotune():
+    """Returns ``True`` if the autotuner of CPU convolution is enabled."""
+    return _autotune
+
+
+def set_autotune(flag):
+    """Enables or disables the autotuner of CPU convolution.
+
+    When the autotuner is enabled, all applicable algorithms are run and
+    timed at the first call of each operation of convolution with a new
+    configuration (i.e. the shapes and dtypes of the arrays, strides and
+    paddings), and the fastest one is cached and used for the subsequent
+    calls with the same configuration. The cache is cleared when it holds
+    4096 configurations. Algorithms specified explicitly are
+    always used regardless of this setting.
+
+    Args:
+        flag (bool): ``True`` to enable the autotuner.
+
+    """
+    global _autotune
+    _autotune = flag
+
+
+def clear_cache():
+    """Clears the algorithms chosen by the autotuner."""
+    _cache.clear()
+
+
+def get_cached_algorithms():
+    """Returns a copy of the algorithms chosen by the autotuner.
+
+    Returns:
+        dict: Dictionary mapping tuples of the name of the operation and the
+        configuration of convolution to the names of chosen algorithms.
+
+    """
+    return dict(_cache)
+
+
+def _run(op, name, key, args):
+    geometry = key[1:8]
+    if name is not None:
+        algorithm = algorithms.get(name)
+        if algorithm is None:
+            raise ValueError('unknown convolution algorithm: {}'.format(name))
+        if not algorithm.is_applicable(*geometry):
+            raise ValueError(
+                'convolution algorithm {} is not applicable'.format(name))
+        return getattr(algorithm, op)(*args)
+
+    name = _cache.get(key)
+    if name is not None:
+        return getattr(algorithms[name], op)(*args)
+
+    candidates = [n for n, a in algorithms.items()
+                  if a.is_applicable(*geometry)]
+    if not _autotune or len(candidates) == 1:
+        return getattr(algorithms[candidates[0]], op)(*args)
+
+    best_time = None
+    for n in candidates:
+        f = getattr(algorithms[n], op)
+        f(*args)  # warm-up
+        start = time.time()
+        result = f(*args)
+        elapsed = time.time() - start
+        if best_time is None or elapsed < best_time:
+            best_time = elapsed
+            best_name = n
+            best_result = result
+    if len(_cache) >= _cache_size:
+        _cache.clear()
+    _cache[key] = best_name
+    return best_result
+
+
+def forward(x, W, sy, sx, ph, pw, cover_all=False, algorithm=None):
+    """Computes convolution on CPU.
+
+    Args:
+        x (numpy.ndarray): Input array of shape :math:`(n, c_I, h, w)`.
+        W (numpy.ndarray): Filter array of shape
+            :math:`(c_O, c_I, k_H, k_W)`.
+        sy (int): Stride along the height.
+        sx (int): Stride along the width.
+        ph (int): Padding along the height.
+        pw (int): Padding along the width.
+        cover_all (bool): If ``True``, all spatial locations are convoluted
+            into some output pixels.
+        algorithm (str): Name of the algorithm. If it is ``None``, the
+            algorithm is chosen from :data:`algorithms`.
+
+    Returns:
+        numpy.ndarray: Output array of the dtype of ``x``.
+
+    """
+    key = ('forward', x.shape, W.shape, sy, sx, ph, pw, cover_all,
+           x.dtype, W.dtype)
+    return _run('forward', algorithm, key, (x, W, sy, sx, ph, pw, cover_all))
+
+
+def backward_data(gy, W, sy, sx, ph, pw, h, w, cover_all=False,
+                  algorithm=None):
+    """Computes the gradient of convolution w.r.t. the input on CPU.
+
+    The input has the spatial size ``(h, w)``. The other arguments are the
+    same as :func:`forward`. The result has the dtype of ``gy``.
+
+    """
+    x_shape = (gy.shape[0], W.shape[1], h, w)
+    key = ('backward_data', x_shape, W.shape, sy, sx, ph, pw, cover_all,
+           gy.dtype, W.dtype)
+    return _run('backward_data', algorithm, key,
+                (gy, W, sy, sx, ph, pw, h, w))
+
+
+def backward_filter(x, gy, W, sy, sx, ph, pw, cover_all=False,
+                    algorithm=None):
+    """Computes the gradient of convolution w.r.t. the filter on CPU.
+
+    Only the shape and the dtype of ``W`` are used. The other arguments are
+    the same as :func:`forward`. The result has the dtype of ``W``.
+
+    """
+    key = ('backward_filter', x.shape, W.shape, sy, sx, ph, pw, cover_all,
+           x.dtype, W.dtype)
+    return _run('backward_filter', algorithm, key,
+                (x, gy, W, sy, sx, ph, pw, cover_all))
@@ -0,0 +1,166 @@
+import numpy
+
+
+_max_reduceat_segments = 64
+
+
+class RowSparseArray(object):
+
+    """Array whose nonzero elements are contained in a subset of rows.
+
+    It represents an array of the given shape whose ``indices[i]``-th row is
+    ``rows[i]`` and the other rows are filled by zeros. It is used as a
+    gradient of a parameter of which only a few rows are involved in a
+    minibatch, e.g. the embedding matrix of
+    :func:`~chainer.functions.embed_id`. Such a gradient takes a memory and
+    an accumulation cost proportional to the number of involved rows instead
+    of the size of the whole parameter.
+
+    Adding it to another row-sparse array returns a row-sparse array, and
+    adding it to a dense array returns a new dense array. Other operations are
+    not supported; use :meth:`to_dense` to convert it to a dense array.
+
+    Args:
+        indices (numpy.ndarray): Sorted one-dimensional array of distinct row
+            indices.
+        rows (numpy.ndarray): Rows at the indices. Its first dimension must be
+            the same as that of ``indices``.
+        shape (tuple of ints): Shape of the whole array.
+
+    Attributes:
+        indices (numpy.ndarray): Row indices.
+        rows (numpy.ndarray): Rows at the indices.
+        shape (tuple of ints): Shape of the whole array.
+
+    .. seealso:: :func:`scatter_add`
+
+    """
+    # Make NumPy defer binary operations with dense arrays to this class
+    __array_priority__ = 300
+    __array_ufunc__ = None
+
+    def __init__(self, indices, rows, shape):
+        self.indices = indices
+        self.rows = rows
+        self.shape = tuple(shape)
+
+    @property
+    def dtype(self):
+        return self.rows.dtype
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def nbytes(self):
+        return self.indices.nbytes + self.rows.nbytes
+
+    def to_dense(self):
+        """Returns the dense array of the same elements."""
+        array = numpy.zeros(self.shape, dtype=self.dtype)
+        array[self.indices] = self.rows
+        return array
+
+    def add_to(self, array):
+        """Adds the rows to the corresponding rows of a dense array in place.
+
+        Args:
+            array (numpy.ndarray): Dense array of the same shape.
+
+        """
+        # Fancy indexing is safe since the indices are distinct
+        array[self.indices] += self.rows
+
+    def __add__(self, other):
+        if isinstance(other, RowSparseArray):
+            # Row-sparse arrays are never modified in place, so they can be
+            # shared
+            if len(other.indices) == 0:
+                return self
+            if len(self.indices) == 0:
+                return other
+            return scatter_add(
+                numpy.concatenate((self.indices, other.indices)),
+                numpy.concatenate((self.rows, other.rows)), self.shape)
+        array = numpy.array(other, dtype=numpy.result_type(other, self.dtype))
+        self.add_to(array)
+        return array
+
+    __radd__ = __add__
+
+    def __repr__(self):
+        return 'RowSparseArray(shape={}, dtype={}, n_rows={})'.format(
+            self.shape, self.dtype, len(self.indices))
+
+
+def zeros(shape, dtype=numpy.float32):
+    """Returns a row-sparse array without nonzero rows.
+
+    Args:
+        shape (tuple of ints): Shape of the whole array.
+        dtype: Data type of the array.
+
+    Returns:
+        RowSparseArray: Array filled by zeros.
+
+    """
+    shape = tuple(shape)
+    return RowSparseArray(numpy.empty(0, dtype=numpy.intp),
+                          numpy.empty((0,) + shape[1:], dtype=dtype), shape)
+
+
+def scatter_add(indices, values, shape):
+    """Sums up values into rows of a row-sparse array.
+
+    It computes the same array as ``numpy.add.at(zeros, indices, values)``
+    does for ``zeros`` of the given shape, but in a row-sparse form and by a
+    vectorized reduction of the values sorted by their indices.
+
+    Args:
+        indices (numpy.ndarray): Row indices of the values, which may have
+            duplicates.
+        values (numpy.ndarray): Array whose ``i``-th element along the first
+            axis is added to the ``indices[i]``-th row.
+        shape (tuple of ints): Shape of the whole array.
+
+    Returns:
+        RowSparseArray: Array of the sums.
+
+    """
+    shape = tuple(shape)
+    indices = numpy.asarray(indices).ravel()
+    values = numpy.asarray(values).reshape((len(indices),) + shape[1:])
+    if len(indices) == 0:
+        return RowSparseArray(indices.astype(numpy.intp), values, shape)
+
+    order = numpy.argsort(indices, kind='mergesort')
+    sorted_indices = indices[order]
+    n = len(indices)
+    is_head = numpy.empty(n, dtype=bool)
+    is_head[0] = True
+    numpy.not_equal(sorted_indices[1:], sorted_indices[:-1], out=is_head[1:])
+    heads = numpy.flatnonzero(is_head)
+    counts = numpy.diff(numpy.append(heads, n))
+
+    values = values[order]
+    rows = values[heads]
+    # Adds the following values of the duplicated indices one by one while
+    # many indices are duplicated, since ufunc.reduceat has a large overhead
+    # per segment.
+    dup = numpy.flatnonzero(counts > 1)
+    k = 1
+    while len(dup) > _max_reduceat_segments:
+        rows[dup] += values[heads[dup] + k]
+        k += 1
+        dup = dup[counts[dup] > k]
+    if len(dup):
+        # reduceat over the remaining parts of segments and the gaps between
+        # them, the latter of which are discarded
+        bounds = numpy.empty(2 * len(dup), dtype=numpy.intp)
+        bounds[0::2] = heads[dup] + k
+        bounds[1::2] = heads[dup] + counts[dup]
+        if bounds[-1] == n:
+            bounds = bounds[:-1]
+        rows[dup] += numpy.add.reduceat(values, bounds, axis=0)[0::2]
+    return RowSparseArray(sorted_indices[heads], rows, shape)
@@ -8,6 +8,7 @@ import six
 import chainer
 from chainer import cuda
 from chainer import flag
+from chainer.utils import sparse
 
 
 def _check_grad_type(func, x, gx):
@@ -34,7 +35,12 @@ https://github.com/pfnet/chainer/issues/new.
         detail += message
         return detail
 
-    if not isinstance(gx, type(x.data)):
+    if isinstance(gx, sparse.RowSparseArray):
+        if not isinstance(x.data, numpy.ndarray):
+            msg = ('Row-sparse grad is only supported on CPU\n%s' %
+                   type(x.data))
+            raise TypeError(make_message(msg))
+    elif not isinstance(gx, type(x.data)):
         msg = ('Type of data and grad mismatch\n%s != %s' %
                (type(x.data), type(gx)))
         raise TypeError(make_message(msg))
@@ -48,6 +54,237 @@ https://github.com/pfnet/chainer/issues/new.
         raise ValueError(make_message(msg))
 
 
+def _count_consumers(root):
+    # Counts the input edges of the functions reachable from the root function
+    # for each creator of the inputs.
+    n_consumers = {root: 0}
+    cand_funcs = [root]
+    while cand_funcs:
+        func = cand_funcs.pop()
+        for x in func.inputs:
+            creator = x.creator
+            if creator is None:
+                continue
+            if creator in n_consumers:
+                n_consumers[creator] += 1
+            else:
+                n_consumers[creator] = 1
+                cand_funcs.append(creator)
+    return n_consumers
+
+
+def _owner(array):
+    # Returns the array that owns the memory of the given array (or view).
+    base = getattr(array, 'base', None)
+    return array if base is None else base
+
+
+def _accumulate_sparse(x, gx, need_copy):
+    # Accumulates a row-sparse gradient to a leaf variable. Row-sparse arrays
+    # are never modified in place, and a dense gradient held by x is updated
+    # in place only if x owns it.
+    id_x = id(x)
+    if x._grad is None:
+        x._grad = gx
+        need_copy.add(id_x)
+    elif id_x in need_copy or isinstance(x._grad, sparse.RowSparseArray):
+        x._grad = x._grad + gx
+        need_copy.discard(id_x)
+    else:
+        gx.add_to(x._grad)
+
+
+def _buffer_key(data):
+    return int(cuda.get_device(data)), data.shape, data.dtype
+
+
+class BackwardStatistics(object):
+
+    """Statistics of gradient arrays collected by :meth:`Variable.backward`.
+
+    An instance of this class is passed to :meth:`Variable.backward` via the
+    ``stats`` argument, and it is filled during the backprop. The statistics
+    cover the gradient arrays held by variables of the backward graph and the
+    buffers kept for reuse by the ``reuse_buffer`` mode. Temporary arrays
+    allocated inside :meth:`Function.backward` and released before it returns
+    are not counted. Views of an array are counted as the array itself.
+
+    When the same object is passed to multiple backprops, the counts are
+    accumulated and the peak is the maximum over them.
+
+    Attributes:
+        n_allocations (int): Number of gradient arrays newly allocated during
+            the backprop, either by :meth:`Function.backward` or to accumulate
+            gradients of branching variables.
+        n_reuses (int): Number of times a recycled buffer is used to
+            accumulate gradients instead of allocating a new array.
+        peak_bytes (int): Peak total size in bytes of the gradient arrays held
+            during the backprop.
+
+    """
+    def __init__(self):
+        self.n_allocations = 0
+        self.n_reuses = 0
+        self.peak_bytes = 0
+        self._live = {}
+        self._live_bytes = 0
+
+    def _reset_live(self):
+        self._live = {}
+        self._live_bytes = 0
+
+    def _acquire(self, array, allocated=True):
+        owner = _owner(array)
+        entry = self._live.get(id(owner))
+        if entry is None:
+            self._live[id(owner)] = [owner.nbytes, 1]
+            self._live_bytes += owner.nbytes
+            if allocated:
+                self.n_allocations += 1
+        else:
+            entry[1] += 1
+
+    def _release(self, array):
+        key = id(_owner(array))
+        entry = self._live.get(key)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] == 0:
+            self._live_bytes -= entry[0]
+            del self._live[key]
+
+    def _update_peak(self):
+        if self._live_bytes > self.peak_bytes:
+            self.peak_bytes = self._live_bytes
+
+
+class _GradientBufferPool(object):
+
+    """Recycler of gradient buffers planned from a backward graph.
+
+    On construction, it counts the gradient contributions of each variable
+    reachable from the root. Variables receiving two or more contributions
+    need a buffer to accumulate them; the pool keeps the number of such
+    buffers yet to be acquired per (device, shape, dtype).
+
+    The pool counts the variables referring to each buffer it has allocated
+    (including references via views). When no variable refers to a buffer
+    after a step of backprop, the buffer is returned to the pool as long as
+    some later accumulation can use it; otherwise it is freed immediately.
+
+    """
+    def __init__(self, root):
+        counts = {}
+        variables = {}
+        seen = set()
+        cand_funcs = [root.creator]
+        while cand_funcs:
+            func = cand_funcs.pop()
+            for x in func.inputs:
+                id_x = id(x)
+                counts[id_x] = counts.get(id_x, 0) + 1
+                variables[id_x] = x
+                creator = x.creator
+                if creator is not None and creator not in seen:
+                    seen.add(creator)
+                    cand_funcs.append(creator)
+
+        self._pending = collections.defaultdict(int)
+        self._planned = {}
+        for id_x, count in six.iteritems(counts):
+            x = variables[id_x]
+            if count >= 2 and (x.creator is not None or x._grad is None):
+                key = _buffer_key(x.data)
+                self._pending[key] += 1
+                self._planned[id_x] = key
+        self._free = collections.defaultdict(list)
+        # id of buffer -> [buffer, number of variables referring to it]
+        self._refs = {}
+        self._unreferred = []
+
+    def hold(self, array):
+        """Notifies that a variable refers to the given gradient array."""
+        owner = _owner(array)
+        entry = self._refs.get(id(owner))
+        if entry is not None:
+            entry[1] += 1
+
+    def drop(self, array):
+        """Notifies that a variable no longer refers to the given array."""
+        owner = _owner(array)
+        entry = self._refs.get(id(owner))
+        if entry is not None:
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._unreferred.append(entry)
+
+    def accumulate(self, x, gx, gxs, stats):
+        """Returns the sum of the current gradient of x and gx.
+
+        If x is the only referrer of its gradient buffer, the gradient is
+        accumulated in place. Otherwise, a recycled or new buffer is used.
+
+        """
+        key = self._planned.pop(id(x), None)
+        if key is None:
+            key = _buffer_key(x.data)
+        else:
+            self._pending[key] -= 1
+
+        old_grad = x._grad
+        owner = _owner(old_grad)
+        entry = self._refs.get(id(owner))
+        if (entry is not None and entry[1] == 1 and
+                not any(g is not None and _owner(g) is owner for g in gxs)):
+            old_grad += gx
+            if stats is not None:
+                stats.n_reuses += 1
+                stats._release(gx)
+            return old_grad
+
+        free = self._free[key]
+        xp = cuda.get_array_module(gx)
+        if free:
+            buf = free.pop()
+            if stats is not None:
+                stats.n_reuses += 1
+        else:
+            buf = xp.empty_like(gx)
+            if stats is not None:
+                stats._acquire(buf)
+        xp.add(old_grad, gx, out=buf)
+        self._refs[id(buf)] = [buf, 1]
+        self.drop(old_grad)
+        if stats is not None:
+            stats._release(old_grad)
+            stats._release(gx)
+        return buf
+
+    def complete(self, y):
+        """Notifies that the gradient of y has been consumed."""
+        key = self._planned.pop(id(y), None)
+        if key is not None:
+            # The gradient of y has been complete without accumulation
+            self._pending[key] -= 1
+
+    def collect(self, stats):
+        """Recycles the buffers no longer referred by any variables."""
+        for entry in self._unreferred:
+            buf, count = entry
+            if count != 0 or self._refs.get(id(buf)) is not entry:
+                continue
+            del self._refs[id(buf)]
+            key = _buffer_key(buf)
+            free = self._free[key]
+            if self._pending[key] > len(free):
+                free.append(buf)
+                if stats is not None:
+                    # The pool keeps the buffer
+                    stats._acquire(buf, allocated=False)
+        self._unreferred = []
+
+
 class Variable(object):
 
     """Array with a structure to keep track of computation.
@@ -85,7 +322,17 @@ class Variable(object):
             does not keep track of any function applications. See
             :class:`~chainer.Flag` for the detail of ternary flags.
 
+    .. note::
+       Attributes of variables are stored in slots to reduce the memory and
+       the access time, since a large computational graph may consist of a
+       huge number of variables. Arbitrary attributes cannot be set to
+       :class:`Variable` instances, while they can be set to instances of its
+       subclasses.
+
     """
+    __slots__ = ('data', 'rank', '_volatile', '_grad', 'creator', 'name',
+                 '__weakref__')
+
     def __init__(self, data, volatile=flag.OFF, name=None):
         if not isinstance(data, (numpy.ndarray, cuda.ndarray)):
             msg = '''numpy.ndarray or cuda.ndarray are expected.
@@ -135,13 +382,20 @@ Actual: {0}'''.format(type(data))
         with cuda.get_device(self.data) as dev:
             xp = numpy if int(dev) == -1 else cuda.cupy
 
-            if self.grad is None:
+            grad = self.grad
+            if grad is None:
                 grad = None
-            elif xp.all(self.grad == 0):
+            elif isinstance(grad, sparse.RowSparseArray):
+                # Statistics are taken over the densified gradient
+                dense = grad.to_dense()
+                grad = 'row-sparse ({} rows), {}'.format(
+                    len(grad.indices),
+                    stats_msg.format(float(dense.mean()), float(dense.std())))
+            elif xp.all(grad == 0):
                 grad = 0
             else:
-                grad = stats_msg.format(float(xp.mean(self.grad)),
-                                        float(xp.std(self.grad)))
+                grad = stats_msg.format(float(xp.mean(grad)),
+                                        float(xp.std(grad)))
 
             stats = stats_msg.format(float(xp.mean(self.data)),
                                      float(xp.std(self.data)))
@@ -164,6 +418,26 @@ Actual: {0}'''.format(type(data))
         """
         return self.data.size
 
+    @property
+    def shape(self):
+        """Shape of the data array."""
+        return self.data.shape
+
+    @property
+    def ndim(self):
+        """Number of dimensions of the data array."""
+        return self.data.ndim
+
+    @property
+    def size(self):
+        """Number of elements of the data array."""
+        return self.data.size
+
+    @property
+    def dtype(self):
+        """Data type of the data array."""
+        return self.data.dtype
+
     @property
     def volatile(self):
         return self._volatile
@@ -193,7 +467,9 @@ Actual: {0}'''.format(type(data))
     def to_cpu(self):
         """Copies the data and gradient arrays to CPU."""
         self.data = cuda.to_cpu(self.data)
-        if self._grad is not None:
+        # Row-sparse gradients are always on CPU
+        if (self._grad is not None and
+                not isinstance(self._grad, sparse.RowSparseArray)):
             self._grad = cuda.to_cpu(self._grad)
 
     def to_gpu(self, device=None):
@@ -206,11 +482,23 @@ Actual: {0}'''.format(type(data))
         """
         with cuda.get_device(device):
             self.data = cuda.to_gpu(self.data)
-            if self._grad is not None:
-                self._grad = cuda.to_gpu(self._grad)
+            grad = self._grad
+            if isinstance(grad, sparse.RowSparseArray):
+                grad = grad.to_dense()
+            if grad is not None:
+                self._grad = cuda.to_gpu(grad)
 
     def zerograd(self):
-        """Initializes the gradient array by zeros."""
+        """Initializes the gradient array by zeros.
+
+        A row-sparse gradient is replaced by a row-sparse array without
+        nonzero rows, so that the gradient is kept row-sparse and the whole
+        parameter is not touched.
+
+        """
+        if isinstance(self._grad, sparse.RowSparseArray):
+            self._grad = sparse.zeros(self._grad.shape, self._grad.dtype)
+            return
         with cuda.get_device(self.data) as dev:
             if self._grad is None:
                 xp = numpy if int(dev) == -1 else cuda.cupy
@@ -256,6 +544,10 @@ Actual: {0}'''.format(type(data))
             raise ValueError('Source gradient is not set.')
         if dst is None:
             raise ValueError('Target graidient is not set.')
+        if isinstance(src, sparse.RowSparseArray):
+            src = src.to_dense()
+        if isinstance(dst, sparse.RowSparseArray):
+            self._grad = dst = dst.to_dense()
 
         xp = cuda.get_array_module(dst)
         if xp is numpy:
@@ -281,7 +573,8 @@ Actual: {0}'''.format(type(data))
         self.creator = gen_func
         self.rank = gen_func.rank + 1
 
-    def backward(self, retain_grad=False):
+    def backward(self, retain_grad=False, reuse_buffer=False, stats=None,
+                 use_heap=True):
         """Runs error backpropagation (a.k.a. backprop) from this variable.
 
         On backprop, :meth:`Function.backward` is called on each
@@ -308,6 +601,32 @@ Actual: {0}'''.format(type(data))
                 In most cases of training some model, the purpose of backprop
                 is to compute gradients of parameters, not of variables, so it
                 is recommended to set this flag False.
+            reuse_buffer (bool): If ``True``, the graph is analyzed before the
+                backprop to find variables whose gradients must be accumulated
+                from multiple branches. The buffers allocated for such
+                accumulation are recycled for later accumulations of the same
+                shape and dtype once their gradients have been consumed,
+                which reduces the number of allocations on deep branching
+                graphs (e.g. residual nets). Buffers are not recycled when
+                ``retain_grad`` is ``True``.
+
+                Gradient arrays passed to function hooks may be overwritten
+                by a later accumulation in this mode; hooks must copy them to
+                keep their values.
+            stats (BackwardStatistics): If given, the statistics of gradient
+                arrays (e.g. the number of allocations and the peak memory
+                size) are collected into this object.
+            use_heap (bool): If ``True``, functions are visited in the
+                descending order of their ranks using a heap queue. Otherwise,
+                the number of consumers of each function in the backward
+                graph is counted beforehand, and a function is visited as soon
+                as the backward computations of all its consumers are done.
+                The latter does not use ranks nor a heap, and it visits the
+                graph in a depth-first manner, so the gradients of one branch
+                are released before other branches are processed. It reduces
+                the peak memory on wide graphs like tree-structured recursive
+                nets. Both orders give the same gradients up to the order of
+                accumulation.
 
         """
         if self.creator is None:
@@ -326,29 +645,76 @@ Actual: {0}'''.format(type(data))
                 else:
                     self.grad = cuda.cupy.ones_like(self.data)
 
-        def add_cand(cand):
-            if cand not in seen_set:
-                # Negate since heapq is min-heap
-                heapq.heappush(cand_funcs, (-cand.rank, len(seen_set), cand))
-                seen_set.add(cand)
+        pool = _GradientBufferPool(self) if reuse_buffer else None
+        if stats is not None:
+            stats._reset_live()
+            if self.grad is not None:
+                stats._acquire(self.grad, allocated=False)
+
+        if use_heap:
+            def add_cand(cand):
+                if cand not in seen_set:
+                    # Negate since heapq is min-heap
+                    heapq.heappush(
+                        cand_funcs, (-cand.rank, len(seen_set), cand))
+                    seen_set.add(cand)
+
+            def pop_cand():
+                return heapq.heappop(cand_funcs)[2]
+        else:
+            # seen_set holds the functions that receive gradients
+            n_consumers = _count_consumers(self.creator)
+            add_cand = seen_set.add
+            pop_cand = cand_funcs.pop
+
+            def release_inputs(func):
+                # Makes the creators of the inputs ready if all of their
+                # consumers are done. Functions without any gradients are
+                # skipped.
+                skipped = []
+                while func is not None:
+                    for x in func.inputs:
+                        creator = x.creator
+                        if creator is None:
+                            continue
+                        count = n_consumers[creator] - 1
+                        n_consumers[creator] = count
+                        if count == 0:
+                            if creator in seen_set:
+                                cand_funcs.append(creator)
+                            else:
+                                skipped.append(creator)
+                    func = skipped.pop() if skipped else None
+
+        def accumulate(x, gx, gxs):
+            # Returns the sum of the current gradient of x and gx
+            if pool is not None:
+                return pool.accumulate(x, gx, gxs, stats)
+            new_grad = x._grad + gx
+            if stats is not None:
+                stats._acquire(new_grad)
+                stats._release(x._grad)
+                stats._release(gx)
+            return new_grad
 
         if self.creator is not None:
             add_cand(self.creator)
+            if not use_heap:
+                cand_funcs.append(self.creator)
 
         while cand_funcs:
-            _, _, func = heapq.heappop(cand_funcs)
+            func = pop_cand()
             outputs = tuple(y() for y in func.outputs)  # access via weak ref
 
             in_data = tuple(x.data for x in func.inputs)
             out_grad = tuple(None if y is None else y.grad for y in outputs)
-            hooks = collections.OrderedDict(chainer.get_function_hooks())
-            hooks.update(func.local_function_hooks)
-            for hook in six.itervalues(hooks):
+            hooks = func._get_hooks()
+            for hook in hooks:
                 hook.backward_preprocess(func, in_data, out_grad)
             with cuda.get_device(*(in_data + out_grad)):
                 gxs = func.backward(in_data, out_grad)
             assert len(gxs) == len(in_data)
-            for hook in six.itervalues(hooks):
+            for hook in hooks:
                 hook.backward_postprocess(func, in_data, out_grad)
 
             if chainer.is_debug():
@@ -358,9 +724,21 @@ Actual: {0}'''.format(type(data))
                     msg = 'NaN is detected on backward computation'
                     raise RuntimeError(msg)
 
+            if stats is not None:
+                for gx in gxs:
+                    if gx is not None:
+                        stats._acquire(gx)
+                stats._update_peak()
+
             if not retain_grad:
                 for y in outputs:
                     if y is not None and y is not self:
+                        if y._grad is not None:
+                            if pool is not None:
+                                pool.complete(y)
+                                pool.drop(y._grad)
+                            if stats is not None:
+                                stats._release(y._grad)
                         y.grad = None
             for x, gx in zip(func.inputs, gxs):
                 if gx is None:
@@ -368,6 +746,19 @@ Actual: {0}'''.format(type(data))
 
                 _check_grad_type(func, x, gx)
 
+                if isinstance(gx, sparse.RowSparseArray):
+                    if x.creator is not None:
+                        # Functions only take dense gradients
+                        gx = gx.to_dense()
+                    else:
+                        _accumulate_sparse(x, gx, need_copy)
+                        continue
+                elif isinstance(x._grad, sparse.RowSparseArray):
+                    # A leaf with a row-sparse gradient gets a new dense one
+                    x._grad = x._grad + gx
+                    need_copy.discard(id(x))
+                    continue
+
                 # Accumulate the gradient to x. It is a bit tricky to handle
                 # branches and parameter gradient accumulation correctly.
                 with cuda.get_device(gx):
@@ -376,23 +767,35 @@ Actual: {0}'''.format(type(data))
                         if x._grad is None:
                             x.grad = gx
                             need_copy.add(id_x)
+                            if pool is not None:
+                                pool.hold(gx)
                         elif id_x in need_copy:
-                            x.grad = x.grad + gx  # copy
+                            x.grad = accumulate(x, gx, gxs)  # copy
                             need_copy.remove(id_x)
                         else:
                             x._grad += gx
+                            if stats is not None:
+                                stats._release(gx)
                     else:  # not a leaf
                         add_cand(x.creator)
                         if id_x not in seen_vars:  # 1st visit
                             x.grad = gx
                             seen_vars.add(id_x)
                             need_copy.add(id_x)
+                            if pool is not None:
+                                pool.hold(gx)
                         elif id_x in need_copy:  # 2nd visit
-                            x._grad = gx + x._grad  # copied
+                            x._grad = accumulate(x, gx, gxs)  # copied
                             need_copy.remove(id_x)
                         else:  # 3rd or later visit
                             x._grad += gx
+                            if stats is not None:
+                                stats._release(gx)
             del gxs  # to reduce memory usage
+            if not use_heap:
+                release_inputs(func)
+            if pool is not None:
+                pool.collect(stats)
 
     def unchain_backward(self):
         """Deletes references between variables and functions backward.
@@ -18,6 +18,7 @@ import six.moves.cPickle as pickle
 
 import chainer
 from chainer import cuda
+from chainer import hogwild
 import chainer.links as L
 from chainer import optimizers
 from chainer import serializers
@@ -42,10 +43,14 @@ parser.add_argument('--bproplen', '-l', type=int, default=35,
                     help='length of truncated BPTT')
 parser.add_argument('--gradclip', '-c', type=int, default=5,
                     help='gradient norm threshold to clip')
+parser.add_argument('--process', '-p', default=1, type=int,
+                    help='number of processes training in parallel on CPU')
 parser.add_argument('--test', dest='test', action='store_true')
 parser.set_defaults(test=False)
 
 args = parser.parse_args()
+if args.gpu >= 0 and args.process > 1:
+    raise ValueError('multi-process training only runs on CPU')
 xp = cuda.cupy if args.gpu >= 0 else np
 
 n_epoch = args.epoch   # number of epochs
@@ -133,44 +138,81 @@ accum_loss = 0
 batch_idxs = list(range(batchsize))
 print('going to train {} iterations'.format(jump * n_epoch))
 
-for i in six.moves.range(jump * n_epoch):
-    x = chainer.Variable(xp.asarray(
-        [train_data[(jump * j + i) % whole_len] for j in batch_idxs]))
-    t = chainer.Variable(xp.asarray(
-        [train_data[(jump * j + i + 1) % whole_len] for j in batch_idxs]))
-    loss_i = model(x, t)
-    accum_loss += loss_i
-    cur_log_perp += loss_i.data
-
-    if (i + 1) % bprop_len == 0:  # Run truncated BPTT
-        model.zerograds()
-        accum_loss.backward()
-        accum_loss.unchain_backward()  # truncate
-        accum_loss = 0
-        optimizer.update()
-
-    if (i + 1) % 10000 == 0:
+
+def chunk_loss(i):
+    # Loss of truncated BPTT from the i-th iteration
+    loss = 0
+    for k in six.moves.range(i, i + bprop_len):
+        x = chainer.Variable(xp.asarray(
+            [train_data[(jump * j + k) % whole_len] for j in batch_idxs]))
+        t = chainer.Variable(xp.asarray(
+            [train_data[(jump * j + k + 1) % whole_len] for j in batch_idxs]))
+        loss += model(x, t)
+    return loss
+
+
+if args.process > 1:
+    # Each process runs truncated BPTT over a contiguous part of each epoch
+    # with its own RNN state, and updates the shared model without locks
+    for epoch in six.moves.range(1, n_epoch + 1):
+        starts = list(six.moves.range(
+            (epoch - 1) * jump, epoch * jump - bprop_len + 1, bprop_len))
+        sum_loss = hogwild.train(optimizer, chunk_loss, starts, args.process)
         now = time.time()
-        throuput = 10000. / (now - cur_at)
-        perp = math.exp(float(cur_log_perp) / 10000)
-        print('iter {} training perplexity: {:.2f} ({:.2f} iters/sec)'.format(
-            i + 1, perp, throuput))
-        cur_at = now
-        cur_log_perp.fill(0)
-
-    if (i + 1) % jump == 0:
-        epoch += 1
+        n_iter = len(starts) * bprop_len
+        print('epoch {} training perplexity: {:.2f} ({:.2f} iters/sec)'.format(
+            epoch, math.exp(sum_loss / n_iter), n_iter / (now - cur_at)))
+
         print('evaluate')
-        now = time.time()
         perp = evaluate(valid_data)
         print('epoch {} validation perplexity: {:.2f}'.format(epoch, perp))
-        cur_at += time.time() - now  # skip time of evaluation
+        cur_at = time.time()  # skip time of evaluation
 
         if epoch >= 6:
             optimizer.lr /= 1.2
             print('learning rate =', optimizer.lr)
 
-    sys.stdout.flush()
+        sys.stdout.flush()
+else:
+    for i in six.moves.range(jump * n_epoch):
+        x = chainer.Variable(xp.asarray(
+            [train_data[(jump * j + i) % whole_len] for j in batch_idxs]))
+        t = chainer.Variable(xp.asarray(
+            [train_data[(jump * j + i + 1) % whole_len] for j in batch_idxs]))
+        loss_i = model(x, t)
+        accum_loss += loss_i
+        cur_log_perp += loss_i.data
+
+        if (i + 1) % bprop_len == 0:  # Run truncated BPTT
+            model.zerograds()
+            accum_loss.backward()
+            accum_loss.unchain_backward()  # truncate
+            accum_loss = 0
+            optimizer.update()
+
+        if (i + 1) % 10000 == 0:
+            now = time.time()
+            throuput = 10000. / (now - cur_at)
+            perp = math.exp(float(cur_log_perp) / 10000)
+            print('iter {} training perplexity: {:.2f} '
+                  '({:.2f} iters/sec)'.format(i + 1, perp, throuput))
+            cur_at = now
+            cur_log_perp.fill(0)
+
+        if (i + 1) % jump == 0:
+            epoch += 1
+            print('evaluate')
+            now = time.time()
+            perp = evaluate(valid_data)
+            print('epoch {} validation perplexity: {:.2f}'.format(
+                epoch, perp))
+            cur_at += time.time() - now  # skip time of evaluation
+
+            if epoch >= 6:
+                optimizer.lr /= 1.2
+                print('learning rate =', optimizer.lr)
+
+        sys.stdout.flush()
 
 # Evaluate on test dataset
 print('test')
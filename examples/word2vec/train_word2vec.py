@@ -13,6 +13,7 @@ import numpy as np
 import chainer
 from chainer import cuda
 import chainer.functions as F
+from chainer import hogwild
 import chainer.links as L
 import chainer.optimizers as O
 
@@ -34,12 +35,16 @@ parser.add_argument('--out-type', '-o', choices=['hsm', 'ns', 'original'],
                     default='hsm',
                     help='output model type ("hsm": hierarchical softmax, '
                     '"ns": negative sampling, "original": no approximation)')
+parser.add_argument('--process', '-p', default=1, type=int,
+                    help='number of processes training in parallel on CPU')
 parser.add_argument('--test', dest='test', action='store_true')
 parser.set_defaults(test=False)
 
 args = parser.parse_args()
 if args.gpu >= 0:
     cuda.check_cuda_available()
+    if args.process > 1:
+        raise ValueError('multi-process training only runs on CPU')
 xp = cuda.cupy if args.gpu >= 0 else np
 
 print('GPU: {}'.format(args.gpu))
@@ -47,6 +52,7 @@ print('# unit: {}'.format(args.unit))
 print('Window: {}'.format(args.window))
 print('Minibatch-size: {}'.format(args.batchsize))
 print('# epoch: {}'.format(args.epoch))
+print('# process: {}'.format(args.process))
 print('Training model: {}'.format(args.model))
 print('Output type: {}'.format(args.out_type))
 print('')
@@ -176,6 +182,22 @@ for epoch in range(args.epoch):
     accum_loss = 0
     print('epoch: {0}'.format(epoch))
     indexes = np.random.permutation(skip)
+    if args.process > 1:
+        # Processes update the shared model without locks
+        def lossfun(i):
+            position = np.array(
+                range(0, args.batchsize)) * skip + (args.window + i)
+            return calculate_loss(model, dataset, position)
+
+        accum_loss += hogwild.train(optimizer, lossfun, indexes, args.process)
+        now = time.time()
+        print('{} words, {:.2f} sec, {:.2f} words/sec'.format(
+            len(indexes) * args.batchsize, now - cur_at,
+            len(indexes) * args.batchsize / (now - cur_at)))
+        cur_at = now
+        print(accum_loss)
+        continue
+
     for i in indexes:
         if word_count >= next_count:
             now = time.time()
@@ -0,0 +1,115 @@
+import unittest
+
+import numpy
+import six
+
+import chainer
+from chainer import cuda
+from chainer import function_hooks
+from chainer import functions
+from chainer import links
+from chainer import testing
+from chainer.testing import attr
+
+
+class Net(chainer.Chain):
+
+    def __init__(self):
+        super(Net, self).__init__(
+            l1=links.Linear(3, 4),
+            l2=links.Linear(4, 2),
+        )
+
+    def __call__(self, x):
+        h = functions.dropout(self.l1(x))
+        return self.l2(functions.reshape(h, (len(x.data), 4)))
+
+
+class TestMemoryHook(unittest.TestCase):
+
+    def setUp(self):
+        self.net = Net()
+        self.h = function_hooks.MemoryHook(self.net)
+        self.x = numpy.random.uniform(-1, 1, (5, 3)).astype(numpy.float32)
+
+    def test_name(self):
+        self.assertEqual(self.h.name, 'MemoryHook')
+
+    def check_forward_backward(self, x_data):
+        with self.h:
+            y = self.net(chainer.Variable(x_data))
+            self.assertEqual(self.h.current_bytes, 5 * (4 + 4 + 4 + 2) * 4)
+            loss = functions.sum(y)
+            loss.backward()
+
+        self.assertEqual(self.h.retained_bytes(), {'mask': 5 * 4 * 4})
+
+        summary = self.h.summary()
+        self.assertEqual(list(summary.keys()),
+                         ['Dropout', 'LinearFunction', 'Sum', 'Reshape'])
+        self.assertEqual(summary['LinearFunction'],
+                         {'count': 2, 'output_bytes': 5 * 6 * 4,
+                          'retained_bytes': 0})
+        summary = self.h.summary('link')
+        self.assertEqual(list(summary.keys()), ['/', '/l1', '/l2', None])
+        self.assertEqual(summary['/'],
+                         {'count': 2, 'output_bytes': 5 * 4 * 4,
+                          'retained_bytes': 5 * 4 * 4})
+        self.assertEqual(summary['/l1'],
+                         {'count': 1, 'output_bytes': 5 * 4 * 4,
+                          'retained_bytes': 0})
+        self.assertEqual(summary['/l2'],
+                         {'count': 1, 'output_bytes': 5 * 2 * 4,
+                          'retained_bytes': 0})
+        self.assertEqual(summary[None],
+                         {'count': 1, 'output_bytes': 4,
+                          'retained_bytes': 0})
+
+        expect_peak = 5 * (4 + 4 + 4 + 2) * 4 + 4
+        self.assertEqual(self.h.peak_bytes, expect_peak)
+        self.assertEqual(self.h.current_bytes, expect_peak)
+        del y, loss
+        self.assertEqual(self.h.current_bytes, 0)
+        self.assertEqual(self.h.peak_bytes, expect_peak)
+
+    def test_forward_backward_cpu(self):
+        self.check_forward_backward(self.x)
+
+    @attr.gpu
+    def test_forward_backward_gpu(self):
+        self.net.to_gpu()
+        self.check_forward_backward(cuda.to_gpu(self.x))
+
+    def test_without_link(self):
+        h = function_hooks.MemoryHook()
+        with h:
+            self.net(chainer.Variable(self.x))
+        self.assertEqual(list(h.summary('link').keys()), [None])
+
+    def test_repeated_calls(self):
+        with self.h:
+            for _ in six.moves.range(10):
+                self.net(chainer.Variable(self.x))
+        self.assertEqual(len(self.h._stats), 4)
+        summary = self.h.summary()
+        self.assertEqual(summary['LinearFunction']['count'], 20)
+        self.assertEqual(summary['Dropout']['retained_bytes'],
+                         10 * 5 * 4 * 4)
+
+    def test_print_report(self):
+        with self.h:
+            y = self.net(chainer.Variable(self.x))  # NOQA
+        f = six.StringIO()
+        self.h.print_report(file=f)
+        lines = f.getvalue().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertTrue(lines[0].startswith('label'))
+        self.assertTrue(lines[1].startswith('Dropout'))
+        self.assertEqual(lines[-1], 'peak bytes: 280')
+
+    def test_invalid_key(self):
+        with self.assertRaises(ValueError):
+            self.h.summary('invalid')
+
+
+testing.run_module(__name__, __file__)
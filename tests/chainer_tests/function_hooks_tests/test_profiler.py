@@ -0,0 +1,153 @@
+import json
+import unittest
+
+import numpy
+import six
+
+import chainer
+from chainer import cuda
+from chainer import function_hooks
+from chainer import functions
+from chainer.functions.connection import linear
+from chainer import links
+from chainer import testing
+from chainer.testing import attr
+from chainer.utils import conv
+
+
+class TestProfileHook(unittest.TestCase):
+
+    def setUp(self):
+        self.h = function_hooks.ProfileHook(max_trace_events=3)
+        self.link = links.Linear(5, 4)
+        self.x = numpy.random.uniform(-0.1, 0.1, (3, 5)).astype(numpy.float32)
+
+    def test_name(self):
+        self.assertEqual(self.h.name, 'ProfileHook')
+
+    def check_profile(self, x_data, n):
+        with self.h:
+            for _ in six.moves.range(n):
+                y = functions.relu(self.link(chainer.Variable(x_data)))
+                y.grad = self.link.xp.ones_like(y.data)
+                y.backward()
+        self.assertEqual(self.h.call_history, [])
+
+        summary = self.h.summary()
+        self.assertEqual(
+            set(summary.keys()),
+            set([('LinearFunction', 'forward'), ('ReLU', 'forward'),
+                 ('LinearFunction', 'backward'), ('ReLU', 'backward')]))
+        totals = [s['total'] for s in summary.values()]
+        self.assertEqual(totals, sorted(totals, reverse=True))
+        for s in summary.values():
+            self.assertEqual(s['count'], n)
+            self.assertAlmostEqual(s['mean'] * n, s['total'])
+            self.assertLessEqual(s['p50'], s['p99'])
+        self.assertAlmostEqual(self.h.total_time(), sum(totals))
+
+        linear = summary['LinearFunction', 'forward']
+        self.assertEqual(linear['flops'], n * 2 * 3 * 5 * 4)
+        self.assertEqual(linear['bytes'], n * (3 * 5 + 4 * 5 + 4) * 4)
+        self.assertEqual(summary['LinearFunction', 'backward']['flops'],
+                         n * 2 * 2 * 3 * 5 * 4)
+        relu = summary['ReLU', 'backward']
+        self.assertEqual(relu['flops'], n * 2 * 3 * 4)
+        self.assertEqual(relu['bytes'], n * 2 * 3 * 4 * 4)
+
+    def test_profile_cpu(self):
+        self.check_profile(self.x, 10)
+
+    @attr.gpu
+    def test_profile_gpu(self):
+        self.link.to_gpu()
+        self.check_profile(cuda.to_gpu(self.x), 10)
+
+    def test_print_report(self):
+        self.check_profile(self.x, 2)
+        f = six.StringIO()
+        self.h.print_report(file=f)
+        lines = f.getvalue().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertTrue(lines[0].startswith('function'))
+
+    def test_dump_trace(self):
+        self.check_profile(self.x, 2)
+        f = six.StringIO()
+        self.h.dump_trace(f)
+        events = json.loads(f.getvalue())['traceEvents']
+        self.assertEqual(len(events), 3)
+        self.assertEqual(
+            [(e['name'], e['cat']) for e in events],
+            [('ReLU', 'forward'), ('ReLU', 'backward'),
+             ('LinearFunction', 'backward')])
+        for e in events:
+            self.assertEqual(e['ph'], 'X')
+            self.assertGreaterEqual(e['dur'], 0)
+
+    def test_subclass_estimator(self):
+        class SubLinear(linear.LinearFunction):
+            pass
+
+        W = self.link.W
+        with self.h:
+            y = SubLinear()(chainer.Variable(self.x), W)
+            y.grad = numpy.ones_like(y.data)
+            y.backward()
+        summary = self.h.summary()
+        self.assertEqual(summary['SubLinear', 'forward']['flops'],
+                         2 * 3 * 5 * 4)
+        self.assertEqual(summary['SubLinear', 'backward']['flops'],
+                         2 * 2 * 3 * 5 * 4)
+
+    def test_linear_relu(self):
+        with self.h:
+            y = functions.linear_relu(
+                chainer.Variable(self.x), self.link.W, self.link.b)
+            y.grad = numpy.ones_like(y.data)
+            y.backward()
+        summary = self.h.summary()
+        flops = 2 * 3 * 5 * 4 + 3 * 4
+        self.assertEqual(
+            summary['LinearReLUFunction', 'forward']['flops'], flops)
+        self.assertEqual(
+            summary['LinearReLUFunction', 'backward']['flops'], 2 * flops)
+
+    def test_convolution_2d_relu(self):
+        link = links.Convolution2D(3, 2, 3, pad=1)
+        x = numpy.random.uniform(-1, 1, (2, 3, 4, 5)).astype(numpy.float32)
+        with self.h:
+            y = functions.convolution_2d_relu(
+                chainer.Variable(x), link.W, link.b, pad=1)
+            y.grad = numpy.ones_like(y.data)
+            y.backward()
+        summary = self.h.summary()
+        n_outputs = 2 * 2 * 4 * 5
+        flops = 2 * n_outputs * 3 * 3 * 3 + n_outputs
+        self.assertEqual(
+            summary['Convolution2DReLUFunction', 'forward']['flops'], flops)
+        self.assertEqual(
+            summary['Convolution2DReLUFunction', 'backward']['flops'],
+            2 * flops)
+
+    def test_convolution_2d_nhwc(self):
+        link = links.Convolution2D(3, 2, 3, stride=2)
+        x = numpy.random.uniform(-1, 1, (2, 7, 5, 3)).astype(numpy.float32)
+        with conv.using_layout('NHWC'):
+            with self.h:
+                functions.convolution_2d(chainer.Variable(x), link.W, link.b,
+                                         stride=2)
+        self.assertEqual(
+            self.h.summary()['Convolution2DFunction', 'forward']['flops'],
+            2 * 2 * 2 * 3 * 2 * 3 * 3 * 3)
+
+    def test_percentile(self):
+        stats = function_hooks.profiler._Statistics()
+        for t in numpy.linspace(1e-4, 1e-2, 1000):
+            stats.add(t, 0, 0)
+        self.assertAlmostEqual(stats.percentile(50), 5e-3, delta=5e-4)
+        self.assertAlmostEqual(stats.percentile(99), 9.9e-3, delta=1e-3)
+        self.assertEqual(stats.percentile(100), 1e-2)
+
+
+testing.run_module(__name__, __file__)
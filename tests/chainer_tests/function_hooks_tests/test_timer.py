@@ -1,5 +1,7 @@
+import time
 import unittest
 
+import mock
 import numpy
 
 import chainer
@@ -62,6 +64,36 @@ class TestTimerHookToLink(unittest.TestCase):
         self.check_backward(cuda.to_gpu(self.x), cuda.to_gpu(self.gy))
 
 
+class TestTimerHookElapsedTime(unittest.TestCase):
+
+    def setUp(self):
+        self.h = function_hooks.TimerHook()
+
+    def test_elapsed_time_cpu(self):
+        self.h.xp = numpy
+        self.h.start = time.time() - 1
+        self.assertGreaterEqual(self.h._elapsed_time(), 1)
+
+    def test_elapsed_time_gpu_unit(self):
+        # get_elapsed_time returns milliseconds
+        self.h.xp = None
+        self.h.start = mock.MagicMock()
+        self.h.stop = mock.MagicMock()
+        with mock.patch('chainer.cuda.cupy', create=True) as cupy:
+            cupy.cuda.get_elapsed_time.return_value = 2.5
+            self.assertAlmostEqual(self.h._elapsed_time(), 0.0025)
+        self.h.stop.synchronize.assert_called_once_with()
+
+    @attr.gpu
+    def test_elapsed_time_gpu(self):
+        x = cuda.to_gpu(numpy.ones((1000, 1000), numpy.float32))
+        start = time.time()
+        with self.h:
+            functions.Exp()(chainer.Variable(x))
+        wall_time = time.time() - start
+        self.assertLessEqual(self.h.total_time(), wall_time)
+
+
 class TestTimerHookToFunction(unittest.TestCase):
 
     def setUp(self):
@@ -11,6 +11,7 @@ from chainer import gradient_check
 from chainer import testing
 from chainer.testing import attr
 from chainer.testing import condition
+from chainer.utils import conv
 
 
 @testing.parameterize(*testing.product({
@@ -141,6 +142,133 @@ class TestConvolution2DFunction(unittest.TestCase):
                             None, cuda.to_gpu(self.gy))
 
 
+@testing.parameterize(*testing.product({
+    'cpu_algorithm': ['im2col', 'direct_1x1', 'winograd'],
+    'nobias': [True, False],
+}))
+class TestConvolution2DFunctionCpuAlgorithm(unittest.TestCase):
+
+    def setUp(self):
+        k = 1 if self.cpu_algorithm == 'direct_1x1' else 3
+        self.pad = 0 if k == 1 else 1
+        self.x = numpy.random.uniform(-1, 1, (2, 3, 5, 4)).astype('d')
+        self.W = numpy.random.uniform(-1, 1, (2, 3, k, k)).astype('d')
+        self.b = None if self.nobias else numpy.random.uniform(
+            -1, 1, 2).astype('d')
+        self.gy = numpy.random.uniform(-1, 1, (2, 2, 5, 4)).astype('d')
+
+    def test_forward(self):
+        args = [chainer.Variable(self.x), chainer.Variable(self.W)]
+        if self.b is not None:
+            args.append(chainer.Variable(self.b))
+        y = functions.convolution_2d(
+            *args, pad=self.pad, cpu_algorithm=self.cpu_algorithm)
+        y_expect = functions.convolution_2d(
+            *args, pad=self.pad, cpu_algorithm='im2col')
+        gradient_check.assert_allclose(y_expect.data, y.data)
+
+    def test_backward(self):
+        args = (self.x, self.W)
+        if self.b is not None:
+            args = args + (self.b,)
+        gradient_check.check_backward(
+            convolution_2d.Convolution2DFunction(
+                pad=self.pad, cpu_algorithm=self.cpu_algorithm),
+            args, self.gy)
+
+
+@testing.parameterize(*testing.product({
+    'nobias': [True, False],
+    'cover_all': [True, False],
+}))
+class TestConvolution2DFunctionNHWC(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(-1, 1, (2, 3, 5, 4)).astype('d')
+        self.W = numpy.random.uniform(-1, 1, (2, 3, 3, 2)).astype('d')
+        self.b = None if self.nobias else numpy.random.uniform(
+            -1, 1, 2).astype('d')
+        layout = conv.get_layout()
+        try:
+            conv.set_layout('NHWC')
+            self.func = convolution_2d.Convolution2DFunction(
+                stride=2, pad=1, cover_all=self.cover_all)
+        finally:
+            conv.set_layout(layout)
+
+    def test_forward(self):
+        args = [chainer.Variable(self.x), chainer.Variable(self.W)]
+        if self.b is not None:
+            args.append(chainer.Variable(self.b))
+        y_expect = functions.convolution_2d(
+            *args, stride=2, pad=1, cover_all=self.cover_all)
+        args[0] = chainer.Variable(self.x.transpose(0, 2, 3, 1))
+        y = self.func(*args)
+        gradient_check.assert_allclose(
+            y_expect.data.transpose(0, 2, 3, 1), y.data)
+
+    def test_backward(self):
+        args = (self.x.transpose(0, 2, 3, 1), self.W)
+        if self.b is not None:
+            args = args + (self.b,)
+        out_h = conv.get_conv_outsize(5, 3, 2, 1, self.cover_all)
+        out_w = conv.get_conv_outsize(4, 2, 2, 1, self.cover_all)
+        gy = numpy.random.uniform(-1, 1, (2, out_h, out_w, 2)).astype('d')
+        gradient_check.check_backward(self.func, args, gy)
+
+
+@testing.parameterize(*testing.product({
+    'use_cudnn': [True, False],
+    'nobias': [True, False],
+}))
+class TestConvolution2DReLUFunction(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(-1, 1, (2, 3, 4, 3)).astype('d')
+        self.W = numpy.random.uniform(-1, 1, (2, 3, 3, 3)).astype('d')
+        self.b = None if self.nobias else numpy.random.uniform(
+            -1, 1, 2).astype('d')
+        self.gy = numpy.random.uniform(-1, 1, (2, 2, 2, 2)).astype('d')
+
+    def check_forward(self, x_data, W_data, b_data):
+        args = [chainer.Variable(x_data), chainer.Variable(W_data)]
+        if b_data is not None:
+            args.append(chainer.Variable(b_data))
+        y = functions.convolution_2d_relu(
+            *args, stride=2, pad=1, use_cudnn=self.use_cudnn)
+        y_expect = functions.relu(functions.convolution_2d(
+            *args, stride=2, pad=1, use_cudnn=self.use_cudnn))
+        gradient_check.assert_allclose(y_expect.data, y.data)
+
+    def test_forward_cpu(self):
+        self.check_forward(self.x, self.W, self.b)
+
+    @attr.gpu
+    def test_forward_gpu(self):
+        self.check_forward(cuda.to_gpu(self.x), cuda.to_gpu(self.W),
+                           None if self.b is None else cuda.to_gpu(self.b))
+
+    def check_backward(self, x_data, W_data, b_data, y_grad):
+        args = (x_data, W_data)
+        if b_data is not None:
+            args = args + (b_data,)
+        gradient_check.check_backward(
+            convolution_2d.Convolution2DReLUFunction(
+                2, 1, self.use_cudnn),
+            args, y_grad, eps=1e-3)
+
+    @condition.retry(3)
+    def test_backward_cpu(self):
+        self.check_backward(self.x, self.W, self.b, self.gy)
+
+    @attr.gpu
+    @condition.retry(3)
+    def test_backward_gpu(self):
+        self.check_backward(cuda.to_gpu(self.x), cuda.to_gpu(self.W),
+                            None if self.b is None else cuda.to_gpu(self.b),
+                            cuda.to_gpu(self.gy))
+
+
 @testing.parameterize(*testing.product({
     'use_cudnn': [True, False],
     'dtype': [numpy.float16, numpy.float32, numpy.float64],
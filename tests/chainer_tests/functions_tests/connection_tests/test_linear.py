@@ -100,4 +100,52 @@ class TestNonparameterizedLinear(unittest.TestCase):
                             None, cuda.to_gpu(self.gy))
 
 
+@testing.parameterize(
+    {'nobias': True},
+    {'nobias': False},
+)
+class TestLinearReLU(unittest.TestCase):
+
+    def setUp(self):
+        self.W = numpy.random.uniform(-1, 1, (2, 3)).astype('d')
+        self.b = None if self.nobias else numpy.random.uniform(
+            -1, 1, 2).astype('d')
+        self.x = numpy.random.uniform(-1, 1, (4, 3)).astype('d')
+        self.gy = numpy.random.uniform(-1, 1, (4, 2)).astype('d')
+
+    def check_forward(self, x_data, W_data, b_data):
+        args = [chainer.Variable(x_data), chainer.Variable(W_data)]
+        if b_data is not None:
+            args.append(chainer.Variable(b_data))
+        y = functions.linear_relu(*args)
+        y_expect = functions.relu(functions.linear(*args))
+        gradient_check.assert_allclose(y_expect.data, y.data)
+
+    def test_forward_cpu(self):
+        self.check_forward(self.x, self.W, self.b)
+
+    @attr.gpu
+    def test_forward_gpu(self):
+        self.check_forward(cuda.to_gpu(self.x), cuda.to_gpu(self.W),
+                           None if self.b is None else cuda.to_gpu(self.b))
+
+    def check_backward(self, x_data, W_data, b_data, y_grad):
+        args = (x_data, W_data)
+        if b_data is not None:
+            args = args + (b_data,)
+        gradient_check.check_backward(
+            linear.LinearReLUFunction(), args, y_grad, eps=1e-3)
+
+    @condition.retry(3)
+    def test_backward_cpu(self):
+        self.check_backward(self.x, self.W, self.b, self.gy)
+
+    @attr.gpu
+    @condition.retry(3)
+    def test_backward_gpu(self):
+        self.check_backward(cuda.to_gpu(self.x), cuda.to_gpu(self.W),
+                            None if self.b is None else cuda.to_gpu(self.b),
+                            cuda.to_gpu(self.gy))
+
+
 testing.run_module(__name__, __file__)
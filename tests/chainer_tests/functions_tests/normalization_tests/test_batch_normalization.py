@@ -11,6 +11,7 @@ from chainer import gradient_check
 from chainer import testing
 from chainer.testing import attr
 from chainer.testing import condition
+from chainer.utils import conv
 
 
 def _batch_normalization(expander, gamma, beta, x, mean, var):
@@ -85,6 +86,62 @@ class TestBatchNormalization(unittest.TestCase):
             [cuda.to_gpu(i) for i in self.args], cuda.to_gpu(self.gy))
 
 
+@testing.parameterize(*testing.product({
+    'fixed': [True, False],
+}))
+class TestBatchNormalizationNHWC(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(-1, 1, (7, 3, 2, 4)).astype('d')
+        self.gy = numpy.random.uniform(-1, 1, (7, 2, 4, 3)).astype('d')
+        self.args = [numpy.random.uniform(.5, 1, (3,)).astype('d'),
+                     numpy.random.uniform(-1, 1, (3,)).astype('d')]
+        if self.fixed:
+            self.args += [numpy.random.uniform(-1, 1, (3,)).astype('d'),
+                          numpy.random.uniform(.5, 1, (3,)).astype('d')]
+        layout = conv.get_layout()
+        conv.set_layout('NHWC')
+        try:
+            self.func = batch_normalization.BatchNormalizationFunction()
+        finally:
+            conv.set_layout(layout)
+
+    def check_forward(self, x_data, args):
+        xp = cuda.get_array_module(x_data)
+        y = self.func(*[chainer.Variable(i) for i in
+                        [x_data.transpose(0, 2, 3, 1)] + args])
+        y_expect = batch_normalization.BatchNormalizationFunction()(
+            *[chainer.Variable(i) for i in [x_data] + args])
+        gradient_check.assert_allclose(
+            cuda.to_cpu(y_expect.data).transpose(0, 2, 3, 1),
+            cuda.to_cpu(y.data))
+        self.assertIs(cuda.get_array_module(y.data), xp)
+
+    def test_forward_cpu(self):
+        self.check_forward(self.x, self.args)
+
+    @attr.gpu
+    def test_forward_gpu(self):
+        self.check_forward(cuda.to_gpu(self.x),
+                           [cuda.to_gpu(i) for i in self.args])
+
+    def check_backward(self, x_data, args, y_grad):
+        gradient_check.check_backward(
+            self.func, [x_data.transpose(0, 2, 3, 1)] + args, y_grad,
+            eps=1e-2, atol=1e-4, rtol=1e-3)
+
+    @condition.retry(3)
+    def test_backward_cpu(self):
+        self.check_backward(self.x, self.args, self.gy)
+
+    @attr.gpu
+    @condition.retry(3)
+    def test_backward_gpu(self):
+        self.check_backward(cuda.to_gpu(self.x),
+                            [cuda.to_gpu(i) for i in self.args],
+                            cuda.to_gpu(self.gy))
+
+
 @testing.parameterize(*testing.product({
     'ndim': [0, 1, 2, 3],
     'dtype': [numpy.float16, numpy.float32, numpy.float64],
@@ -10,6 +10,7 @@ from chainer import gradient_check
 from chainer import testing
 from chainer.testing import attr
 from chainer.testing import condition
+from chainer.utils import conv
 
 
 @testing.parameterize(*testing.product({
@@ -69,5 +70,134 @@ class TestLocalResponseNormalization(unittest.TestCase):
     def test_backward_gpu(self):
         self.check_backward(cuda.to_gpu(self.x), cuda.to_gpu(self.gy))
 
+    def check_forward_nhwc(self, x_data):
+        xp = cuda.get_array_module(x_data)
+        layout = conv.get_layout()
+        conv.set_layout('NHWC')
+        try:
+            x = chainer.Variable(
+                xp.ascontiguousarray(x_data.transpose(0, 2, 3, 1)))
+            y = functions.local_response_normalization(x)
+        finally:
+            conv.set_layout(layout)
+        y_expect = functions.local_response_normalization(
+            chainer.Variable(x_data))
+        gradient_check.assert_allclose(
+            cuda.to_cpu(y_expect.data).transpose(0, 2, 3, 1),
+            cuda.to_cpu(y.data), **self.check_forward_optionss)
+
+    def test_forward_cpu_nhwc(self):
+        self.check_forward_nhwc(self.x)
+
+    @attr.gpu
+    def test_forward_gpu_nhwc(self):
+        self.check_forward_nhwc(cuda.to_gpu(self.x))
+
+    def check_backward_nhwc(self, x_data, y_grad):
+        xp = cuda.get_array_module(x_data)
+        layout = conv.get_layout()
+        conv.set_layout('NHWC')
+        try:
+            self.check_backward(
+                xp.ascontiguousarray(x_data.transpose(0, 2, 3, 1)),
+                xp.ascontiguousarray(y_grad.transpose(0, 2, 3, 1)))
+        finally:
+            conv.set_layout(layout)
+
+    @condition.retry(3)
+    def test_backward_cpu_nhwc(self):
+        self.check_backward_nhwc(self.x, self.gy)
+
+    @attr.gpu
+    @condition.retry(3)
+    def test_backward_gpu_nhwc(self):
+        self.check_backward_nhwc(cuda.to_gpu(self.x), cuda.to_gpu(self.gy))
+
+
+class TestLocalResponseNormalizationWindow(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(-1, 1, (2, 7, 3, 2)).astype('d')
+
+    def check_forward(self, n, layout):
+        x_data = self.x
+        if layout == 'NHWC':
+            x_data = x_data.transpose(0, 2, 3, 1)
+        original_layout = conv.get_layout()
+        conv.set_layout(layout)
+        try:
+            y = functions.local_response_normalization(
+                chainer.Variable(x_data), n=n, k=1, alpha=1, beta=1)
+        finally:
+            conv.set_layout(original_layout)
+        y_data = y.data
+        if layout == 'NHWC':
+            y_data = y_data.transpose(0, 3, 1, 2)
+
+        y_expect = numpy.empty_like(self.x)
+        for c in six.moves.range(7):
+            s = numpy.square(self.x[:, max(0, c - n // 2):c + n // 2 + 1])
+            y_expect[:, c] = self.x[:, c] / (1 + s.sum(axis=1))
+        gradient_check.assert_allclose(y_expect, y_data)
+
+    def test_forward_even(self):
+        self.check_forward(4, 'NCHW')
+
+    def test_forward_wide(self):
+        self.check_forward(17, 'NCHW')
+
+    def test_forward_even_nhwc(self):
+        self.check_forward(4, 'NHWC')
+
+    def test_forward_wide_nhwc(self):
+        self.check_forward(17, 'NHWC')
+
+
+@testing.parameterize(
+    {'layout': 'NCHW'},
+    {'layout': 'NHWC'},
+)
+class TestLocalResponseNormalizationLargeChannel(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.ones((1, 10, 2, 2), dtype=numpy.float32)
+
+    def forward(self):
+        x_data = self.x
+        if self.layout == 'NHWC':
+            x_data = x_data.transpose(0, 2, 3, 1)
+        original_layout = conv.get_layout()
+        conv.set_layout(self.layout)
+        try:
+            y = functions.local_response_normalization(
+                chainer.Variable(x_data))
+        finally:
+            conv.set_layout(original_layout)
+        y_data = y.data
+        if self.layout == 'NHWC':
+            y_data = y_data.transpose(0, 3, 1, 2)
+        return y_data
+
+    def expect(self, c):
+        # Reference computed in double precision
+        x = self.x.astype(numpy.float64)
+        s = numpy.square(x[:, max(0, c - 2):c + 3]).sum(axis=1)
+        return x[:, c] * (2 + 1e-4 * s) ** -.75
+
+    def test_inf_channel(self):
+        self.x[0, 0] = numpy.inf
+        y = self.forward()
+        # inf * inf ** -beta is NaN in the infinite channel itself
+        self.assertTrue(numpy.isnan(y[0, 0]).all())
+        numpy.testing.assert_array_equal(y[0, 1:3], 0)
+        for c in six.moves.range(3, 10):
+            gradient_check.assert_allclose(self.expect(c), y[:, c])
+
+    def test_large_channel(self):
+        self.x[0, 0] = 1e20
+        y = self.forward()
+        for c in six.moves.range(10):
+            gradient_check.assert_allclose(self.expect(c), y[:, c])
+
 
 testing.run_module(__name__, __file__)
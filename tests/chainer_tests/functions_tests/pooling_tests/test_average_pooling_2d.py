@@ -11,6 +11,7 @@ from chainer import gradient_check
 from chainer import testing
 from chainer.testing import attr
 from chainer.testing import condition
+from chainer.utils import conv
 
 
 @testing.parameterize(*testing.product({
@@ -70,6 +71,39 @@ class TestAveragePooling2D(unittest.TestCase):
     def test_backward_cpu(self):
         self.check_backward(self.x, self.gy)
 
+    @condition.retry(3)
+    def test_backward_cpu_chunked(self):
+        workspace_size = conv.get_max_workspace_size()
+        conv.set_max_workspace_size(1)
+        try:
+            self.check_backward(self.x, self.gy)
+        finally:
+            conv.set_max_workspace_size(workspace_size)
+
+    def test_forward_cpu_nhwc(self):
+        layout = conv.get_layout()
+        conv.set_layout('NHWC')
+        try:
+            x = chainer.Variable(self.x.transpose(0, 2, 3, 1))
+            y = functions.average_pooling_2d(x, 3, stride=2, pad=1)
+        finally:
+            conv.set_layout(layout)
+        y_expect = functions.average_pooling_2d(
+            chainer.Variable(self.x), 3, stride=2, pad=1)
+        gradient_check.assert_allclose(
+            y_expect.data.transpose(0, 2, 3, 1), y.data,
+            **self.check_forward_options)
+
+    @condition.retry(3)
+    def test_backward_cpu_nhwc(self):
+        layout = conv.get_layout()
+        conv.set_layout('NHWC')
+        try:
+            self.check_backward(self.x.transpose(0, 2, 3, 1),
+                                self.gy.transpose(0, 2, 3, 1))
+        finally:
+            conv.set_layout(layout)
+
     @attr.cudnn
     @condition.retry(3)
     def test_backward_gpu(self):
@@ -11,6 +11,7 @@ from chainer import gradient_check
 from chainer import testing
 from chainer.testing import attr
 from chainer.testing import condition
+from chainer.utils import conv
 
 
 @testing.parameterize(*testing.product({
@@ -65,6 +66,18 @@ class TestMaxPooling2D(unittest.TestCase):
         x = chainer.Variable(x_data)
         functions.max_pooling_2d(x, 6, stride=6, pad=0)
 
+    def test_forward_cpu_index_dtype(self):
+        x_data = numpy.random.rand(2, 3, 15, 15).astype(self.dtype)
+        func = functions.MaxPooling2D(3, stride=2, pad=1)
+        func.forward_cpu((x_data,))
+        self.assertEqual(func.indexes.dtype, numpy.int8)
+
+        func = functions.MaxPooling2D(12, stride=3)
+        y, = func.forward_cpu((x_data,))
+        self.assertEqual(func.indexes.dtype, numpy.int16)
+        gradient_check.assert_allclose(
+            y[:, :, 0, 0], x_data[:, :, :12, :12].max(axis=(2, 3)))
+
     @attr.cudnn
     @condition.retry(3)
     def test_forward_gpu(self):
@@ -86,6 +99,53 @@ class TestMaxPooling2D(unittest.TestCase):
     def test_backward_cpu(self):
         self.check_backward(self.x, self.gy)
 
+    @condition.retry(3)
+    def test_backward_cpu_chunked(self):
+        workspace_size = conv.get_max_workspace_size()
+        conv.set_max_workspace_size(1)
+        try:
+            self.check_backward(self.x, self.gy)
+        finally:
+            conv.set_max_workspace_size(workspace_size)
+
+    @condition.retry(3)
+    def test_backward_cpu_recompute(self):
+        recompute = conv.get_recompute()
+        conv.set_recompute(True)
+        try:
+            func = functions.MaxPooling2D(
+                3, stride=2, pad=1, cover_all=self.cover_all)
+            func.forward_cpu((self.x,))
+            self.assertIsNone(func.indexes)
+            self.check_backward(self.x, self.gy)
+        finally:
+            conv.set_recompute(recompute)
+
+    def test_forward_cpu_nhwc(self):
+        layout = conv.get_layout()
+        conv.set_layout('NHWC')
+        try:
+            x = chainer.Variable(self.x.transpose(0, 2, 3, 1))
+            y = functions.max_pooling_2d(
+                x, 3, stride=2, pad=1, cover_all=self.cover_all)
+        finally:
+            conv.set_layout(layout)
+        y_expect = functions.max_pooling_2d(
+            chainer.Variable(self.x), 3, stride=2, pad=1,
+            cover_all=self.cover_all)
+        gradient_check.assert_allclose(
+            y_expect.data.transpose(0, 2, 3, 1), y.data)
+
+    @condition.retry(3)
+    def test_backward_cpu_nhwc(self):
+        layout = conv.get_layout()
+        conv.set_layout('NHWC')
+        try:
+            self.check_backward(self.x.transpose(0, 2, 3, 1),
+                                self.gy.transpose(0, 2, 3, 1))
+        finally:
+            conv.set_layout(layout)
+
     @attr.cudnn
     @condition.retry(3)
     def test_backward_gpu(self):
@@ -47,6 +47,26 @@ class TestROIPooling2D(unittest.TestCase):
     def test_forward_cpu(self):
         self.check_forward(self.x, self.rois)
 
+    def test_forward_cpu_more_rois(self):
+        # Two ROIs on the second image, one of which lies outside of it
+        rois = numpy.array([
+            [1, 0, 0, 4, 4],
+            [1, 20, 30, 25, 35],
+        ], dtype=numpy.float32)
+        x = self.x[:2]
+        y = functions.roi_pooling_2d(
+            chainer.Variable(x), chainer.Variable(rois), outh=2, outw=2,
+            spatial_scale=0.5).data
+        self.assertEqual(y.shape, (2, 3, 2, 2))
+
+        expect = numpy.empty((3, 2, 2), dtype=numpy.float32)
+        expect[:, 0, 0] = x[1, :, 0:2, 0:2].max(axis=(1, 2))
+        expect[:, 0, 1] = x[1, :, 0:2, 1:3].max(axis=(1, 2))
+        expect[:, 1, 0] = x[1, :, 1:3, 0:2].max(axis=(1, 2))
+        expect[:, 1, 1] = x[1, :, 1:3, 1:3].max(axis=(1, 2))
+        gradient_check.assert_allclose(expect, y[0])
+        gradient_check.assert_allclose(numpy.zeros((3, 2, 2)), y[1])
+
     @attr.gpu
     @condition.retry(3)
     def test_forward_gpu(self):
@@ -10,6 +10,7 @@ from chainer import gradient_check
 from chainer import testing
 from chainer.testing import attr
 from chainer.testing import condition
+from chainer.utils import conv
 from chainer.utils import type_check
 
 
@@ -91,6 +92,31 @@ class TestSpatialPyramidPooling2D(unittest.TestCase):
     def test_backward_cpu(self):
         self.check_backward(self.x, self.gy)
 
+    def test_forward_cpu_nhwc(self):
+        layout = conv.get_layout()
+        conv.set_layout('NHWC')
+        try:
+            y = functions.spatial_pyramid_pooling_2d(
+                chainer.Variable(self.x.transpose(0, 2, 3, 1)),
+                self.pyramid_height, self.pooling_class)
+        finally:
+            conv.set_layout(layout)
+        y_expect = functions.spatial_pyramid_pooling_2d(
+            chainer.Variable(self.x), self.pyramid_height, self.pooling_class)
+        self.assertEqual(y.data.shape, (self.n, 1, 1, self.output_dim))
+        gradient_check.assert_allclose(
+            y_expect.data.transpose(0, 2, 3, 1), y.data)
+
+    @condition.retry(3)
+    def test_backward_cpu_nhwc(self):
+        layout = conv.get_layout()
+        conv.set_layout('NHWC')
+        try:
+            self.check_backward(self.x.transpose(0, 2, 3, 1),
+                                self.gy.transpose(0, 2, 3, 1))
+        finally:
+            conv.set_layout(layout)
+
     @attr.cudnn
     @condition.retry(3)
     def test_backward_gpu(self):
@@ -10,6 +10,7 @@ from chainer import gradient_check
 from chainer import testing
 from chainer.testing import attr
 from chainer.testing import condition
+from chainer.utils import conv
 
 
 @testing.parameterize(*testing.product_dict(
@@ -103,6 +104,31 @@ class TestUnpooling2D(unittest.TestCase):
     def test_backward_cpu(self):
         self.check_backward(self.x, self.gy)
 
+    def test_forward_cpu_nhwc(self):
+        layout = conv.get_layout()
+        conv.set_layout('NHWC')
+        try:
+            y = functions.unpooling_2d(
+                chainer.Variable(self.x.transpose(0, 2, 3, 1)), self.ksize,
+                outsize=self.outsize, cover_all=self.cover_all)
+        finally:
+            conv.set_layout(layout)
+        y_expect = functions.unpooling_2d(
+            chainer.Variable(self.x), self.ksize, outsize=self.outsize,
+            cover_all=self.cover_all)
+        gradient_check.assert_allclose(
+            y_expect.data.transpose(0, 2, 3, 1), y.data)
+
+    @condition.retry(3)
+    def test_backward_cpu_nhwc(self):
+        layout = conv.get_layout()
+        conv.set_layout('NHWC')
+        try:
+            self.check_backward(self.x.transpose(0, 2, 3, 1),
+                                self.gy.transpose(0, 2, 3, 1))
+        finally:
+            conv.set_layout(layout)
+
     @attr.gpu
     @condition.retry(3)
     def test_backward_gpu(self):
@@ -0,0 +1,123 @@
+import unittest
+
+import numpy
+
+import chainer
+from chainer import cuda
+from chainer import functions
+from chainer import gradient_check
+from chainer import links
+from chainer import testing
+from chainer.testing import attr
+
+
+class Block(chainer.Chain):
+
+    def __init__(self):
+        super(Block, self).__init__(
+            l1=links.Linear(3, 4),
+            bn=links.BatchNormalization(4),
+            l2=links.Linear(4, 3),
+        )
+        self.train = True
+
+    def __call__(self, x, y):
+        h = functions.dropout(functions.relu(self.bn(self.l1(x))),
+                              train=self.train)
+        return self.l2(h) * y, h
+
+
+class TestForget(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(-1, 1, (5, 3)).astype(numpy.float32)
+        self.y = numpy.random.uniform(-1, 1, (5, 3)).astype(numpy.float32)
+        self.gz = numpy.random.uniform(-1, 1, (5, 3)).astype(numpy.float32)
+        self.gh = numpy.random.uniform(-1, 1, (5, 4)).astype(numpy.float32)
+        self.block = Block()
+
+    def run_block(self, x_data, y_data, use_forget):
+        self.block.zerograds()
+        x = chainer.Variable(x_data)
+        y = chainer.Variable(y_data)
+        if use_forget:
+            z, h = functions.forget(self.block, x, y)
+        else:
+            z, h = self.block(x, y)
+        xp = cuda.get_array_module(x_data)
+        loss = (functions.sum(z * xp.asarray(self.gz)) +
+                functions.sum(h * xp.asarray(self.gh)))
+        loss.backward()
+        return ([z.data, h.data, x.grad, y.grad] +
+                [p.grad.copy() for p in self.block.params()] +
+                [self.block.bn.avg_mean.copy()])
+
+    def check_forget(self, x_data, y_data):
+        numpy.random.seed(0)
+        expect = self.run_block(x_data, y_data, False)
+        self.block.bn.avg_mean.fill(0)
+        numpy.random.seed(0)
+        actual = self.run_block(x_data, y_data, True)
+        self.assertEqual(len(expect), len(actual))
+        for e, a in zip(expect, actual):
+            gradient_check.assert_allclose(e, a)
+
+    def test_forget_cpu(self):
+        self.check_forget(self.x, self.y)
+
+    @attr.gpu
+    def test_forget_gpu(self):
+        self.block.to_gpu()
+        # forget draws random numbers of CuPy from another generator, so
+        # dropout is disabled to compare the results with the plain call
+        self.block.train = False
+        self.check_forget(cuda.to_gpu(self.x), cuda.to_gpu(self.y))
+
+    def check_dropout(self, x_data):
+        # The recomputation must reproduce the mask used in the forward pass
+        x = chainer.Variable(x_data)
+        y = functions.forget(lambda x: functions.dropout(x, 0.5), x)
+        y.grad = y.data.copy()
+        y.grad.fill(1)
+        y.backward()
+        gradient_check.assert_allclose(y.data, x.data * x.grad)
+
+    def test_dropout_cpu(self):
+        self.check_dropout(self.x)
+
+    @attr.gpu
+    def test_dropout_gpu(self):
+        self.check_dropout(cuda.to_gpu(self.x))
+
+    def test_graph_is_released(self):
+        z, h = functions.forget(
+            self.block, chainer.Variable(self.x), chainer.Variable(self.y))
+        self.assertIsInstance(z.creator, functions.Forget)
+        self.assertIs(z.creator, h.creator)
+
+    def test_volatile(self):
+        z, h = functions.forget(
+            self.block, chainer.Variable(self.x, volatile='on'),
+            chainer.Variable(self.y, volatile='on'))
+        self.assertIs(z.volatile, chainer.flag.ON)
+        self.assertIsNone(z.creator)
+
+    def test_partial_output_grad(self):
+        self.block.zerograds()
+        x = chainer.Variable(self.x)
+        z, h = functions.forget(self.block, x, chainer.Variable(self.y))
+        h.grad = self.gh
+        h.backward()
+        self.assertIsNotNone(x.grad)
+        numpy.testing.assert_array_equal(self.block.l2.W.grad, 0)
+
+    def test_invalid_output(self):
+        with self.assertRaises(TypeError):
+            functions.forget(lambda x: x.data, chainer.Variable(self.x))
+
+    def test_not_callable(self):
+        with self.assertRaises(TypeError):
+            functions.forget(1, chainer.Variable(self.x))
+
+
+testing.run_module(__name__, __file__)
@@ -4,11 +4,13 @@ import numpy
 
 import chainer
 from chainer import cuda
+from chainer import functions
 from chainer import gradient_check
 from chainer import links
 from chainer import testing
 from chainer.testing import attr
 from chainer.testing import condition
+from chainer.utils import sparse
 
 
 @testing.parameterize(
@@ -68,6 +70,66 @@ class TestEmbedID(unittest.TestCase):
         self.check_backward(cuda.to_gpu(self.x), cuda.to_gpu(self.gy))
 
 
+class TestEmbedIDSparseGrad(unittest.TestCase):
+
+    def setUp(self):
+        self.link = links.EmbedID(5, 2, ignore_label=-1, sparse_grad=True)
+        self.x = numpy.array([[0, 3, -1], [3, 3, 0]], dtype=numpy.int32)
+        self.gy = numpy.random.uniform(
+            -1, 1, (2, 3, 2)).astype(numpy.float32)
+
+        self.gW_expect = numpy.zeros((5, 2), dtype=numpy.float32)
+        for i in numpy.ndindex(self.x.shape):
+            if self.x[i] != -1:
+                self.gW_expect[self.x[i]] += self.gy[i]
+
+    def backward(self):
+        y = self.link(chainer.Variable(self.x))
+        y.grad = self.gy
+        y.backward()
+
+    def test_backward_sparse(self):
+        self.link.W.grad = None
+        self.backward()
+        gW = self.link.W.grad
+        self.assertIsInstance(gW, sparse.RowSparseArray)
+        numpy.testing.assert_array_equal(gW.indices, [0, 3])
+        gradient_check.assert_allclose(self.gW_expect, gW.to_dense())
+
+        # Row-sparse gradients are accumulated without densification
+        self.backward()
+        self.assertIsInstance(self.link.W.grad, sparse.RowSparseArray)
+        gradient_check.assert_allclose(
+            self.gW_expect * 2, self.link.W.grad.to_dense())
+
+    def test_zerograds(self):
+        self.backward()
+        self.link.zerograds()
+        gW = self.link.W.grad
+        self.assertIsInstance(gW, sparse.RowSparseArray)
+        self.assertEqual(len(gW.indices), 0)
+        self.backward()
+        gradient_check.assert_allclose(
+            self.gW_expect, self.link.W.grad.to_dense())
+
+    def test_backward_dense(self):
+        gW = numpy.zeros((5, 2), dtype=numpy.float32)
+        self.link.W.grad = gW
+        self.backward()
+        self.assertIs(self.link.W.grad, gW)
+        gradient_check.assert_allclose(self.gW_expect, gW)
+
+    def test_backward_not_leaf(self):
+        W = self.link.W * 1
+        y = functions.embed_id(
+            chainer.Variable(self.x), W, ignore_label=-1, sparse_grad=True)
+        y.grad = self.gy
+        self.link.W.grad = None
+        y.backward()
+        self.assertIsInstance(self.link.W.grad, numpy.ndarray)
+        gradient_check.assert_allclose(self.gW_expect, self.link.W.grad)
+
+
 @testing.parameterize(
     {'t_value': -1, 'valid': False},
     {'t_value': 3,  'valid': False},
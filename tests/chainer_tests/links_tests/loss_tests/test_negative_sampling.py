@@ -10,6 +10,7 @@ from chainer import links
 from chainer import testing
 from chainer.testing import attr
 from chainer.testing import condition
+from chainer.utils import sparse
 
 
 class TestNegativeSampling(unittest.TestCase):
@@ -67,6 +68,38 @@ class TestNegativeSampling(unittest.TestCase):
 
         gradient_check.assert_allclose(y.data, y_g.data, atol=1.e-4)
 
+    def test_forward_cpu(self):
+        y = self.link(chainer.Variable(self.x), chainer.Variable(self.t))
+        samples = y.creator.samples
+        self.assertEqual(samples.shape, (2, 3))
+
+        loss_expect = 0
+        for ix, k in zip(self.x, samples):
+            f = self.link.W.data[k].dot(ix)
+            f[0] *= -1
+            loss_expect += numpy.logaddexp(f, 0).sum()
+        self.assertEqual(y.data.dtype, numpy.float32)
+        gradient_check.assert_allclose(loss_expect, y.data)
+
+    def test_backward_cpu_sparse(self):
+        link = links.NegativeSampling(
+            3, [10, 5, 2, 5, 2], 2, sparse_grad=True)
+        link.W.data[...] = numpy.random.uniform(-1, 1, link.W.data.shape)
+        link.W.grad = None
+        y = link(chainer.Variable(self.x), chainer.Variable(self.t))
+        y.grad = self.gy
+        y.backward()
+        gW = link.W.grad
+        self.assertIsInstance(gW, sparse.RowSparseArray)
+
+        func = negative_sampling.NegativeSamplingFunction(
+            link.sampler.sample, link.sample_size)
+        func.samples = y.creator.samples
+        inputs = (self.x, self.t, link.W.data)
+        func.forward(inputs)
+        _, _, gW_expect = func.backward(inputs, (self.gy,))
+        gradient_check.assert_allclose(gW_expect, gW.to_dense())
+
     @condition.retry(3)
     def test_backward_cpu(self):
         self.check_backward(self.x, self.t, self.gy)
@@ -6,6 +6,7 @@ import six
 
 import chainer
 from chainer import cuda
+from chainer import function_hooks
 import chainer.functions as F
 from chainer import testing
 from chainer.testing import attr
@@ -328,6 +329,184 @@ Actual: 1 < 2"""
             f(v)
 
 
+class TestFunctionTypeCheckCache(unittest.TestCase):
+
+    def setUp(self):
+        class Function(chainer.Function):
+            def __init__(self, ndim, param=None):
+                self.ndim = ndim
+                self.param = param
+
+            def check_type_forward(self, in_types):
+                x_type, = in_types
+                type_check.expect(x_type.ndim == self.ndim)
+
+            def forward(self, inputs):
+                return inputs
+
+        self.function = Function
+        self.called = mock.MagicMock()
+        original = Function.check_type_forward
+
+        def check_type_forward(f, in_types):
+            self.called()
+            original(f, in_types)
+
+        Function.check_type_forward = check_type_forward
+
+    def call(self, shape, *args):
+        x = chainer.Variable(numpy.zeros(shape, numpy.float32))
+        return self.function(*args)(x)
+
+    def test_cache_hit(self):
+        self.call((2, 3), 2)
+        self.call((2, 3), 2)
+        self.assertEqual(self.called.call_count, 1)
+
+    def test_cache_miss_by_shape(self):
+        self.call((2, 3), 2)
+        self.call((3, 3), 2)
+        self.assertEqual(self.called.call_count, 2)
+
+    def test_cache_miss_by_dtype(self):
+        self.call((2, 3), 2)
+        x = chainer.Variable(numpy.zeros((2, 3), numpy.float64))
+        self.function(2)(x)
+        self.assertEqual(self.called.call_count, 2)
+
+    def test_cache_miss_by_attribute(self):
+        self.call((2, 3), 2, 1)
+        self.call((2, 3), 2, 2)
+        self.assertEqual(self.called.call_count, 2)
+
+    def test_not_cached_for_array_attribute(self):
+        self.call((2, 3), 2, numpy.zeros(2))
+        self.call((2, 3), 2, numpy.zeros(2))
+        self.assertEqual(self.called.call_count, 2)
+
+    def test_invalid_type_not_cached(self):
+        msg = """\
+Invalid operation is performed in: Function \\(Forward\\)
+
+Expect: in_types\\[0\\]\\.ndim == 3
+Actual: 2 \\!= 3"""
+        for _ in six.moves.range(2):
+            with six.assertRaisesRegex(
+                    self, chainer.utils.type_check.InvalidType, msg):
+                self.call((2, 3), 3)
+        self.assertEqual(self.called.call_count, 2)
+
+
+class TestFunctionHooks(unittest.TestCase):
+
+    def setUp(self):
+        self.x = chainer.Variable(numpy.array([1], numpy.float32))
+        self.f = F.Identity()
+        self.global_hook = mock.MagicMock(spec=chainer.function.FunctionHook)
+        self.local_hook = mock.MagicMock(spec=chainer.function.FunctionHook)
+
+    def test_no_hooks(self):
+        y = self.f(self.x)
+        y.grad = numpy.array([1], numpy.float32)
+        y.backward()
+        self.assertEqual(self.f._n_local_function_hooks, 0)
+        self.assertFalse(hasattr(self.f, '_local_function_hooks'))
+
+    def test_local_hook(self):
+        self.f.add_hook(self.local_hook, 'local')
+        self.assertEqual(self.f._n_local_function_hooks, 1)
+        y = self.f(self.x)
+        self.local_hook.forward_preprocess.assert_called_once_with(
+            self.f, (self.x.data,))
+        self.local_hook.forward_postprocess.assert_called_once_with(
+            self.f, (self.x.data,))
+        y.grad = numpy.array([1], numpy.float32)
+        y.backward()
+        self.assertEqual(self.local_hook.backward_preprocess.call_count, 1)
+        self.assertEqual(self.local_hook.backward_postprocess.call_count, 1)
+
+    def test_global_and_local_hooks(self):
+        self.f.add_hook(self.local_hook, 'local')
+        hooks = chainer.get_function_hooks()
+        hooks['global'] = self.global_hook
+        try:
+            y = self.f(self.x)
+            y.grad = numpy.array([1], numpy.float32)
+            y.backward()
+        finally:
+            del hooks['global']
+        self.assertEqual(list(hooks.keys()), [])
+        for hook in (self.global_hook, self.local_hook):
+            self.assertEqual(hook.forward_preprocess.call_count, 1)
+            self.assertEqual(hook.backward_postprocess.call_count, 1)
+
+    def test_unregister_hook_in_hook(self):
+        class UnregisteringHook(chainer.function.FunctionHook):
+            name = 'unregistering'
+
+            def forward_postprocess(self, function, in_data):
+                self.__exit__()
+
+        hooks = chainer.get_function_hooks()
+        with function_hooks.TimerHook() as timer:
+            UnregisteringHook().__enter__()
+            self.f(self.x)
+            self.assertNotIn('unregistering', hooks)
+        self.assertEqual(len(timer.call_history), 1)
+        self.assertEqual(list(hooks.keys()), [])
+
+
+class TestFunctionInferenceMode(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(-1, 1, (2, 3)).astype(numpy.float32)
+        self.W = chainer.Variable(
+            numpy.random.uniform(-1, 1, (4, 3)).astype(numpy.float32))
+
+    def test_mode(self):
+        self.assertFalse(chainer.is_inference_mode())
+        with chainer.inference_mode():
+            self.assertTrue(chainer.is_inference_mode())
+            with chainer.inference_mode():
+                self.assertTrue(chainer.is_inference_mode())
+            self.assertTrue(chainer.is_inference_mode())
+        self.assertFalse(chainer.is_inference_mode())
+
+    def check_forward(self, x):
+        c_prev = numpy.zeros((2, 1), numpy.float32)
+        with chainer.inference_mode():
+            y = F.relu(F.linear(x, self.W))
+            c, h = F.lstm(c_prev, y)
+        y_expect = F.relu(F.linear(chainer.Variable(self.x), self.W))
+        c_expect, h_expect = F.lstm(chainer.Variable(c_prev), y_expect)
+        self.assertIsInstance(y, numpy.ndarray)
+        self.assertIsInstance(c, numpy.ndarray)
+        self.assertIsInstance(h, numpy.ndarray)
+        numpy.testing.assert_array_equal(y, y_expect.data)
+        numpy.testing.assert_array_equal(c, c_expect.data)
+        numpy.testing.assert_array_equal(h, h_expect.data)
+
+    def test_forward_array(self):
+        self.check_forward(self.x)
+
+    def test_forward_variable(self):
+        self.check_forward(chainer.Variable(self.x))
+
+    def test_type_check(self):
+        with chainer.inference_mode():
+            with self.assertRaises(type_check.InvalidType):
+                F.linear(self.x.astype(numpy.int32), self.W)
+
+    def test_hook(self):
+        hook = mock.MagicMock(spec=chainer.function.FunctionHook)
+        f = F.Identity()
+        f.add_hook(hook)
+        with chainer.inference_mode():
+            f(self.x)
+        hook.forward_preprocess.assert_called_once_with(f, (self.x,))
+        hook.forward_postprocess.assert_called_once_with(f, (self.x,))
+
+
 @testing.parameterize(
     {'return_value': (numpy.array([float('nan')], numpy.float32),),
      'valid': False},
@@ -357,6 +536,11 @@ class TestFunctionForwardDebug(unittest.TestCase):
         self.f.forward_cpu = mock.MagicMock(return_value=self.return_value)
         self.check_debug_forward(self.one)
 
+    def test_debug_forward_inference_mode_cpu(self):
+        self.f.forward_cpu = mock.MagicMock(return_value=self.return_value)
+        with chainer.inference_mode():
+            self.check_debug_forward(self.one)
+
     @attr.gpu
     def test_debug_forward_gpu(self):
         return_value = tuple(None if x is None else cuda.to_gpu(x)
@@ -0,0 +1,117 @@
+import os
+import unittest
+
+import numpy
+
+import chainer
+from chainer import hogwild
+import chainer.links as L
+from chainer import optimizers
+from chainer import testing
+
+
+def _make_data():
+    x = numpy.random.uniform(-1, 1, (64, 3)).astype(numpy.float32)
+    t = (x.sum(axis=1) > 0).astype(numpy.int32)
+    return x, t
+
+
+@testing.parameterize(*testing.product({
+    'flat': [False, True],
+    'optimizer': ['MomentumSGD', 'Adam'],
+}))
+class TestShareMemory(unittest.TestCase):
+
+    def setUp(self):
+        self.link = L.Classifier(L.Linear(3, 2))
+        self.optimizer = getattr(optimizers, self.optimizer)()
+        self.optimizer.setup(self.link, flat=self.flat)
+        self.optimizer.prepare()
+
+    def test_share_memory(self):
+        params = [p.data.copy() for p in self.link.params()]
+        hogwild.share_memory(self.link, self.optimizer)
+        for param, expect in zip(self.link.params(), params):
+            self.assertTrue(hogwild._is_shared(param.data))
+            numpy.testing.assert_array_equal(param.data, expect)
+        for state in self.optimizer._states.values():
+            for value in state.values():
+                if isinstance(value, numpy.ndarray):
+                    self.assertTrue(hogwild._is_shared(value))
+
+    def test_share_memory_twice(self):
+        hogwild.share_memory(self.link, self.optimizer)
+        data = [p.data for p in self.link.params()]
+        hogwild.share_memory(self.link, self.optimizer)
+        for param, d in zip(self.link.params(), data):
+            self.assertIs(param.data, d)
+
+    def test_update_after_share_memory(self):
+        hogwild.share_memory(self.link, self.optimizer)
+        x, t = _make_data()
+        self.optimizer.update(self.link, chainer.Variable(x),
+                              chainer.Variable(t))
+        for param in self.link.params():
+            self.assertTrue(hogwild._is_shared(param.data))
+
+
+class TestShareMemoryLink(unittest.TestCase):
+
+    def test_share_memory(self):
+        link = L.Linear(3, 2)
+        W = link.W.data.copy()
+        hogwild.share_memory(link)
+        self.assertTrue(hogwild._is_shared(link.W.data))
+        self.assertFalse(hogwild._is_shared(link.W.grad))
+        numpy.testing.assert_array_equal(link.W.data, W)
+
+
+@testing.parameterize(*testing.product({
+    'flat': [False, True],
+    'lock': [False, True],
+}))
+class TestTrain(unittest.TestCase):
+
+    def setUp(self):
+        self.x, self.t = _make_data()
+        self.link = L.Classifier(L.Linear(3, 2))
+        self.optimizer = optimizers.MomentumSGD(lr=0.1)
+        self.optimizer.setup(self.link, flat=self.flat)
+
+    def lossfun(self, i):
+        return self.link(chainer.Variable(self.x[i:i + 8]),
+                         chainer.Variable(self.t[i:i + 8]))
+
+    def test_train(self):
+        batches = list(range(0, 64, 8))
+        W = self.link.predictor.W.data.copy()
+        loss_before = float(self.lossfun(0).data)
+        sum_loss = hogwild.train(
+            self.optimizer, self.lossfun, batches * 4, 2, lock=self.lock)
+
+        self.assertEqual(self.optimizer.t, 32)
+        self.assertTrue(numpy.isfinite(sum_loss))
+        self.assertFalse(numpy.array_equal(self.link.predictor.W.data, W))
+        self.assertLess(float(self.lossfun(0).data), loss_before)
+
+    def test_train_error(self):
+        def lossfun(i):
+            raise ValueError('error in lossfun')
+
+        with self.assertRaises(RuntimeError) as cm:
+            hogwild.train(self.optimizer, lossfun, [0, 1], 2, lock=self.lock)
+        self.assertIn('error in lossfun', str(cm.exception))
+
+    def test_train_exit(self):
+        def lossfun(i):
+            if i == 1:
+                os._exit(3)
+            return self.lossfun(0)
+
+        with self.assertRaises(RuntimeError) as cm:
+            hogwild.train(self.optimizer, lossfun, [0, 1], 2, lock=self.lock)
+        self.assertIn('process 1', str(cm.exception))
+        self.assertIn('exited with code 3', str(cm.exception))
+
+
+testing.run_module(__name__, __file__)
@@ -1,3 +1,4 @@
+import copy
 import unittest
 
 import mock
@@ -8,8 +9,10 @@ from chainer import cuda
 from chainer import gradient_check
 from chainer import optimizer
 from chainer import optimizers
+from chainer import serializers
 from chainer import testing
 from chainer.testing import attr
+from chainer.utils import sparse
 
 
 class TestOptimizerUtility(unittest.TestCase):
@@ -25,6 +28,10 @@ class TestOptimizerUtility(unittest.TestCase):
     def test_sqnorm_scalar_cpu(self):
         self.assertAlmostEqual(optimizer._sum_sqnorm([self.a]), 4)
 
+    def test_sqnorm_sparse_cpu(self):
+        x = sparse.RowSparseArray(np.array([0]), self.x[:1], self.x.shape)
+        self.assertAlmostEqual(optimizer._sum_sqnorm([x, self.a]), 5.25)
+
     @attr.gpu
     def test_sqnorm_gpu(self):
         x = cuda.to_gpu(self.x)
@@ -158,6 +165,90 @@ class TestOptimizerLasso(unittest.TestCase):
         self.check_lasso()
 
 
+@testing.parameterize(*testing.product({
+    'hooks': [
+        ('WeightDecay', 'GradientClipping'),
+        ('GradientClipping', 'WeightDecay'),
+        ('Lasso', 'WeightDecay', 'GradientClipping'),
+        ('WeightDecay', 'GradientClipping', 'Lasso', 'GradientClipping'),
+        ('WeightDecay', 'Mock', 'GradientClipping'),
+        ('SubclassDecay', 'GradientClipping', 'SubclassLasso'),
+        ('WeightDecay', 'SubclassMock', 'GradientClipping'),
+    ],
+    'flat': [False, True],
+}))
+class TestFusedHooks(unittest.TestCase):
+
+    rates = {
+        'WeightDecay': 0.3,
+        'Lasso': 0.2,
+        'GradientClipping': 1.5,
+        'SubclassDecay': 0.3,
+        'SubclassLasso': 0.2,
+    }
+
+    def setUp(self):
+        self.ws = [np.random.uniform(-1, 1, (2, 3)).astype(np.float32),
+                   np.random.uniform(-1, 1, (4,)).astype(np.float32)]
+        self.gs = [np.random.uniform(-1, 1, (2, 3)).astype(np.float32),
+                   np.random.uniform(-1, 1, (4,)).astype(np.float32)]
+        self.ws[1][0] = 0
+
+    def expected_grads(self):
+        ws = [w.astype(np.float64) for w in self.ws]
+        gs = [g.astype(np.float64) for g in self.gs]
+        for name in self.hooks:
+            if name in ('WeightDecay', 'SubclassDecay'):
+                gs = [g + self.rates[name] * w for w, g in zip(ws, gs)]
+            elif name in ('Lasso', 'SubclassLasso'):
+                gs = [g + self.rates[name] * np.sign(w)
+                      for w, g in zip(ws, gs)]
+            elif name == 'GradientClipping':
+                norm = np.sqrt(sum(g.ravel().dot(g.ravel()) for g in gs))
+                rate = self.rates[name] / norm
+                if rate < 1:
+                    gs = [g * rate for g in gs]
+            else:
+                gs = [g * 2 for g in gs]
+        return gs
+
+    def test_call_hooks(self):
+        target = chainer.ChainList(
+            *[SimpleLink(w.copy(), g.copy())
+              for w, g in zip(self.ws, self.gs)])
+        opt = optimizers.SGD()
+        opt.setup(target, flat=self.flat)
+        for i, name in enumerate(self.hooks):
+            if name == 'Mock':
+                def hook(opt):
+                    for param in opt.target.params():
+                        param.grad *= 2
+                opt.add_hook(hook, name='hook%d' % i)
+            elif name == 'SubclassMock':
+                # Overriding __call__ disables the fusion
+                class Doubling(optimizer.GradientClipping):
+                    def __call__(self, opt):
+                        for param in opt.target.params():
+                            param.grad *= 2
+                opt.add_hook(Doubling(1.), name='hook%d' % i)
+            elif name == 'SubclassDecay':
+                class MyDecay(optimizer.WeightDecay):
+                    pass
+                opt.add_hook(MyDecay(self.rates[name]), name='hook%d' % i)
+            elif name == 'SubclassLasso':
+                class MyLasso(optimizer.Lasso):
+                    pass
+                opt.add_hook(MyLasso(self.rates[name]), name='hook%d' % i)
+            else:
+                hook = getattr(optimizer, name)(self.rates[name])
+                opt.add_hook(hook, name='hook%d' % i)
+        opt.call_hooks()
+
+        for link, g in zip(target, self.expected_grads()):
+            gradient_check.assert_allclose(g, link.param.grad)
+            self.assertEqual(link.param.grad.dtype, np.float32)
+
+
 class TestGradientMethod(unittest.TestCase):
 
     def _suffix(self, gpu):
@@ -266,6 +357,25 @@ class TestGradientMethod(unittest.TestCase):
         self.setup_gpu(0)
         self.check_accumulate_grads_from_gpu(1)
 
+    def test_accumulate_sparse_grads_to_dense(self):
+        self.setup_cpu()
+        self.optimizer.accumulate_grads([sparse.RowSparseArray(
+            np.array([1]), np.array([3], dtype=np.float32), (3,))])
+        np.testing.assert_array_equal(self.target.param.grad, [0, 4, 2])
+
+    def test_accumulate_grads_to_sparse(self):
+        self.setup_cpu()
+        self.target.param.grad = sparse.RowSparseArray(
+            np.array([2]), np.array([3], dtype=np.float32), (3,))
+        self.optimizer.accumulate_grads([np.arange(3, dtype=np.float32)])
+        np.testing.assert_array_equal(self.target.param.grad, [0, 1, 5])
+
+    def test_compute_grads_norm_sparse(self):
+        self.setup_cpu()
+        self.target.param.grad = sparse.RowSparseArray(
+            np.array([0, 2]), np.array([3, 4], dtype=np.float32), (3,))
+        self.assertAlmostEqual(self.optimizer.compute_grads_norm(), 5)
+
     def check_compute_grads_norm(self):
         norm = self.optimizer.compute_grads_norm()
         self.assertAlmostEqual(norm, np.sqrt(5))
@@ -310,4 +420,304 @@ class TestGradientMethod(unittest.TestCase):
         self.check_clip_grads()
 
 
+class TestGradientMethodSparse(unittest.TestCase):
+
+    def setUp(self):
+        self.w = np.random.uniform(-1, 1, (4, 3)).astype(np.float32)
+        self.g = sparse.scatter_add(
+            [2, 0], np.random.uniform(-1, 1, (2, 3)).astype(np.float32),
+            (4, 3))
+
+    def check_update(self, opt):
+        target = SimpleLink(self.w.copy(), self.g.to_dense())
+        opt.setup(target)
+        opt.update()
+
+        target_sparse = SimpleLink(self.w.copy(), self.g)
+        opt_sparse = copy.deepcopy(opt)
+        opt_sparse.setup(target_sparse)
+        opt_sparse.update()
+        gradient_check.assert_allclose(
+            target.param.data, target_sparse.param.data)
+
+    def test_sgd(self):
+        self.check_update(optimizers.SGD(lr=0.1))
+
+    def test_momentum_sgd(self):
+        self.check_update(optimizers.MomentumSGD(lr=0.1))
+
+    def test_ada_grad(self):
+        self.check_update(optimizers.AdaGrad(lr=0.1))
+
+    def test_adam(self):
+        self.check_update(optimizers.Adam())
+
+    def test_hook(self):
+        target = SimpleLink(self.w.copy(), self.g)
+        opt = optimizers.SGD(lr=0.1)
+        opt.setup(target)
+        opt.add_hook(optimizer.WeightDecay(0.1))
+        opt.update()
+        self.assertIsInstance(target.param.grad, np.ndarray)
+        gradient_check.assert_allclose(
+            self.w - 0.1 * (self.g.to_dense() + 0.1 * self.w),
+            target.param.data)
+
+
+@testing.parameterize(
+    {'optimizer': 'SGD'},
+    {'optimizer': 'MomentumSGD'},
+    {'optimizer': 'Adam'},
+)
+class TestGradientMethodFlat(unittest.TestCase):
+
+    def setUp(self):
+        self.params = [
+            (np.random.uniform(-1, 1, (3, 2)).astype(np.float32),
+             np.random.uniform(-1, 1, (3, 2)).astype(np.float32)),
+            (np.random.uniform(-1, 1, (4,)).astype(np.float64),
+             np.random.uniform(-1, 1, (4,)).astype(np.float64)),
+            (np.random.uniform(-1, 1, (5,)).astype(np.float32),
+             np.random.uniform(-1, 1, (5,)).astype(np.float32)),
+        ]
+
+    def create(self):
+        links = [SimpleLink(w.copy(), g.copy()) for w, g in self.params]
+        target = chainer.ChainList(*links)
+        return target, getattr(optimizers, self.optimizer)()
+
+    def test_setup(self):
+        target, opt = self.create()
+        opt.setup(target, flat=True)
+        l0, l1, l2 = target
+        self.assertIs(l0.param.data.base, l2.param.data.base)
+        self.assertIs(l0.param.grad.base, l2.param.grad.base)
+        self.assertIsNot(l0.param.data.base, l1.param.data.base)
+        np.testing.assert_array_equal(l0.param.data, self.params[0][0])
+        np.testing.assert_array_equal(l1.param.grad, self.params[1][1])
+        for key, value in opt._states['/0/param'].items():
+            self.assertEqual(value.shape, (3, 2))
+            self.assertIs(value.base, opt._states['/2/param'][key].base)
+
+    def test_update(self):
+        target, opt = self.create()
+        opt.setup(target)
+        target_flat, opt_flat = self.create()
+        opt_flat.setup(target_flat, flat=True)
+        for _ in range(3):
+            opt.update()
+            opt_flat.update()
+        for p, p_flat in zip(target.params(), target_flat.params()):
+            gradient_check.assert_allclose(p.data, p_flat.data)
+
+    def test_replace_grad(self):
+        target, opt = self.create()
+        opt.setup(target, flat=True)
+        param = target[0].param
+        g = np.ones_like(param.grad)
+        param.grad = g
+        opt.update()
+        self.assertIsNot(param.grad, g)
+        self.assertIs(param.grad.base, target[2].param.grad.base)
+        np.testing.assert_array_equal(param.grad, g)
+
+    def test_replace_data(self):
+        target, opt = self.create()
+        opt.setup(target, flat=True)
+        target[0].param.data = target[0].param.data.copy()
+        target.add_link(SimpleLink(*self.params[2]))
+        opt.update()
+        l0, _, l2, l3 = target
+        self.assertIs(l0.param.data.base, l2.param.data.base)
+        self.assertIs(l0.param.data.base, l3.param.data.base)
+        self.assertIn('/3/param', opt._states)
+
+
+class TestGradientMethodScratch(unittest.TestCase):
+
+    def setUp(self):
+        self.optimizer = optimizers.SGD()
+
+    def test_get_scratch(self):
+        a = np.empty((2, 3), dtype=np.float32)
+        x, y = self.optimizer.get_scratch(a, 2)
+        for z in x, y:
+            self.assertEqual(z.shape, (2, 3))
+            self.assertEqual(z.dtype, np.float32)
+        self.assertIs(x.base, y.base)
+        self.assertFalse(np.may_share_memory(x, y))
+
+    def test_reuse(self):
+        a = np.empty((2, 3), dtype=np.float32)
+        x, = self.optimizer.get_scratch(a)
+        y, = self.optimizer.get_scratch(np.empty(4, dtype=np.float32))
+        self.assertIs(x.base, y.base)
+        z, = self.optimizer.get_scratch(np.empty(4, dtype=np.float64))
+        self.assertIsNot(x.base, z.base)
+        w, = self.optimizer.get_scratch(np.empty(7, dtype=np.float32))
+        self.assertIsNot(x.base, w.base)
+        self.assertEqual(w.shape, (7,))
+
+
+def _adam(p, g, s, o):
+    s['m'] += (1 - o.beta1) * (g - s['m'])
+    s['v'] += (1 - o.beta2) * (g * g - s['v'])
+    p -= o.lr * s['m'] / (np.sqrt(s['v']) + o.eps)
+
+
+def _ada_delta(p, g, s, o):
+    s['msg'] = o.rho * s['msg'] + (1 - o.rho) * g * g
+    dx = np.sqrt((s['msdx'] + o.eps) / (s['msg'] + o.eps)) * g
+    s['msdx'] = o.rho * s['msdx'] + (1 - o.rho) * dx * dx
+    p -= dx
+
+
+def _ada_grad(p, g, s, o):
+    s['h'] += g * g
+    p -= o.lr * g / (np.sqrt(s['h']) + o.eps)
+
+
+def _momentum_sgd(p, g, s, o):
+    s['v'] = o.momentum * s['v'] - o.lr * g
+    p += s['v']
+
+
+def _nesterov_ag(p, g, s, o):
+    s['v'] = o.momentum * s['v'] - o.lr * g
+    p += o.momentum * o.momentum * s['v'] - (1 + o.momentum) * o.lr * g
+
+
+def _rmsprop(p, g, s, o):
+    s['ms'] = o.alpha * s['ms'] + (1 - o.alpha) * g * g
+    p -= o.lr * g / (np.sqrt(s['ms']) + o.eps)
+
+
+def _rmsprop_graves(p, g, s, o):
+    s['n'] = o.alpha * s['n'] + (1 - o.alpha) * g * g
+    s['g'] = o.alpha * s['g'] + (1 - o.alpha) * g
+    s['delta'] = o.momentum * s['delta'] - o.lr * g / np.sqrt(
+        s['n'] - s['g'] * s['g'] + o.eps)
+    p += s['delta']
+
+
+def _sgd(p, g, s, o):
+    p -= o.lr * g
+
+
+_update_rules = {
+    'Adam': _adam,
+    'AdaDelta': _ada_delta,
+    'AdaGrad': _ada_grad,
+    'MomentumSGD': _momentum_sgd,
+    'NesterovAG': _nesterov_ag,
+    'RMSprop': _rmsprop,
+    'RMSpropGraves': _rmsprop_graves,
+    'SGD': _sgd,
+}
+
+
+@testing.parameterize(*testing.product({
+    'optimizer': sorted(_update_rules),
+}))
+class TestUpdateRuleCPU(unittest.TestCase):
+
+    def setUp(self):
+        self.w = np.random.uniform(-1, 1, (3, 4)).astype(np.float32)
+        self.gs = [np.random.uniform(-1, 1, (3, 4)).astype(np.float32)
+                   for _ in range(3)]
+
+    def test_update(self):
+        target = SimpleLink(self.w.copy(), self.gs[0].copy())
+        opt = getattr(optimizers, self.optimizer)()
+        opt.setup(target)
+
+        w = self.w.astype(np.float64)
+        state = {key: np.zeros_like(w) for key in opt._states['/param']}
+        for g in self.gs:
+            target.param.grad[...] = g
+            opt.update()
+            _update_rules[self.optimizer](
+                w, g.astype(np.float64), state, opt)
+        gradient_check.assert_allclose(w, target.param.data, rtol=1e-4)
+
+
+@testing.parameterize(
+    {'optimizer': 'MomentumSGD', 'exact': True},
+    {'optimizer': 'AdaGrad', 'exact': True},
+    {'optimizer': 'Adam', 'exact': False},
+    {'optimizer': 'RMSprop', 'exact': True},
+)
+class TestGradientMethodLazySparse(unittest.TestCase):
+
+    def setUp(self):
+        self.w = np.random.uniform(-1, 1, (5, 3)).astype(np.float32)
+        self.gs = [
+            sparse.scatter_add(
+                indices, np.random.uniform(
+                    -1, 1, (len(indices), 3)).astype(np.float32), (5, 3))
+            for indices in ([0, 2], [2, 3], [2], [1, 2], [0, 1, 2, 3, 4])]
+
+    def create(self, grad):
+        target = SimpleLink(self.w.copy(), grad)
+        opt = getattr(optimizers, self.optimizer)()
+        opt.setup(target)
+        return target, opt
+
+    def update(self, target, opt, g):
+        target.param.grad = g
+        opt.update()
+
+    def test_update(self):
+        target, opt = self.create(self.gs[0].to_dense())
+        target_sparse, opt_sparse = self.create(self.gs[0])
+        for g in self.gs:
+            self.update(target, opt, g.to_dense())
+            self.update(target_sparse, opt_sparse, g)
+
+        # All rows have caught up with the last update
+        state = opt._states['/param']
+        state_sparse = opt_sparse._states['/param']
+        for key, value in state.items():
+            gradient_check.assert_allclose(value, state_sparse[key])
+        if self.exact:
+            gradient_check.assert_allclose(
+                target.param.data, target_sparse.param.data)
+        else:
+            # Rows involved in all steps are updated exactly
+            gradient_check.assert_allclose(
+                target.param.data[2], target_sparse.param.data[2])
+
+    def test_dense_after_sparse(self):
+        target, opt = self.create(self.gs[0].to_dense())
+        target_sparse, opt_sparse = self.create(self.gs[0])
+        for g in self.gs[:3]:
+            self.update(target, opt, g.to_dense())
+            self.update(target_sparse, opt_sparse, g)
+        g = self.gs[3].to_dense()
+        self.update(target, opt, g)
+        self.update(target_sparse, opt_sparse, g.copy())
+
+        state_sparse = opt_sparse._states['/param']
+        self.assertNotIn('last_t', state_sparse)
+        for key, value in opt._states['/param'].items():
+            gradient_check.assert_allclose(value, state_sparse[key])
+        if self.exact:
+            gradient_check.assert_allclose(
+                target.param.data, target_sparse.param.data)
+
+    def test_serialize(self):
+        target, opt = self.create(self.gs[0].to_dense())
+        target_sparse, opt_sparse = self.create(self.gs[0])
+        for g in self.gs[:2]:
+            self.update(target, opt, g.to_dense())
+            self.update(target_sparse, opt_sparse, g)
+
+        serializer = serializers.DictionarySerializer()
+        opt_sparse.serialize(serializer)
+        self.assertNotIn('param/last_t', serializer.target)
+        for key, value in opt._states['/param'].items():
+            gradient_check.assert_allclose(
+                value, serializer.target['param/' + key])
+
+
 testing.run_module(__name__, __file__)
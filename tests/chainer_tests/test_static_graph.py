@@ -0,0 +1,370 @@
+import unittest
+
+import mock
+import numpy
+
+import chainer
+from chainer import cuda
+from chainer import function
+import chainer.functions as F
+from chainer import gradient_check
+import chainer.links as L
+from chainer import static_graph
+from chainer import testing
+from chainer.testing import attr
+
+
+class MLP(chainer.Chain):
+
+    def __init__(self):
+        super(MLP, self).__init__(
+            l1=L.Linear(3, 4),
+            l2=L.Linear(4, 2),
+        )
+
+    def forward(self, x, activation='relu'):
+        h = self.l1(x)
+        if activation == 'relu':
+            h = F.relu(h)
+        else:
+            h = F.tanh(h)
+        y = self.l2(h)
+        return y, F.sum(y * y)
+
+    __call__ = static_graph.static_graph(forward)
+
+
+class TestStaticGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.link = MLP()
+        self.x = numpy.random.uniform(-1, 1, (5, 3)).astype(numpy.float32)
+        self.x2 = numpy.random.uniform(-1, 1, (5, 3)).astype(numpy.float32)
+        self.x3 = numpy.random.uniform(-1, 1, (7, 3)).astype(numpy.float32)
+
+    def check_call(self, x_data, activation='relu'):
+        self.link.zerograds()
+        x = chainer.Variable(x_data)
+        y, loss = self.link(x, activation=activation)
+        loss.backward()
+        actual = [x.grad] + [p.grad.copy() for p in self.link.params()]
+
+        self.link.zerograds()
+        x = chainer.Variable(x_data)
+        y_expect, loss = self.link.forward(x, activation=activation)
+        loss.backward()
+        expect = [x.grad] + [p.grad.copy() for p in self.link.params()]
+
+        gradient_check.assert_allclose(y_expect.data, y.data)
+        for a, e in zip(actual, expect):
+            gradient_check.assert_allclose(e, a)
+        return y
+
+    def check_replay(self, x, x2, x3):
+        # capture
+        y = self.check_call(x)
+        self.assertEqual(y.creator.label, 'LinearFunction')
+        # replay on new data
+        y = self.check_call(x2)
+        self.assertIsInstance(y.creator, static_graph.StaticGraphFunction)
+        # the shape is changed
+        y = self.check_call(x3)
+        self.assertEqual(y.creator.label, 'LinearFunction')
+        y = self.check_call(x3)
+        self.assertIsInstance(y.creator, static_graph.StaticGraphFunction)
+        # the control flow is changed
+        y = self.check_call(x, activation='tanh')
+        self.assertEqual(y.creator.label, 'LinearFunction')
+        y = self.check_call(x2, activation='tanh')
+        self.assertIsInstance(y.creator, static_graph.StaticGraphFunction)
+
+    def test_replay_cpu(self):
+        self.check_replay(self.x, self.x2, self.x3)
+
+    @attr.gpu
+    def test_replay_gpu(self):
+        self.link.to_gpu()
+        self.check_replay(cuda.to_gpu(self.x), cuda.to_gpu(self.x2),
+                          cuda.to_gpu(self.x3))
+
+    def test_volatile(self):
+        self.link(chainer.Variable(self.x))
+        y, _ = self.link(chainer.Variable(self.x2, volatile='on'))
+        self.assertIs(y.volatile, chainer.flag.ON)
+        self.assertIsNone(y.creator)
+        y_expect, _ = self.link.forward(chainer.Variable(self.x2))
+        gradient_check.assert_allclose(y_expect.data, y.data)
+
+    def test_volatile_capture(self):
+        y, _ = self.link(chainer.Variable(self.x, volatile='on'))
+        self.assertIs(y.volatile, chainer.flag.ON)
+        self.assertIsNone(y.creator)
+        y, _ = self.link(chainer.Variable(self.x2))
+        self.assertIsInstance(y.creator, static_graph.StaticGraphFunction)
+
+    def test_function_hook(self):
+        self.link(chainer.Variable(self.x))
+        with function.FunctionHook():
+            y, _ = self.link(chainer.Variable(self.x2))
+        self.assertEqual(y.creator.label, 'LinearFunction')
+
+    def test_schedule_cache_size(self):
+        with mock.patch.object(static_graph, '_schedule_cache_size', 2):
+            for x in (self.x, self.x3, self.x):
+                y, _ = self.link(chainer.Variable(x))
+            self.assertIsInstance(y.creator, static_graph.StaticGraphFunction)
+            y, _ = self.link(chainer.Variable(self.x[:1]))
+            y, _ = self.link(chainer.Variable(self.x))
+        self.assertEqual(y.creator.label, 'LinearFunction')
+
+    def test_unhashable_argument(self):
+        for _ in range(2):
+            y, _ = self.link(chainer.Variable(self.x), activation=['relu'])
+            self.assertEqual(y.creator.label, 'LinearFunction')
+
+    def test_fusion(self):
+        fusion = static_graph.get_fusion()
+        static_graph.set_fusion(True)
+        try:
+            self.check_call(self.x)
+            y = self.check_call(self.x2)
+        finally:
+            static_graph.set_fusion(fusion)
+        steps = y.creator.schedule.steps
+        self.assertEqual(
+            [func.label for func, _, _ in steps],
+            ['LinearReLUFunction', 'LinearFunction', '_ * _', 'Sum'])
+
+    def test_fusion_shared_output(self):
+        fusion = static_graph.get_fusion()
+        static_graph.set_fusion(True)
+        try:
+            link = SharedHidden()
+            link(chainer.Variable(self.x))
+            y = link(chainer.Variable(self.x2))
+        finally:
+            static_graph.set_fusion(fusion)
+        self.assertIn(
+            'ReLU', [func.label for func, _, _ in y.creator.schedule.steps])
+        y_expect = link.forward(chainer.Variable(self.x2))
+        gradient_check.assert_allclose(y_expect.data, y.data)
+
+    def check_inference_mode(self, x, x2):
+        with chainer.inference_mode():
+            for x_data in (x, x2):
+                y, loss = self.link(x_data)
+                self.assertIsInstance(y, type(x_data))
+                y_expect, loss_expect = self.link.forward(x_data)
+                gradient_check.assert_allclose(y_expect, y)
+                gradient_check.assert_allclose(loss_expect, loss)
+        # the schedule is shared with calls outside the inference mode
+        y, _ = self.link(chainer.Variable(x))
+        self.assertIsInstance(y.creator, static_graph.StaticGraphFunction)
+
+    def test_inference_mode_cpu(self):
+        self.check_inference_mode(self.x, self.x2)
+
+    @attr.gpu
+    def test_inference_mode_gpu(self):
+        self.link.to_gpu()
+        self.check_inference_mode(cuda.to_gpu(self.x), cuda.to_gpu(self.x2))
+
+    def test_inference_mode_fusion(self):
+        forward = static_graph.StaticGraphFunction.forward
+        fusion = static_graph.get_fusion()
+        static_graph.set_fusion(True)
+        try:
+            with chainer.inference_mode():
+                self.link(self.x)
+                with mock.patch.object(
+                        static_graph.StaticGraphFunction, 'forward',
+                        autospec=True, side_effect=forward) as forward:
+                    y, _ = self.link(self.x2)
+        finally:
+            static_graph.set_fusion(fusion)
+        func = forward.call_args[0][0]
+        self.assertEqual(
+            [f.label for f, _, _ in func.schedule.steps],
+            ['LinearReLUFunction', 'LinearFunction', '_ * _', 'Sum'])
+        self.assertFalse(hasattr(func, '_steps'))
+        y_expect, _ = self.link.forward(chainer.Variable(self.x2))
+        gradient_check.assert_allclose(y_expect.data, y)
+
+
+class SharedHidden(chainer.Chain):
+
+    def __init__(self):
+        super(SharedHidden, self).__init__(l1=L.Linear(3, 4))
+
+    def forward(self, x):
+        h = self.l1(x)
+        return F.relu(h) + h
+
+    __call__ = static_graph.static_graph(forward)
+
+
+class AddState(chainer.Link):
+
+    def __init__(self, h):
+        super(AddState, self).__init__()
+        self.h = h
+
+    @static_graph.static_graph
+    def __call__(self, x):
+        return self.h + x
+
+    @static_graph.static_graph
+    def passthrough(self, x):
+        return x
+
+
+class TrainFlag(chainer.Chain):
+
+    def __init__(self):
+        super(TrainFlag, self).__init__(l1=L.Linear(3, 2))
+        self.train = True
+
+    def forward(self, x):
+        h = self.l1(x)
+        return h if self.train else h * 0
+
+    __call__ = static_graph.static_graph(forward)
+
+
+class Stateful(chainer.Chain):
+
+    def __init__(self):
+        super(Stateful, self).__init__(
+            l1=L.Linear(3, 2), lstm=L.LSTM(2, 2),
+            bn=L.BatchNormalization(2))
+        self.mode = 'count'
+        self.count = 0
+
+    @static_graph.static_graph
+    def __call__(self, x):
+        h = self.l1(x)
+        if self.mode == 'count':
+            self.count += 1
+            return h
+        elif self.mode == 'lstm':
+            return self.lstm(h)
+        elif self.mode == 'bn':
+            return self.bn(h)
+        return self.bn(h, finetune=True)
+
+
+class TestStaticGraphLinkState(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(-1, 1, (2, 3)).astype(numpy.float32)
+
+    def test_attribute_in_signature(self):
+        link = TrainFlag()
+        for _ in range(2):
+            y = link(chainer.Variable(self.x))
+        self.assertIsInstance(y.creator, static_graph.StaticGraphFunction)
+        link.train = False
+        for _ in range(2):
+            y = link(chainer.Variable(self.x))
+            numpy.testing.assert_array_equal(y.data, 0)
+
+    def test_added_attribute(self):
+        link = TrainFlag()
+        for _ in range(2):
+            y = link(chainer.Variable(self.x))
+        link.l1.scale = 2
+        y = link(chainer.Variable(self.x))
+        self.assertEqual(y.creator.label, 'LinearFunction')
+        y = link(chainer.Variable(self.x))
+        self.assertIsInstance(y.creator, static_graph.StaticGraphFunction)
+
+    def test_rebound_attribute(self):
+        link = Stateful()
+        for _ in range(2):
+            y = link(chainer.Variable(self.x))
+            self.assertNotIsInstance(
+                y.creator, static_graph.StaticGraphFunction)
+        self.assertEqual(link.count, 2)
+
+    def test_recurrent_state(self):
+        link = Stateful()
+        link.mode = 'lstm'
+        for _ in range(2):
+            y = link(chainer.Variable(self.x))
+            self.assertNotIsInstance(
+                y.creator, static_graph.StaticGraphFunction)
+        self.assertIs(link.lstm.h, y)
+
+    def check_persistent(self, mode):
+        link = Stateful()
+        link.mode = mode
+        avg_mean = link.bn.avg_mean.copy()
+        for i in range(2):
+            y = link(chainer.Variable(self.x + i))
+            self.assertNotIsInstance(
+                y.creator, static_graph.StaticGraphFunction)
+            self.assertFalse(numpy.array_equal(link.bn.avg_mean, avg_mean))
+            avg_mean = link.bn.avg_mean.copy()
+
+    def test_updated_persistent(self):
+        self.check_persistent('bn')
+
+    def test_finetune(self):
+        self.check_persistent('finetune')
+
+    def test_inference_mode_rollback(self):
+        link = Stateful()
+        link.mode = 'lstm'
+        with chainer.inference_mode():
+            for _ in range(2):
+                y = link(self.x)
+                self.assertIsInstance(y, numpy.ndarray)
+                self.assertIs(link.lstm.h, y)
+        # the update of the statistics on the capture is rolled back
+        link.mode = 'finetune'
+        with chainer.inference_mode():
+            link(self.x)
+        self.assertEqual(link.bn.N, 1)
+
+
+class Failing(chainer.Link):
+
+    def __init__(self):
+        super(Failing, self).__init__()
+        self.n_calls = 0
+
+    @static_graph.static_graph
+    def __call__(self, x):
+        self.n_calls += 1
+        raise ValueError('error in the method')
+
+
+class TestStaticGraphFallback(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.ones((2, 3), numpy.float32)
+
+    def test_external_graph(self):
+        # self.h is created by a graph outside of the method
+        link = AddState(F.identity(chainer.Variable(self.x)))
+        for _ in range(2):
+            y = link(chainer.Variable(self.x))
+            self.assertNotIsInstance(
+                y.creator, static_graph.StaticGraphFunction)
+            gradient_check.assert_allclose(y.data, self.x * 2)
+
+    def test_inference_mode_error(self):
+        link = Failing()
+        with chainer.inference_mode():
+            with self.assertRaises(ValueError):
+                link(self.x)
+        self.assertEqual(link.n_calls, 1)
+
+    def test_passthrough(self):
+        link = AddState(None)
+        for _ in range(2):
+            x = chainer.Variable(self.x)
+            self.assertIs(link.passthrough(x), x)
+
+
+testing.run_module(__name__, __file__)
@@ -1,12 +1,16 @@
 import inspect
+import pickle
 import unittest
+import weakref
 
 import numpy as np
 
 import chainer
 from chainer import cuda
+from chainer import gradient_check
 from chainer import testing
 from chainer.testing import attr
+from chainer.utils import sparse
 
 import re
 import six
@@ -162,6 +166,35 @@ class TestVariable(unittest.TestCase):
         ret[1].unchain_backward()
         self.check_backward((ret[1], ), (ret[2], ), (ret[3], ), False)
 
+    def test_array_attributes(self):
+        x = chainer.Variable(self.c)
+        self.assertEqual(x.shape, (2, 5))
+        self.assertEqual(x.ndim, 2)
+        self.assertEqual(x.size, 10)
+        self.assertEqual(x.dtype, np.float32)
+
+    def test_slots(self):
+        x = chainer.Variable(self.x, name='x')
+        self.assertFalse(hasattr(x, '__dict__'))
+        self.assertIs(weakref.ref(x)(), x)
+        with self.assertRaises(AttributeError):
+            x.unknown_attribute = 1
+
+    def test_subclass_attribute(self):
+        class SubVariable(chainer.Variable):
+            pass
+
+        x = SubVariable(self.x)
+        x.attribute = 1
+        self.assertEqual(x.attribute, 1)
+
+    def test_pickle(self):
+        x = chainer.Variable(self.x, volatile='on', name='x')
+        x2 = pickle.loads(pickle.dumps(x))
+        np.testing.assert_array_equal(x2.data, self.x)
+        self.assertIs(x2.volatile, chainer.flag.ON)
+        self.assertEqual(x2.name, 'x')
+
     def test_invalid_value_type(self):
         with six.assertRaisesRegex(self, TypeError, 'int'):
             chainer.Variable(1)
@@ -441,6 +474,24 @@ class TestDebugPrint(unittest.TestCase):
         self.check_debug_print(v, mean=float(cuda.cupy.mean(v.data)),
                                std=float(cuda.cupy.std(v.data)))
 
+    def test_debug_print_sparse_grad(self):
+        v = chainer.Variable(self.arr)
+        v.grad = sparse.RowSparseArray(
+            np.array([1, 3]), self.arr[[1, 3]], self.arr.shape)
+        result = v.debug_print()
+        dense = v.grad.to_dense()
+        msg = 'grad: row-sparse (2 rows), mean={:.8f}, std={:.8f}'.format(
+            float(np.mean(dense)), float(np.std(dense)))
+        self.assertIn(msg, result)
+
+    def test_to_cpu_sparse_grad(self):
+        v = chainer.Variable(self.arr)
+        grad = sparse.RowSparseArray(
+            np.array([1]), self.arr[[1]], self.arr.shape)
+        v.grad = grad
+        v.to_cpu()
+        self.assertIs(v.grad, grad)
+
 
 class TestVariableSetCreator(unittest.TestCase):
     class MockFunction(object):
@@ -465,6 +516,97 @@ class TestVariableSetCreator(unittest.TestCase):
         self.check_set_creator(cuda.to_gpu(self.x))
 
 
+@testing.parameterize(
+    {'retain_grad': False},
+    {'retain_grad': True},
+)
+class TestVariableBackwardReuseBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.x = np.random.uniform(-1, 1, (3, 4)).astype(np.float32)
+        self.w = np.random.uniform(-1, 1, (3, 4)).astype(np.float32)
+
+    def forward(self, x_data, w_data):
+        x = chainer.Variable(x_data)
+        w = chainer.Variable(w_data)
+        h = x
+        for _ in six.moves.range(5):
+            # residual branches sharing the same parameter
+            h = h + chainer.functions.tanh(h * w) + h * w
+        loss = chainer.functions.sum(h * h)
+        return x, w, loss
+
+    def check_reuse_buffer(self, x_data, w_data):
+        x1, w1, loss1 = self.forward(x_data, w_data)
+        stats1 = chainer.variable.BackwardStatistics()
+        loss1.backward(retain_grad=self.retain_grad, stats=stats1)
+
+        x2, w2, loss2 = self.forward(x_data, w_data)
+        stats2 = chainer.variable.BackwardStatistics()
+        loss2.backward(retain_grad=self.retain_grad, reuse_buffer=True,
+                       stats=stats2)
+
+        gradient_check.assert_allclose(x1.grad, x2.grad)
+        gradient_check.assert_allclose(w1.grad, w2.grad)
+        self.assertGreater(stats1.n_allocations, 0)
+        self.assertGreater(stats1.peak_bytes, 0)
+        self.assertEqual(stats1.n_reuses, 0)
+        if self.retain_grad:
+            self.assertEqual(stats2.n_reuses, 0)
+        else:
+            self.assertGreater(stats2.n_reuses, 0)
+            self.assertLess(stats2.n_allocations, stats1.n_allocations)
+            self.assertLessEqual(stats2.peak_bytes, stats1.peak_bytes)
+
+    def test_reuse_buffer_cpu(self):
+        self.check_reuse_buffer(self.x, self.w)
+
+    @attr.gpu
+    def test_reuse_buffer_gpu(self):
+        self.check_reuse_buffer(cuda.to_gpu(self.x), cuda.to_gpu(self.w))
+
+
+class TestVariableBackwardWithoutHeap(unittest.TestCase):
+
+    def setUp(self):
+        self.x = np.random.uniform(-1, 1, (3, 4)).astype(np.float32)
+        self.t = np.random.randint(0, 4, (3,)).astype(np.int32)
+
+    def forward(self, x_data, t_data):
+        x = chainer.Variable(x_data)
+        t = chainer.Variable(t_data)
+        h1 = chainer.functions.tanh(x)
+        h2 = chainer.functions.sigmoid(x) * h1
+        h3 = h1 + h2 * chainer.functions.exp(h2)
+        # no gradients flow to the path of t
+        t2 = chainer.functions.identity(chainer.functions.identity(t))
+        loss = chainer.functions.softmax_cross_entropy(h3, t2)
+        return x, t, h1, loss
+
+    def check_backward(self, x_data, t_data, retain_grad):
+        x1, t1, h1, loss1 = self.forward(x_data, t_data)
+        loss1.backward(retain_grad=retain_grad)
+        x2, t2, h2, loss2 = self.forward(x_data, t_data)
+        loss2.backward(retain_grad=retain_grad, use_heap=False)
+
+        gradient_check.assert_allclose(x1.grad, x2.grad)
+        self.assertIsNone(t2.grad)
+        if retain_grad:
+            gradient_check.assert_allclose(h1.grad, h2.grad)
+        else:
+            self.assertIsNone(h2.grad)
+
+    def test_backward_cpu(self):
+        self.check_backward(self.x, self.t, False)
+
+    def test_backward_retain_grad_cpu(self):
+        self.check_backward(self.x, self.t, True)
+
+    @attr.gpu
+    def test_backward_gpu(self):
+        self.check_backward(cuda.to_gpu(self.x), cuda.to_gpu(self.t), False)
+
+
 class TestVariableBackwardError(unittest.TestCase):
 
     def setUp(self):
@@ -1,3 +1,4 @@
+import threading
 import unittest
 
 import numpy
@@ -36,6 +37,57 @@ class TestConv(unittest.TestCase):
     def test_conv_outsize_cover_all2(self):
         self.check_conv_outsize_cover_all(10, 4, 4, 2)
 
+    def test_batch_slices(self):
+        workspace_size = conv.get_max_workspace_size()
+        try:
+            conv.set_max_workspace_size(100)
+            self.assertEqual(conv.batch_slices(7, 30),
+                             [slice(0, 3), slice(3, 6), slice(6, 7)])
+            self.assertEqual(conv.batch_slices(2, 1000),
+                             [slice(0, 1), slice(1, 2)])
+            self.assertEqual(conv.batch_slices(2, 0), [slice(0, 2)])
+        finally:
+            conv.set_max_workspace_size(workspace_size)
+
+    def test_set_layout(self):
+        layout = conv.get_layout()
+        try:
+            conv.set_layout('NHWC')
+            self.assertEqual(conv.get_layout(), 'NHWC')
+            self.assertEqual(conv.get_channel_axis('NHWC', 4), 3)
+            self.assertEqual(conv.get_channel_axis('NHWC', 2), 1)
+            with self.assertRaises(ValueError):
+                conv.set_layout('CHWN')
+        finally:
+            conv.set_layout(layout)
+
+    def test_using_layout(self):
+        layout = conv.get_layout()
+        with conv.using_layout('NHWC'):
+            self.assertEqual(conv.get_layout(), 'NHWC')
+            with conv.using_layout('NCHW'):
+                self.assertEqual(conv.get_layout(), 'NCHW')
+            self.assertEqual(conv.get_layout(), 'NHWC')
+        self.assertEqual(conv.get_layout(), layout)
+        with self.assertRaises(ValueError):
+            with conv.using_layout('CHWN'):
+                pass
+        self.assertEqual(conv.get_layout(), layout)
+
+    def test_layout_thread_local(self):
+        layouts = []
+
+        def target():
+            layouts.append(conv.get_layout())
+            conv.set_layout('NCHW')
+
+        with conv.using_layout('NHWC'):
+            thread = threading.Thread(target=target)
+            thread.start()
+            thread.join()
+            self.assertEqual(conv.get_layout(), 'NHWC')
+        self.assertEqual(layouts, ['NCHW'])
+
 
 class TestIm2Col(unittest.TestCase):
 
@@ -86,6 +138,22 @@ class TestIm2Col(unittest.TestCase):
     def test_im2col_3_cpu(self):
         self.check_im2col(1, 2, 2, 1, 1, 2, gpu=False)
 
+    def test_im2col_no_pad_cpu(self):
+        self.check_im2col(3, 2, 1, 2, 0, 0, gpu=False)
+
+    def test_im2col_cpu_new_array(self):
+        col = conv.im2col_cpu(self.img, 3, 3, 1, 1, 0, 0)
+        self.assertFalse(numpy.may_share_memory(col, self.img))
+        self.assertTrue(col.flags.writeable)
+        self.assertTrue(col.flags.c_contiguous)
+
+    def test_im2col_cpu_view(self):
+        col = conv._im2col_cpu_view(self.img, 3, 3, 1, 1, 0, 0)
+        self.assertTrue(numpy.may_share_memory(col, self.img))
+        self.assertFalse(col.flags.writeable)
+        numpy.testing.assert_array_equal(
+            col, conv.im2col_cpu(self.img, 3, 3, 1, 1, 0, 0))
+
     @attr.gpu
     def test_im2col_1_gpu(self):
         self.check_im2col(1, 1, 1, 1, 1, 1, gpu=True)
@@ -159,4 +227,48 @@ class TestCol2Im(unittest.TestCase):
         self.check_col2im(1, 2, 2, 1, 1, 2, gpu=True)
 
 
+class TestIm2ColNHWC(unittest.TestCase):
+
+    def setUp(self):
+        self.img = numpy.random.uniform(-1, 1, (2, 3, 8, 10)).astype('f')
+
+    def check_im2col(self, kh, kw, sy, sx, ph, pw, cover_all=False):
+        col = conv.im2col_nhwc_cpu(
+            self.img.transpose(0, 2, 3, 1), kh, kw, sy, sx, ph, pw,
+            cover_all=cover_all)
+        col_expect = conv.im2col_cpu(
+            self.img, kh, kw, sy, sx, ph, pw, cover_all=cover_all)
+        numpy.testing.assert_array_equal(
+            col, col_expect.transpose(0, 4, 5, 2, 3, 1))
+
+    def test_im2col_1(self):
+        self.check_im2col(1, 1, 1, 1, 1, 1)
+
+    def test_im2col_2(self):
+        self.check_im2col(2, 2, 2, 2, 2, 2)
+
+    def test_im2col_3(self):
+        self.check_im2col(3, 2, 2, 1, 1, 2, cover_all=True)
+
+    def check_col2im(self, kh, kw, sy, sx, ph, pw):
+        col_h = conv.get_conv_outsize(8, kh, sy, ph)
+        col_w = conv.get_conv_outsize(10, kw, sx, pw)
+        col = numpy.random.uniform(
+            -1, 1, (2, 3, kh, kw, col_h, col_w)).astype('f')
+        img = conv.col2im_nhwc_cpu(
+            col.transpose(0, 4, 5, 2, 3, 1), sy, sx, ph, pw, 8, 10)
+        img_expect = conv.col2im_cpu(col, sy, sx, ph, pw, 8, 10)
+        numpy.testing.assert_allclose(
+            img, img_expect.transpose(0, 2, 3, 1), rtol=1e-5, atol=1e-6)
+
+    def test_col2im_1(self):
+        self.check_col2im(1, 1, 1, 1, 1, 1)
+
+    def test_col2im_2(self):
+        self.check_col2im(2, 2, 2, 2, 2, 2)
+
+    def test_col2im_3(self):
+        self.check_col2im(3, 2, 2, 1, 1, 2)
+
+
 testing.run_module(__name__, __file__)
@@ -0,0 +1,159 @@
+import unittest
+
+import mock
+import numpy
+
+from chainer import gradient_check
+from chainer import testing
+from chainer.utils import conv
+from chainer.utils import conv_algorithm
+
+
+@testing.parameterize(*testing.product({
+    'algorithm': ['direct_1x1', 'winograd'],
+    'geometry': [
+        # ksize, stride, pad, cover_all
+        (1, 1, 0, False), (1, 2, 0, False), (1, 3, 0, False),
+        (3, 1, 0, False), (3, 1, 1, False), (3, 1, 2, True),
+    ],
+    'dtype': [numpy.float32, numpy.float64],
+}))
+class TestConvolutionAlgorithm(unittest.TestCase):
+
+    def setUp(self):
+        k, self.s, self.p, self.cover_all = self.geometry
+        self.x = numpy.random.uniform(-1, 1, (2, 3, 7, 6)).astype(self.dtype)
+        self.W = numpy.random.uniform(-1, 1, (4, 3, k, k)).astype(self.dtype)
+        self.args = (self.s, self.s, self.p, self.p)
+        self.applicable = conv_algorithm.algorithms[
+            self.algorithm].is_applicable(
+                self.x.shape, self.W.shape, *(self.args + (self.cover_all,)))
+        self.y = conv_algorithm.forward(
+            self.x, self.W, *self.args, cover_all=self.cover_all,
+            algorithm='im2col')
+        self.gy = numpy.random.uniform(-1, 1, self.y.shape).astype(self.dtype)
+        self.tol = {}
+        if self.dtype == numpy.float32:
+            self.tol = {'atol': 1e-4, 'rtol': 1e-4}
+
+    def test_forward(self):
+        if not self.applicable:
+            with self.assertRaises(ValueError):
+                conv_algorithm.forward(
+                    self.x, self.W, *self.args, cover_all=self.cover_all,
+                    algorithm=self.algorithm)
+            return
+        y = conv_algorithm.forward(
+            self.x, self.W, *self.args, cover_all=self.cover_all,
+            algorithm=self.algorithm)
+        self.assertEqual(y.dtype, self.dtype)
+        gradient_check.assert_allclose(self.y, y, **self.tol)
+
+    def test_backward_data(self):
+        if not self.applicable:
+            return
+        h, w = self.x.shape[2:]
+        expect = conv_algorithm.backward_data(
+            self.gy, self.W, *(self.args + (h, w)), cover_all=self.cover_all,
+            algorithm='im2col')
+        gx = conv_algorithm.backward_data(
+            self.gy, self.W, *(self.args + (h, w)), cover_all=self.cover_all,
+            algorithm=self.algorithm)
+        self.assertEqual(gx.shape, self.x.shape)
+        gradient_check.assert_allclose(expect, gx, **self.tol)
+
+    def test_backward_filter(self):
+        if not self.applicable:
+            return
+        expect = conv_algorithm.backward_filter(
+            self.x, self.gy, self.W, *self.args, cover_all=self.cover_all,
+            algorithm='im2col')
+        gW = conv_algorithm.backward_filter(
+            self.x, self.gy, self.W, *self.args, cover_all=self.cover_all,
+            algorithm=self.algorithm)
+        self.assertEqual(gW.shape, self.W.shape)
+        gradient_check.assert_allclose(expect, gW, **self.tol)
+
+
+@testing.parameterize(
+    {'algorithm': 'im2col'},
+    {'algorithm': 'winograd'},
+)
+class TestConvolutionAlgorithmChunked(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(-1, 1, (5, 3, 6, 7))
+        self.W = numpy.random.uniform(-1, 1, (4, 3, 3, 3))
+        self.gy = numpy.random.uniform(-1, 1, (5, 4, 6, 7))
+        self.workspace_size = conv.get_max_workspace_size()
+
+    def tearDown(self):
+        conv.set_max_workspace_size(self.workspace_size)
+
+    def check(self, op, *args):
+        f = getattr(conv_algorithm, op)
+        expect = f(*args, algorithm=self.algorithm)
+        conv.set_max_workspace_size(1)
+        actual = f(*args, algorithm=self.algorithm)
+        gradient_check.assert_allclose(expect, actual)
+
+    def test_forward(self):
+        self.check('forward', self.x, self.W, 1, 1, 1, 1)
+
+    def test_backward_data(self):
+        self.check('backward_data', self.gy, self.W, 1, 1, 1, 1, 6, 7)
+
+
+class TestAutotune(unittest.TestCase):
+
+    def setUp(self):
+        self.autotune = conv_algorithm.get_autotune()
+        conv_algorithm.clear_cache()
+        self.x = numpy.random.uniform(-1, 1, (2, 3, 5, 5)).astype('f')
+        self.W = numpy.random.uniform(-1, 1, (4, 3, 3, 3)).astype('f')
+
+    def tearDown(self):
+        conv_algorithm.set_autotune(self.autotune)
+        conv_algorithm.clear_cache()
+
+    def test_autotune(self):
+        conv_algorithm.set_autotune(True)
+        y = conv_algorithm.forward(self.x, self.W, 1, 1, 1, 1)
+        expect = conv_algorithm.forward(
+            self.x, self.W, 1, 1, 1, 1, algorithm='im2col')
+        gradient_check.assert_allclose(expect, y, atol=1e-5, rtol=1e-5)
+
+        cache = conv_algorithm.get_cached_algorithms()
+        self.assertEqual(len(cache), 1)
+        (op, x_shape, W_shape), name = [
+            (key[:3], name) for key, name in cache.items()][0]
+        self.assertEqual(op, 'forward')
+        self.assertEqual(x_shape, self.x.shape)
+        self.assertEqual(W_shape, self.W.shape)
+        self.assertIn(name, ('im2col', 'winograd'))
+
+        conv_algorithm.forward(self.x, self.W, 1, 1, 1, 1)
+        self.assertEqual(len(conv_algorithm.get_cached_algorithms()), 1)
+        conv_algorithm.clear_cache()
+        self.assertEqual(conv_algorithm.get_cached_algorithms(), {})
+
+    def test_cache_size(self):
+        conv_algorithm.set_autotune(True)
+        with mock.patch.object(conv_algorithm, '_cache_size', 2):
+            for pad in (0, 1, 2):
+                conv_algorithm.forward(self.x, self.W, 1, 1, pad, pad)
+        cache = conv_algorithm.get_cached_algorithms()
+        self.assertEqual([key[5:7] for key in cache], [(2, 2)])
+
+    def test_no_autotune(self):
+        conv_algorithm.set_autotune(False)
+        conv_algorithm.forward(self.x, self.W, 1, 1, 1, 1)
+        self.assertEqual(conv_algorithm.get_cached_algorithms(), {})
+
+    def test_unknown_algorithm(self):
+        with self.assertRaises(ValueError):
+            conv_algorithm.forward(
+                self.x, self.W, 1, 1, 1, 1, algorithm='unknown')
+
+
+testing.run_module(__name__, __file__)
@@ -0,0 +1,77 @@
+import unittest
+
+import numpy
+
+from chainer import testing
+from chainer.utils import sparse
+
+
+class TestScatterAdd(unittest.TestCase):
+
+    def setUp(self):
+        self.shape = (6, 2, 3)
+        self.indices = numpy.array([4, 1, 4, 0, 1, 4], dtype=numpy.int32)
+        self.values = numpy.random.uniform(
+            -1, 1, (6, 2, 3)).astype(numpy.float32)
+
+    def test_scatter_add(self):
+        x = sparse.scatter_add(self.indices, self.values, self.shape)
+        self.assertIsInstance(x, sparse.RowSparseArray)
+        self.assertEqual(x.shape, self.shape)
+        self.assertEqual(x.dtype, numpy.float32)
+        numpy.testing.assert_array_equal(x.indices, [0, 1, 4])
+
+        expect = numpy.zeros(self.shape, dtype=numpy.float32)
+        numpy.add.at(expect, self.indices, self.values)
+        numpy.testing.assert_allclose(x.to_dense(), expect, rtol=1e-6)
+
+    def test_scatter_add_many_duplicates(self):
+        indices = numpy.random.randint(0, 200, 2000)
+        values = numpy.random.uniform(-1, 1, (2000, 3))
+        x = sparse.scatter_add(indices, values, (300, 3))
+        numpy.testing.assert_array_equal(x.indices, numpy.unique(indices))
+
+        expect = numpy.zeros((300, 3))
+        numpy.add.at(expect, indices, values)
+        numpy.testing.assert_allclose(x.to_dense(), expect)
+
+    def test_scatter_add_empty(self):
+        x = sparse.scatter_add(
+            numpy.empty((0,), dtype=numpy.int32),
+            numpy.empty((0, 2, 3), dtype=numpy.float32), self.shape)
+        self.assertEqual(len(x.indices), 0)
+        numpy.testing.assert_array_equal(
+            x.to_dense(), numpy.zeros(self.shape, dtype=numpy.float32))
+
+
+class TestRowSparseArray(unittest.TestCase):
+
+    def setUp(self):
+        shape = (5, 3)
+        self.a = sparse.scatter_add(
+            [3, 0], numpy.random.uniform(-1, 1, (2, 3)), shape)
+        self.b = sparse.scatter_add(
+            [0, 4], numpy.random.uniform(-1, 1, (2, 3)), shape)
+        self.dense = numpy.random.uniform(-1, 1, shape)
+
+    def test_add_sparse(self):
+        c = self.a + self.b
+        self.assertIsInstance(c, sparse.RowSparseArray)
+        numpy.testing.assert_array_equal(c.indices, [0, 3, 4])
+        numpy.testing.assert_allclose(
+            c.to_dense(), self.a.to_dense() + self.b.to_dense())
+
+    def test_add_dense(self):
+        expect = self.dense + self.a.to_dense()
+        for c in (self.a + self.dense, self.dense + self.a):
+            self.assertIsInstance(c, numpy.ndarray)
+            self.assertIsNot(c, self.dense)
+            numpy.testing.assert_allclose(c, expect)
+
+    def test_add_to(self):
+        expect = self.dense + self.a.to_dense()
+        self.a.add_to(self.dense)
+        numpy.testing.assert_allclose(self.dense, expect)
+
+
+testing.run_module(__name__, __file__)